@@ -3,9 +3,15 @@ from logging.config import fileConfig
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
-from app.db.models.location import Location
-from app.db.models.outage import Outage
-from app.db.models.post import Post
+from app.reg.models.incident import Incident
+from app.reg.models.issue_rollup import IssueRollup
+from app.reg.models.location import Location
+from app.reg.models.outage import Outage
+from app.reg.models.outage_stats import OutageAreaCount, OutageStatsSummary
+from app.reg.models.post import Post
+from app.reg.models.power_issue import PowerIssue
+from app.wasac.models.water_issue import WaterIssue
+from app.db.embedding_cache import EmbeddingCacheEntry
 from app.db.session import Base
 from alembic import context
 
@@ -0,0 +1,54 @@
+"""Add district codes on incidents
+
+Revision ID: 1d6e3b8f4a52
+Revises: 7c1f4a9e2d63
+Create Date: 2026-10-18 21:32:15.406871
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "1d6e3b8f4a52"
+down_revision: Union[str, Sequence[str], None] = "7c1f4a9e2d63"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "incidents",
+        sa.Column(
+            "district_codes",
+            postgresql.ARRAY(sa.String()),
+            nullable=False,
+            server_default="{}",
+        ),
+    )
+    op.execute(
+        """
+        UPDATE incidents AS i
+        SET district_codes = members.codes
+        FROM (
+            SELECT incident_id, array_agg(DISTINCT district_code) AS codes
+            FROM (
+                SELECT incident_id, district_code FROM outages
+                UNION ALL
+                SELECT incident_id, district_code FROM power_issues
+            ) AS m
+            WHERE incident_id IS NOT NULL AND district_code IS NOT NULL
+            GROUP BY incident_id
+        ) AS members
+        WHERE members.incident_id = i.id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("incidents", "district_codes")
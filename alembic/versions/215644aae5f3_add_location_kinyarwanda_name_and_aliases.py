@@ -0,0 +1,41 @@
+"""Add location kinyarwanda name and aliases
+
+Revision ID: 215644aae5f3
+Revises: 646ea74e0967
+Create Date: 2026-10-18 09:12:31.402118
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "215644aae5f3"
+down_revision: Union[str, Sequence[str], None] = "646ea74e0967"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "locations", sa.Column("name_kinyarwanda", sa.String(), nullable=True)
+    )
+    op.add_column(
+        "locations",
+        sa.Column("aliases", postgresql.ARRAY(sa.String()), nullable=True),
+    )
+    # The gazetteer refreshes incrementally from the last updated_at it saw
+    op.create_index(
+        "ix_locations_updated_at", "locations", ["updated_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_locations_updated_at", table_name="locations")
+    op.drop_column("locations", "aliases")
+    op.drop_column("locations", "name_kinyarwanda")
@@ -0,0 +1,48 @@
+"""Add hourly and daily issue rollups
+
+Revision ID: 2c7a9e05d3f4
+Revises: b8e4f2a61c09
+Create Date: 2026-10-18 18:32:17.940216
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "2c7a9e05d3f4"
+down_revision: Union[str, Sequence[str], None] = "b8e4f2a61c09"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Fill from history: python -m app.reg.services.scheduler_service rebuild-rollups
+    op.create_table(
+        "issue_rollups",
+        sa.Column("granularity", sa.String(), nullable=False),
+        sa.Column("bucket", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("issue_type", sa.String(), nullable=False),
+        sa.Column("district_code", sa.String(), nullable=False),
+        sa.Column("sector_code", sa.String(), nullable=False),
+        sa.Column("report_count", sa.BigInteger(), nullable=False),
+        sa.Column("resolved_count", sa.BigInteger(), nullable=False),
+        sa.Column("active_minutes", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint(
+            "granularity",
+            "bucket",
+            "source",
+            "issue_type",
+            "district_code",
+            "sector_code",
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("issue_rollups")
@@ -0,0 +1,70 @@
+"""Add generated geography positions on power and water issues
+
+Revision ID: 3b9e0d4c7a61
+Revises: a7c2e94d1f08
+Create Date: 2026-10-18 15:04:22.730519
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+
+from app.db.spatial import POSITION_EXPRESSION
+
+# revision identifiers, used by Alembic.
+revision: str = "3b9e0d4c7a61"
+down_revision: Union[str, Sequence[str], None] = "a7c2e94d1f08"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ("power_issues", "water_issues")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in TABLES:
+        # approx_lat / approx_long were never filled: take them from the
+        # reported location
+        op.execute(
+            f"""
+            UPDATE {table}
+            SET approx_lat = (location->>'lat')::float,
+                approx_long = (location->>'lng')::float
+            WHERE approx_lat IS NULL
+              AND location->>'lat' IS NOT NULL
+              AND location->>'lng' IS NOT NULL
+            """
+        )
+        op.add_column(
+            table,
+            sa.Column(
+                "position",
+                geoalchemy2.types.Geography(
+                    geometry_type="POINT",
+                    srid=4326,
+                    spatial_index=False,
+                    from_text="ST_GeogFromText",
+                    name="geography",
+                ),
+                sa.Computed(POSITION_EXPRESSION, persisted=True),
+                nullable=True,
+            ),
+        )
+        op.create_index(
+            f"ix_{table}_position",
+            table,
+            ["position"],
+            unique=False,
+            postgresql_using="gist",
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.drop_index(f"ix_{table}_position", table_name=table, postgresql_using="gist")
+        op.drop_column(table, "position")
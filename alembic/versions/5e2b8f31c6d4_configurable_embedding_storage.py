@@ -0,0 +1,31 @@
+"""Configurable embedding storage (vector / halfvec) and dimensionality
+
+Revision ID: 5e2b8f31c6d4
+Revises: c41d7a2e5b90
+Create Date: 2026-10-18 12:18:45.903127
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.db.vector_types import convert_embedding_columns
+
+# revision identifiers, used by Alembic.
+revision: str = "5e2b8f31c6d4"
+down_revision: Union[str, Sequence[str], None] = "c41d7a2e5b90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Retypes the columns to EMBEDDING_STORAGE(EMBEDDING_DIM); a no-op with
+    # the defaults. Later switches use `python -m app.db.vector_types convert`.
+    convert_embedding_columns(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    convert_embedding_columns(op.get_bind(), storage="vector", dim=384)
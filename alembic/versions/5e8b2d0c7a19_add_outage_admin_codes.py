@@ -0,0 +1,53 @@
+"""Add admin codes on outages and index their location
+
+Revision ID: 5e8b2d0c7a19
+Revises: 9a3c5e7f1b24
+Create Date: 2026-10-18 20:12:47.530614
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5e8b2d0c7a19"
+down_revision: Union[str, Sequence[str], None] = "9a3c5e7f1b24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+CODE_COLUMNS = (
+    "province_code",
+    "district_code",
+    "sector_code",
+    "cell_code",
+    "village_code",
+)
+INDEXED_COLUMNS = ("location_id", "district_code", "sector_code")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for column in CODE_COLUMNS:
+        op.add_column("outages", sa.Column(column, sa.String(), nullable=True))
+    for column in INDEXED_COLUMNS:
+        op.create_index(op.f(f"ix_outages_{column}"), "outages", [column], unique=False)
+    # Rows already placed; the rest: python -m app.core.area_resolver backfill
+    op.execute(
+        f"""
+        UPDATE outages AS o
+        SET {", ".join(f"{column} = l.{column}" for column in CODE_COLUMNS)}
+        FROM locations AS l
+        WHERE l.id = o.location_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in INDEXED_COLUMNS:
+        op.drop_index(op.f(f"ix_outages_{column}"), table_name="outages")
+    for column in CODE_COLUMNS:
+        op.drop_column("outages", column)
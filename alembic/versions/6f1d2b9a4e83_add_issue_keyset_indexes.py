@@ -0,0 +1,53 @@
+"""Add keyset pagination indexes on power and water issues
+
+Revision ID: 6f1d2b9a4e83
+Revises: e5a1c8f70b3d
+Create Date: 2026-10-18 17:11:40.204381
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6f1d2b9a4e83"
+down_revision: Union[str, Sequence[str], None] = "e5a1c8f70b3d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ("power_issues", "water_issues")
+LEADING = ((), ("is_resolved",), ("issue_type",))
+
+
+def _name(table: str, leading) -> str:
+    return "ix_" + "_".join((table, *leading, "created_at_id"))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            for leading in LEADING:
+                op.create_index(
+                    _name(table, leading),
+                    table,
+                    [*leading, "created_at", "id"],
+                    unique=False,
+                    postgresql_concurrently=True,
+                    if_not_exists=True,
+                )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            for leading in LEADING:
+                op.drop_index(
+                    _name(table, leading),
+                    table_name=table,
+                    postgresql_concurrently=True,
+                    if_exists=True,
+                )
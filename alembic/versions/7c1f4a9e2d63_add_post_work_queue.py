@@ -0,0 +1,46 @@
+"""Add work queue lease columns on posts
+
+Revision ID: 7c1f4a9e2d63
+Revises: 5e8b2d0c7a19
+Create Date: 2026-10-18 20:47:03.118254
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "7c1f4a9e2d63"
+down_revision: Union[str, Sequence[str], None] = "5e8b2d0c7a19"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "posts", sa.Column("claimed_at", sa.DateTime(timezone=True), nullable=True)
+    )
+    op.add_column("posts", sa.Column("claimed_by", sa.String(), nullable=True))
+    op.add_column(
+        "posts",
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+    )
+    # Plain CREATE INDEX: posts may be partitioned, see app/db/partitions.py
+    op.create_index(
+        "ix_posts_unprocessed",
+        "posts",
+        ["created_at"],
+        unique=False,
+        postgresql_where=sa.text("processed IS NOT TRUE"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_posts_unprocessed", table_name="posts")
+    op.drop_column("posts", "attempts")
+    op.drop_column("posts", "claimed_by")
+    op.drop_column("posts", "claimed_at")
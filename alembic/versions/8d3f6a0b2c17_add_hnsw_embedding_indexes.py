@@ -0,0 +1,38 @@
+"""Add HNSW cosine indexes on the embedding columns
+
+Revision ID: 8d3f6a0b2c17
+Revises: 5e2b8f31c6d4
+Create Date: 2026-10-18 13:02:51.416870
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.db.vector_types import create_hnsw_index, drop_hnsw_index
+
+# revision identifiers, used by Alembic.
+revision: str = "8d3f6a0b2c17"
+down_revision: Union[str, Sequence[str], None] = "5e2b8f31c6d4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ("outages", "power_issues", "water_issues")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # m / ef_construction come from VECTOR_INDEX_M / VECTOR_INDEX_EF_CONSTRUCTION.
+    # Built CONCURRENTLY so ingestion keeps writing during the build.
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            create_hnsw_index(op.get_bind(), table, concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            drop_hnsw_index(op.get_bind(), table, concurrently=True)
@@ -0,0 +1,49 @@
+"""Add pg_trgm indexes for fuzzy location search
+
+Revision ID: 9a3c5e7f1b24
+Revises: d4f7b1c38e2a
+Create Date: 2026-10-18 19:41:26.057193
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9a3c5e7f1b24"
+down_revision: Union[str, Sequence[str], None] = "d4f7b1c38e2a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# array_to_string is only STABLE, which an index expression cannot use
+ALIAS_TEXT_FUNCTION = """
+CREATE OR REPLACE FUNCTION location_alias_text(aliases text[])
+RETURNS text LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT lower(array_to_string(aliases, ' '))
+$$
+"""
+
+INDEXES = {
+    "ix_locations_name_trgm": "lower(name) gin_trgm_ops",
+    "ix_locations_name_kinyarwanda_trgm": "lower(name_kinyarwanda) gin_trgm_ops",
+    "ix_locations_aliases_trgm": "location_alias_text(aliases) gin_trgm_ops",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(ALIAS_TEXT_FUNCTION)
+    for name, expression in INDEXES.items():
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON locations USING gin ({expression})"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.execute("DROP FUNCTION IF EXISTS location_alias_text(text[])")
@@ -0,0 +1,80 @@
+"""Add incidents and incident_id on outages and power issues
+
+Revision ID: a7c2e94d1f08
+Revises: 8d3f6a0b2c17
+Create Date: 2026-10-18 14:11:36.582094
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.db.vector_types import EmbeddingVector, create_hnsw_index
+
+# revision identifiers, used by Alembic.
+revision: str = "a7c2e94d1f08"
+down_revision: Union[str, Sequence[str], None] = "8d3f6a0b2c17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+MEMBER_TABLES = ("outages", "power_issues")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "incidents",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("areas", postgresql.ARRAY(sa.String()), nullable=False),
+        sa.Column("location_id", sa.UUID(), nullable=True),
+        sa.Column("member_count", sa.Integer(), nullable=False),
+        sa.Column("outage_count", sa.Integer(), nullable=False),
+        sa.Column("power_issue_count", sa.Integer(), nullable=False),
+        sa.Column("first_seen", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_seen", sa.DateTime(timezone=True), nullable=False),
+        # EMBEDDING_STORAGE(EMBEDDING_DIM), like the other embedding columns
+        sa.Column("embedding", EmbeddingVector(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.ForeignKeyConstraint(
+            ["location_id"],
+            ["locations.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_incidents_last_seen", "incidents", ["last_seen"], unique=False)
+    # Empty table: no need to build it concurrently
+    create_hnsw_index(op.get_bind(), "incidents")
+
+    for table in MEMBER_TABLES:
+        op.add_column(table, sa.Column("incident_id", sa.UUID(), nullable=True))
+        op.create_foreign_key(
+            f"{table}_incident_id_fkey", table, "incidents", ["incident_id"], ["id"]
+        )
+        op.create_index(
+            op.f(f"ix_{table}_incident_id"), table, ["incident_id"], unique=False
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in MEMBER_TABLES:
+        op.drop_index(op.f(f"ix_{table}_incident_id"), table_name=table)
+        op.drop_constraint(f"{table}_incident_id_fkey", table, type_="foreignkey")
+        op.drop_column(table, "incident_id")
+    op.drop_table("incidents")
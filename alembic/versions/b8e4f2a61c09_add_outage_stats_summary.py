@@ -0,0 +1,167 @@
+"""Add trigger-maintained outage stats summary tables
+
+Revision ID: b8e4f2a61c09
+Revises: 6f1d2b9a4e83
+Create Date: 2026-10-18 17:48:05.663127
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "b8e4f2a61c09"
+down_revision: Union[str, Sequence[str], None] = "6f1d2b9a4e83"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Adds the net effect of a statement: `added` rows count +1, `removed` -1.
+# An UPDATE that leaves the counted columns alone nets to zero and writes
+# nothing.
+APPLY_FUNCTION = """
+CREATE OR REPLACE FUNCTION outage_stats_apply(added outages[], removed outages[])
+RETURNS void LANGUAGE sql AS $$
+    WITH changes AS (
+        SELECT 1 AS sign, a.* FROM unnest(added) AS a
+        UNION ALL
+        SELECT -1 AS sign, r.* FROM unnest(removed) AS r
+    ),
+    delta AS (
+        SELECT
+            coalesce(sum(sign), 0) AS total,
+            coalesce(sum(sign) FILTER (WHERE outage_type = 'OUTAGE'), 0) AS outages,
+            coalesce(sum(sign) FILTER (WHERE outage_type = 'RESTORATION'), 0)
+                AS restorations,
+            coalesce(sum(sign) FILTER (WHERE status = 'ACTIVE'), 0) AS active,
+            coalesce(sum(sign) FILTER (WHERE status = 'RESOLVED'), 0) AS resolved,
+            coalesce(
+                sum(sign * extract(epoch FROM resolved_at - reported_at)::float8)
+                    FILTER (WHERE resolved_at IS NOT NULL),
+                0
+            ) AS duration_seconds,
+            coalesce(sum(sign) FILTER (WHERE resolved_at IS NOT NULL), 0)
+                AS duration_count
+        FROM changes
+    ),
+    summary AS (
+        UPDATE outage_stats AS s SET
+            total_outages = s.total_outages + d.total,
+            outage_reports = s.outage_reports + d.outages,
+            total_restorations = s.total_restorations + d.restorations,
+            active_outages = s.active_outages + d.active,
+            resolved_outages = s.resolved_outages + d.resolved,
+            resolved_duration_seconds = s.resolved_duration_seconds + d.duration_seconds,
+            resolved_duration_count = s.resolved_duration_count + d.duration_count,
+            updated_at = now()
+        FROM delta AS d
+        WHERE s.id = 1
+          AND (d.total, d.outages, d.restorations, d.active, d.resolved,
+               d.duration_seconds, d.duration_count) <> (0, 0, 0, 0, 0, 0, 0)
+        RETURNING 1
+    )
+    INSERT INTO outage_area_counts AS c (area, outage_count)
+    SELECT area, sum(sign)
+    FROM changes, unnest(changes.areas) AS area
+    WHERE outage_type = 'OUTAGE'
+    GROUP BY area
+    HAVING sum(sign) <> 0
+    ON CONFLICT (area)
+    DO UPDATE SET outage_count = c.outage_count + EXCLUDED.outage_count;
+$$
+"""
+
+TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION outage_stats_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM outage_stats_apply(
+            ARRAY(SELECT n FROM new_rows AS n), ARRAY[]::outages[]
+        );
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM outage_stats_apply(
+            ARRAY(SELECT n FROM new_rows AS n), ARRAY(SELECT o FROM old_rows AS o)
+        );
+    ELSE
+        PERFORM outage_stats_apply(
+            ARRAY[]::outages[], ARRAY(SELECT o FROM old_rows AS o)
+        );
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+# Transition tables need one trigger per event
+TRIGGERS = {
+    "outage_stats_insert": "AFTER INSERT ON outages REFERENCING NEW TABLE AS new_rows",
+    "outage_stats_update": (
+        "AFTER UPDATE ON outages "
+        "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows"
+    ),
+    "outage_stats_delete": "AFTER DELETE ON outages REFERENCING OLD TABLE AS old_rows",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "outage_stats",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("total_outages", sa.BigInteger(), nullable=False),
+        sa.Column("outage_reports", sa.BigInteger(), nullable=False),
+        sa.Column("total_restorations", sa.BigInteger(), nullable=False),
+        sa.Column("active_outages", sa.BigInteger(), nullable=False),
+        sa.Column("resolved_outages", sa.BigInteger(), nullable=False),
+        sa.Column("resolved_duration_seconds", sa.Float(), nullable=False),
+        sa.Column("resolved_duration_count", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.CheckConstraint("id = 1", name="outage_stats_single_row"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "outage_area_counts",
+        sa.Column("area", sa.String(), nullable=False),
+        sa.Column("outage_count", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("area"),
+    )
+    op.create_index(
+        "ix_outage_area_counts_outage_count",
+        "outage_area_counts",
+        [sa.text("outage_count DESC")],
+        unique=False,
+    )
+
+    op.execute(APPLY_FUNCTION)
+    op.execute(TRIGGER_FUNCTION)
+    # Seed from the existing rows, with writers blocked until the triggers
+    # are in place
+    op.execute("LOCK TABLE outages IN SHARE ROW EXCLUSIVE MODE")
+    op.execute("INSERT INTO outage_stats VALUES (1, 0, 0, 0, 0, 0, 0, 0, now())")
+    op.execute(
+        "SELECT outage_stats_apply(ARRAY(SELECT o FROM outages AS o), ARRAY[]::outages[])"
+    )
+    for name, event in TRIGGERS.items():
+        op.execute(
+            f"CREATE TRIGGER {name} {event} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION outage_stats_trigger()"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON outages")
+    op.execute("DROP FUNCTION IF EXISTS outage_stats_trigger()")
+    op.execute("DROP FUNCTION IF EXISTS outage_stats_apply(outages[], outages[])")
+    op.drop_index("ix_outage_area_counts_outage_count", table_name="outage_area_counts")
+    op.drop_table("outage_area_counts")
+    op.drop_table("outage_stats")
@@ -0,0 +1,108 @@
+"""Deferred embeddings: nullable embedding columns and pending indexes
+
+Revision ID: c41d7a2e5b90
+Revises: 9fb763b0781e
+Create Date: 2026-10-18 11:32:08.214736
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+from pgvector.sqlalchemy import Vector
+
+# revision identifiers, used by Alembic.
+revision: str = "c41d7a2e5b90"
+down_revision: Union[str, Sequence[str], None] = "9fb763b0781e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ISSUE_TABLES = {
+    "power_issues": (
+        "powerissuetype",
+        ("OUTAGE", "BROKEN_STREET_LIGHTS", "POTENTIALLY_FATAL"),
+    ),
+    "water_issues": (
+        "waterissuetype",
+        ("WATER_CUT", "BROKEN_PIPE", "NEW_COUNTER"),
+    ),
+}
+
+EMBEDDED_TABLES = ("outages", "power_issues", "water_issues")
+
+
+def create_issue_table(table: str, enum_name: str, enum_values) -> None:
+    op.create_table(
+        table,
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("audio_description", sa.String(), nullable=True),
+        sa.Column("phone_number", sa.String(length=20), nullable=True),
+        sa.Column("embedding", Vector(dim=384), nullable=True),
+        sa.Column("image_url", sa.String(), nullable=True),
+        sa.Column("is_resolved", sa.Boolean(), nullable=True),
+        sa.Column("location", sa.JSON(), nullable=True),
+        sa.Column("issue_type", sa.Enum(*enum_values, name=enum_name), nullable=False),
+        sa.Column("approx_lat", sa.Float(), nullable=True),
+        sa.Column("approx_long", sa.Float(), nullable=True),
+        sa.Column(
+            "affected_areas",
+            sa.ARRAY(
+                geoalchemy2.types.Geometry(
+                    geometry_type="POLYGON",
+                    from_text="ST_GeomFromEWKT",
+                    name="geometry",
+                )
+            ),
+            nullable=True,
+        ),
+        sa.Column("affeccted_area_names", sa.ARRAY(sa.String()), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The issue tables were never part of a migration; create them where
+    # they do not exist yet
+    inspector = sa.inspect(op.get_bind())
+    for table, (enum_name, enum_values) in ISSUE_TABLES.items():
+        if not inspector.has_table(table):
+            create_issue_table(table, enum_name, enum_values)
+
+    for table in EMBEDDED_TABLES:
+        op.alter_column(
+            table, "embedding", existing_type=Vector(dim=384), nullable=True
+        )
+        op.create_index(
+            f"ix_{table}_embedding_pending",
+            table,
+            ["created_at"],
+            unique=False,
+            postgresql_where=sa.text("embedding IS NULL"),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in EMBEDDED_TABLES:
+        op.drop_index(f"ix_{table}_embedding_pending", table_name=table)
+        # Fails while rows are still pending: drain the embedder first
+        op.alter_column(
+            table, "embedding", existing_type=Vector(dim=384), nullable=False
+        )
@@ -0,0 +1,54 @@
+"""Add location and admin codes on power and water issues
+
+Revision ID: e5a1c8f70b3d
+Revises: 3b9e0d4c7a61
+Create Date: 2026-10-18 16:20:09.118462
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a1c8f70b3d"
+down_revision: Union[str, Sequence[str], None] = "3b9e0d4c7a61"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ("power_issues", "water_issues")
+CODE_COLUMNS = (
+    "province_code",
+    "district_code",
+    "sector_code",
+    "cell_code",
+    "village_code",
+)
+INDEXED_CODES = ("district_code", "sector_code")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows: python -m app.core.reverse_geocoder backfill
+    for table in TABLES:
+        op.add_column(table, sa.Column("location_id", sa.UUID(), nullable=True))
+        op.create_foreign_key(
+            f"{table}_location_id_fkey", table, "locations", ["location_id"], ["id"]
+        )
+        for column in CODE_COLUMNS:
+            op.add_column(table, sa.Column(column, sa.String(), nullable=True))
+        for column in INDEXED_CODES:
+            op.create_index(op.f(f"ix_{table}_{column}"), table, [column], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        for column in INDEXED_CODES:
+            op.drop_index(op.f(f"ix_{table}_{column}"), table_name=table)
+        for column in CODE_COLUMNS:
+            op.drop_column(table, column)
+        op.drop_constraint(f"{table}_location_id_fkey", table, type_="foreignkey")
+        op.drop_column(table, "location_id")
@@ -0,0 +1,228 @@
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, NamedTuple, Optional
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.reg.models.location import Location
+from app.reg.twitter.gazetteer import LEVELS, Watermark
+
+
+logger = logging.getLogger(__name__)
+
+CODE_COLUMNS = (
+    Location.province_code,
+    Location.district_code,
+    Location.sector_code,
+    Location.cell_code,
+    Location.village_code,
+)
+
+
+class HierarchyNode(NamedTuple):
+    location_id: UUID
+    name: str
+    level: str
+    code: str
+    parent_code: Optional[str]
+
+
+@dataclass(frozen=True)
+class _Tree:
+    """Immutable snapshot; swapped whole on reload."""
+
+    nodes: List[HierarchyNode]
+    by_code: Dict[str, int]
+    parent: np.ndarray  # node -> parent node, -1 for roots
+    rank: np.ndarray  # node -> index in LEVELS
+    child_offsets: np.ndarray  # children of i: child_nodes[offsets[i]:offsets[i+1]]
+    child_nodes: np.ndarray
+    tin: np.ndarray  # Euler tour: the subtree of i is order[tin[i]:tout[i]]
+    tout: np.ndarray
+    order: np.ndarray
+    level_tin: List[np.ndarray]  # per level, sorted tin of its nodes
+    level_nodes: List[np.ndarray]  # the same nodes, in that order
+
+
+def _build(rows) -> _Tree:
+    nodes, by_code, parent_codes = [], {}, []
+    for row in sorted(rows, key=lambda row: LEVELS.index(row.level)):
+        rank = LEVELS.index(row.level)
+        codes = [getattr(row, column.key) for column in CODE_COLUMNS]
+        code = codes[rank]
+        if not code or code in by_code:
+            continue
+        by_code[code] = len(nodes)
+        nodes.append(
+            HierarchyNode(row.id, row.name, row.level, code, None),
+        )
+        parent_codes.append(codes[:rank])
+
+    count = len(nodes)
+    parent = np.full(count, -1, dtype=np.int32)
+    rank = np.array([LEVELS.index(node.level) for node in nodes], dtype=np.int8)
+    for i, codes in enumerate(parent_codes):
+        # Nearest enclosing level present, when one is missing
+        for code in reversed(codes):
+            if code and code in by_code:
+                parent[i] = by_code[code]
+                nodes[i] = nodes[i]._replace(parent_code=code)
+                break
+
+    # Children grouped by parent (CSR)
+    has_parent = np.flatnonzero(parent >= 0)
+    child_nodes = has_parent[np.argsort(parent[has_parent], kind="stable")].astype(
+        np.int32
+    )
+    counts = np.bincount(parent[has_parent], minlength=count)
+    child_offsets = np.zeros(count + 1, dtype=np.int32)
+    np.cumsum(counts, out=child_offsets[1:])
+
+    # Iterative DFS numbering
+    tin = np.zeros(count, dtype=np.int32)
+    tout = np.zeros(count, dtype=np.int32)
+    order = np.zeros(count, dtype=np.int32)
+    clock = 0
+    for root in np.flatnonzero(parent < 0):
+        stack = [(int(root), False)]
+        while stack:
+            node, done = stack.pop()
+            if done:
+                tout[node] = clock
+                continue
+            tin[node] = clock
+            order[clock] = node
+            clock += 1
+            stack.append((node, True))
+            children = child_nodes[child_offsets[node] : child_offsets[node + 1]]
+            stack.extend((int(child), False) for child in children[::-1])
+
+    level_tin, level_nodes = [], []
+    for level in range(len(LEVELS)):
+        at_level = np.flatnonzero(rank == level)
+        by_tin = at_level[np.argsort(tin[at_level])]
+        level_nodes.append(by_tin.astype(np.int32))
+        level_tin.append(tin[by_tin])
+
+    return _Tree(
+        nodes=nodes,
+        by_code=by_code,
+        parent=parent,
+        rank=rank,
+        child_offsets=child_offsets,
+        child_nodes=child_nodes,
+        tin=tin,
+        tout=tout,
+        order=order,
+        level_tin=level_tin,
+        level_nodes=level_nodes,
+    )
+
+
+class AdminHierarchy:
+    """Province > district > sector > cell > village tree, keyed by admin code.
+
+    The whole tree lives in flat arrays: children are a CSR slice, a
+    subtree is a slice of the Euler tour, and descendants at a level are a
+    binary-searched range of that level's tour positions. Lookups never
+    touch the database; refresh() reloads only when the row count of
+    `locations` moved or its Watermark finds changed rows.
+    """
+
+    def __init__(self):
+        self._tree: Optional[_Tree] = None
+        self._count: Optional[int] = None
+        self._watermark = Watermark()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        tree = self._tree
+        return len(tree.nodes) if tree else 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._tree is not None
+
+    def refresh(self, db: Session) -> bool:
+        """Reload when `locations` changed since the last load."""
+        count = db.query(func.count(Location.id)).scalar()
+        changed = self._watermark.advance(
+            self._watermark.filter(db.query(Location.id, Location.updated_at)).all()
+        )
+        if self._tree is not None and count == self._count and not changed:
+            return False
+        rows = (
+            db.query(Location.id, Location.name, Location.level, *CODE_COLUMNS)
+            .filter(Location.level.in_(LEVELS))
+            .all()
+        )
+        tree = _build(rows)
+        with self._lock:
+            self._tree, self._count = tree, count
+        logger.info(f"Admin hierarchy loaded {len(tree.nodes)} areas")
+        return True
+
+    def _snapshot(self) -> _Tree:
+        tree = self._tree
+        if tree is None:
+            raise RuntimeError("Admin hierarchy not loaded, call refresh() first")
+        return tree
+
+    def _nodes(self, tree: _Tree, indexes) -> List[HierarchyNode]:
+        return [tree.nodes[i] for i in indexes]
+
+    def get(self, code: str) -> Optional[HierarchyNode]:
+        tree = self._snapshot()
+        index = tree.by_code.get(code)
+        return tree.nodes[index] if index is not None else None
+
+    def at_level(self, level: str) -> List[HierarchyNode]:
+        tree = self._snapshot()
+        return self._nodes(tree, tree.level_nodes[LEVELS.index(level)])
+
+    def children(self, code: str) -> List[HierarchyNode]:
+        tree = self._snapshot()
+        index = tree.by_code.get(code)
+        if index is None:
+            return []
+        start, end = tree.child_offsets[index], tree.child_offsets[index + 1]
+        return self._nodes(tree, tree.child_nodes[start:end])
+
+    def ancestors(self, code: str) -> List[HierarchyNode]:
+        """Enclosing areas, province first."""
+        tree = self._snapshot()
+        index = tree.by_code.get(code)
+        chain = []
+        while index is not None and tree.parent[index] >= 0:
+            index = int(tree.parent[index])
+            chain.append(tree.nodes[index])
+        return chain[::-1]
+
+    def descendants(self, code: str, level: str) -> List[HierarchyNode]:
+        """Areas of `level` inside `code`, e.g. every village of a district."""
+        tree = self._snapshot()
+        index = tree.by_code.get(code)
+        if index is None:
+            return []
+        rank = LEVELS.index(level)
+        positions = tree.level_tin[rank]
+        start = np.searchsorted(positions, tree.tin[index], side="right")
+        end = np.searchsorted(positions, tree.tout[index], side="left")
+        return self._nodes(tree, tree.level_nodes[rank][start:end])
+
+    def subtree(self, code: str) -> List[HierarchyNode]:
+        """The area and everything inside it, depth first."""
+        tree = self._snapshot()
+        index = tree.by_code.get(code)
+        if index is None:
+            return []
+        return self._nodes(tree, tree.order[tree.tin[index] : tree.tout[index]])
+
+    def subtree_codes(self, code: str, level: Optional[str] = None) -> List[str]:
+        """Codes inside `code` (at `level` when given), for area rollups."""
+        nodes = self.descendants(code, level) if level else self.subtree(code)
+        return [node.code for node in nodes]
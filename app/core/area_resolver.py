@@ -0,0 +1,254 @@
+import argparse
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func, or_, text, update
+from sqlalchemy.orm import Session
+
+from app.core.config import Settings
+from app.core.location_search import normalize_name
+from app.core.reverse_geocoder import CODE_FIELDS, AdminArea
+from app.reg.models.location import Location
+from app.reg.twitter.gazetteer import LEVELS
+
+
+settings = Settings()
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def _rank(area: AdminArea) -> int:
+    return LEVELS.index(area.level) if area.level in LEVELS else len(LEVELS)
+
+
+def _area(row) -> AdminArea:
+    return AdminArea(
+        row.id, row.name, row.level, tuple(getattr(row, field) for field in CODE_FIELDS)
+    )
+
+
+class AreaResolver:
+    """Extracted area names -> `Location`, resolved a batch at a time.
+
+    Names are memoized in a bounded LRU map (unresolvable names too, so a
+    misspelling is not searched again on every tweet). Misses of a batch
+    cost one exact `IN` query plus one pg_trgm query for what is still
+    unmatched, whatever the number of tweets.
+    """
+
+    def __init__(self, max_size: int = None):
+        self.max_size = max_size or settings.AREA_RESOLVER_CACHE_SIZE
+        self._cache: "OrderedDict[str, Optional[AdminArea]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def clear(self):
+        """Forget every name, e.g. after the locations table changed."""
+        with self._lock:
+            self._cache.clear()
+
+    def resolve(self, db: Session, names: Iterable[str]) -> Dict[str, AdminArea]:
+        """Normalized name -> area for every name that matched a location."""
+        keys = {normalize_name(name) for name in names} - {""}
+        found: Dict[str, Optional[AdminArea]] = {}
+        with self._lock:
+            for key in keys:
+                area = self._cache.get(key, _MISSING)
+                if area is not _MISSING:
+                    self._cache.move_to_end(key)
+                    found[key] = area
+
+        misses = keys - found.keys()
+        if misses:
+            resolved = self._exact(db, misses)
+            unmatched = misses - resolved.keys()
+            if unmatched:
+                resolved.update(self._similar(db, unmatched))
+            with self._lock:
+                for key in misses:
+                    self._cache[key] = found[key] = resolved.get(key)
+                while len(self._cache) > self.max_size:
+                    self._cache.popitem(last=False)
+        return {key: area for key, area in found.items() if area is not None}
+
+    def place(self, db: Session, outages: List) -> int:
+        """Set location_id and admin codes on outage rows (dicts or models).
+
+        An outage is placed at the first of its `areas` that resolves.
+        Returns how many were placed.
+        """
+        resolved = self.resolve(
+            db, (name for outage in outages for name in _areas(outage))
+        )
+        placed = 0
+        for outage in outages:
+            area = next(
+                (
+                    resolved[key]
+                    for key in map(normalize_name, _areas(outage))
+                    if key in resolved
+                ),
+                None,
+            )
+            if area is None:
+                if isinstance(outage, dict):
+                    # executemany needs the same keys on every row
+                    for field in ("location_id", *CODE_FIELDS):
+                        outage.setdefault(field, None)
+                continue
+            for field, value in area.fields().items():
+                if isinstance(outage, dict):
+                    outage[field] = value
+                else:
+                    setattr(outage, field, value)
+            placed += 1
+        return placed
+
+    def _exact(self, db: Session, keys: set) -> Dict[str, AdminArea]:
+        rows = (
+            db.query(
+                Location.id,
+                Location.name,
+                Location.name_kinyarwanda,
+                Location.level,
+                *(getattr(Location, field) for field in CODE_FIELDS),
+            )
+            .filter(
+                or_(
+                    func.lower(Location.name).in_(keys),
+                    func.lower(Location.name_kinyarwanda).in_(keys),
+                )
+            )
+            .all()
+        )
+        resolved: Dict[str, AdminArea] = {}
+        for row in rows:
+            area = _area(row)
+            for name in (row.name, row.name_kinyarwanda):
+                key = normalize_name(name)
+                # Homonyms resolve to the coarsest level, as in the gazetteer
+                if key in keys and (
+                    key not in resolved or _rank(area) < _rank(resolved[key])
+                ):
+                    resolved[key] = area
+        return resolved
+
+    def _similar(self, db: Session, keys: set) -> Dict[str, AdminArea]:
+        threshold = str(settings.LOCATION_TRGM_THRESHOLD)
+        db.execute(
+            text("SELECT set_config('pg_trgm.similarity_threshold', :value, true)"),
+            {"value": threshold},
+        )
+        db.execute(
+            text(
+                "SELECT set_config('pg_trgm.word_similarity_threshold', :value, true)"
+            ),
+            {"value": threshold},
+        )
+        rows = db.execute(SIMILAR_SQL, {"names": sorted(keys)}).all()
+        return {row.query: _area(row) for row in rows}
+
+    def backfill(self, db: Session, batch_size: int = 1000) -> int:
+        """Place outages stored before ingest-time resolution.
+
+        Their rollup facts move along in the same transaction: withdrawn
+        from the unplaced buckets, recorded under the new codes.
+        """
+        from app.reg.models.outage import Outage
+        from app.reg.services.rollup_service import outage_facts, record_facts
+
+        total = 0
+        last_id = None
+        while True:
+            query = db.query(
+                Outage.id,
+                Outage.areas,
+                Outage.outage_type,
+                Outage.reported_at,
+                Outage.resolved_at,
+                Outage.location_id,
+                Outage.district_code,
+                Outage.sector_code,
+            ).filter(Outage.location_id.is_(None))
+            if last_id is not None:
+                query = query.filter(Outage.id > last_id)
+            rows = query.order_by(Outage.id).limit(batch_size).all()
+            if not rows:
+                return total
+            last_id = rows[-1].id
+
+            before = {row.id: row._asdict() for row in rows}
+            placed = [row._asdict() for row in rows]
+            self.place(db, placed)
+            placed = [row for row in placed if row["location_id"] is not None]
+            if placed:
+                record_facts(
+                    db,
+                    outage_facts(db, [before[row["id"]] for row in placed]),
+                    sign=-1,
+                )
+                record_facts(db, outage_facts(db, placed))
+                columns = ("id", "location_id", *CODE_FIELDS)
+                db.execute(
+                    update(Outage),
+                    [{column: row[column] for column in columns} for row in placed],
+                )
+            db.commit()
+            total += len(placed)
+
+
+def _areas(outage) -> List[str]:
+    areas = outage.get("areas") if isinstance(outage, dict) else outage.areas
+    return areas or []
+
+
+# Best trigram match per name, all names in one round trip; served by the
+# GIN indexes of migration 9a3c5e7f1b24
+SIMILAR_SQL = text(
+    """
+    SELECT q.name AS query, l.*
+    FROM unnest(CAST(:names AS text[])) AS q(name)
+    CROSS JOIN LATERAL (
+        SELECT id, name, level, province_code, district_code, sector_code,
+               cell_code, village_code
+        FROM locations
+        WHERE lower(name) % q.name
+           OR lower(name_kinyarwanda) % q.name
+           OR q.name <% location_alias_text(aliases)
+        ORDER BY greatest(
+            similarity(lower(name), q.name),
+            coalesce(similarity(lower(name_kinyarwanda), q.name), 0),
+            coalesce(word_similarity(q.name, location_alias_text(aliases)), 0)
+        ) DESC
+        LIMIT 1
+    ) AS l
+    """
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Area name resolution commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+    backfill = commands.add_parser(
+        "backfill", help="Set location and admin codes on unplaced outages"
+    )
+    backfill.add_argument("--batch-size", type=int, default=1000)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    from app.db.session import SessionLocal
+
+    if args.command == "backfill":
+        with SessionLocal() as db:
+            count = AreaResolver().backfill(db, args.batch_size)
+            logger.info(f"Placed {count} outages")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -10,6 +10,13 @@ class Settings(BaseSettings):
     API_BASE_URL: str
 
     DATABASE_URL: str
+    # Derived from DATABASE_URL (asyncpg driver) when unset
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Comma-separated replica URLs serving get_read_db; empty reads the primary
+    READ_REPLICA_URLS: str = ""
+    READ_REPLICA_RETRY_SECONDS: int = 30
+    # Keep a client on the primary this long after it writes; 0 disables
+    READ_YOUR_WRITES_SECONDS: int = 0
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24
     CORS_ORIGINS: List[str] = ["*"]
 
@@ -22,6 +29,75 @@ class Settings(BaseSettings):
     TWITTER_API_LIMIT: int
     COOLDOWN_SECONDS: int
 
+    # NLP extraction
+    EXTRACTION_BATCH_SIZE: int = 64
+    EXTRACTION_N_PROCESS: int = 1
+    GAZETTEER_REFRESH_SECONDS: int = 300
+    # updated_at is the start time of the editing transaction: refreshes
+    # re-read this far behind their watermark to catch late commits
+    LOCATION_REFRESH_OVERLAP_SECONDS: int = 3600
+    # Fuzzy location search: pg_trgm similarity (0..1), rapidfuzz ratio (0..100)
+    LOCATION_TRGM_THRESHOLD: float = 0.3
+    LOCATION_FUZZY_CUTOFF: float = 60
+    # Extracted area name -> location memo entries, see AreaResolver
+    AREA_RESOLVER_CACHE_SIZE: int = 10000
+
+    # Embeddings
+    EMBEDDING_BACKEND: str = "torch"  # torch | onnx
+    EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
+    EMBEDDING_MODEL_PATH: Optional[str] = "/app/cached_model"
+    EMBEDDING_ONNX_PATH: str = "/app/onnx_model"
+    EMBEDDING_DIM: int = 384
+    # halfvec stores float16 components: half the table and index size
+    EMBEDDING_STORAGE: str = "vector"  # vector | halfvec
+    EMBEDDING_MAX_BATCH_SIZE: int = 32
+    EMBEDDING_MAX_WAIT_MS: float = 5.0
+    EMBEDDING_WORKERS: int = 1
+    EMBEDDING_THREADS: Optional[int] = None  # torch / onnxruntime intra-op
+    EMBEDDING_CACHE_SIZE: int = 10000
+    EMBEDDING_CACHE_PERSISTENT: bool = True
+    # inline: encode before the INSERT; deferred: a background embedder fills
+    # pending (NULL) embeddings in batches
+    EMBEDDING_MODE: str = "inline"  # inline | deferred
+    EMBEDDING_DEFERRED_BATCH_SIZE: int = 64
+    EMBEDDING_DEFERRED_POLL_SECONDS: float = 2.0
+
+    # HNSW vector indexes and similarity search
+    VECTOR_INDEX_M: int = 16
+    VECTOR_INDEX_EF_CONSTRUCTION: int = 64
+    VECTOR_SEARCH_EF: int = 40  # hnsw.ef_search, overridable per query
+    VECTOR_SEARCH_MAX_K: int = 100
+    # hnsw.iterative_scan (pgvector >= 0.8), e.g. relaxed_order, so filtered
+    # searches keep scanning until enough rows pass the filter
+    VECTOR_SEARCH_ITERATIVE_SCAN: Optional[str] = None
+
+    # Near-duplicate clustering of outages and power issues into incidents
+    INCIDENT_WINDOW_MINUTES: int = 180
+    INCIDENT_MAX_DISTANCE: float = 0.15  # cosine distance to the incident centroid
+
+    # Radius / bounding-box lookups of citizen issues
+    SPATIAL_MAX_RADIUS_M: int = 50000
+    SPATIAL_MAX_LIMIT: int = 500
+
+    # Hourly / daily rollups: day boundaries are taken in this zone
+    ROLLUP_TIMEZONE: str = "Africa/Kigali"
+
+    # Monthly range partitioning, see app/db/partitions.py. Comma-separated
+    # subset of outages,posts; applied by the migrations.
+    PARTITIONED_TABLES: str = ""
+    PARTITION_MONTHS_AHEAD: int = 3
+    PARTITION_RETENTION_MONTHS: int = 0  # 0 keeps every partition
+    PARTITION_ARCHIVE_DIR: Optional[str] = None  # detach only when unset
+
+    # Post work queue: a claim expires after the lease, a post is given up
+    # (processed, with its error) after POST_QUEUE_MAX_ATTEMPTS claims
+    POST_QUEUE_LEASE_SECONDS: int = 300
+    POST_QUEUE_MAX_ATTEMPTS: int = 5
+
+    # Keyset-paginated list endpoints
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 200
+
     class Config:
         env_file = ".env"
 
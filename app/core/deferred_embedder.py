@@ -0,0 +1,97 @@
+import logging
+import threading
+from typing import Callable, List, NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+
+
+logger = logging.getLogger(__name__)
+
+
+class PendingTable(NamedTuple):
+    model: type
+    text: Callable  # row -> text to embed
+    on_embedded: Optional[Callable]  # (db, rows) -> None, before the commit
+
+
+class PendingEmbedder:
+    """Fills embeddings left NULL by the create paths in deferred mode.
+
+    Each pass claims up to `batch_size` pending rows per table with
+    `FOR UPDATE SKIP LOCKED`, so several app instances can run an embedder
+    without encoding the same row twice, encodes them in one batch and
+    writes the vectors back in the same transaction.
+    """
+
+    def __init__(self, embedding_service, session_factory, batch_size: int = 64):
+        self.embedding_service = embedding_service
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self._tables: List[PendingTable] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, model, text: Callable, on_embedded: Optional[Callable] = None):
+        self._tables.append(PendingTable(model, text, on_embedded))
+
+    def run_once(self) -> int:
+        """Embed one batch per table; returns the number of rows filled."""
+        filled = 0
+        for table in self._tables:
+            with self.session_factory() as db:
+                try:
+                    filled += self._embed_batch(db, table)
+                except Exception:
+                    db.rollback()
+                    logger.error(
+                        f"Deferred embedding of {table.model.__tablename__} failed",
+                        exc_info=True,
+                    )
+        return filled
+
+    def _embed_batch(self, db: Session, table: PendingTable) -> int:
+        model = table.model
+        rows = (
+            db.query(model)
+            .filter(model.embedding.is_(None))
+            .order_by(model.created_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not rows:
+            db.rollback()
+            return 0
+
+        vectors = self.embedding_service.embed_many([table.text(row) for row in rows])
+        for row, vector in zip(rows, vectors):
+            row.embedding = vector
+        # Flushed as one executemany UPDATE per table
+        db.flush()
+        if table.on_embedded:
+            table.on_embedded(db, rows)
+        db.commit()
+        return len(rows)
+
+    def run_forever(self, poll_seconds: float = 2.0):
+        """Drain the backlog, then poll until stopped."""
+        while not self._stop.is_set():
+            # A full batch means more rows are probably waiting
+            if self.run_once() < self.batch_size:
+                self._stop.wait(poll_seconds)
+
+    def start(self, poll_seconds: float = 2.0):
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.run_forever,
+            args=(poll_seconds,),
+            name="pending-embedder",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
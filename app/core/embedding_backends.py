@@ -0,0 +1,249 @@
+import argparse
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_QUANTIZED_MODEL_FILE = "model_quantized.onnx"
+
+
+class TorchBackend:
+    """Full-precision SentenceTransformer on PyTorch."""
+
+    name = "torch"
+
+    def __init__(
+        self, model_name_or_path: str, model_id: str, threads: Optional[int] = None
+    ):
+        from sentence_transformers import SentenceTransformer
+
+        if threads:
+            import torch
+
+            torch.set_num_threads(threads)
+
+        self.model = SentenceTransformer(model_name_or_path)
+        self.model_id = model_id
+        self.dimension = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        return self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+
+
+class OnnxBackend:
+    """ONNX Runtime export of the same model, int8-quantized when available.
+
+    Reproduces the SentenceTransformer head of all-MiniLM-L6-v2: mean
+    pooling over the attention mask followed by L2 normalization.
+    """
+
+    name = "onnx"
+
+    def __init__(
+        self,
+        path: str,
+        model_id: str,
+        threads: Optional[int] = None,
+        max_length: int = 256,
+    ):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_file = os.path.join(path, ONNX_QUANTIZED_MODEL_FILE)
+        quantized = os.path.exists(model_file)
+        if not quantized:
+            model_file = os.path.join(path, ONNX_MODEL_FILE)
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            model_file, options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(path, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+
+        # Quantized vectors differ slightly: keep them apart in the cache
+        self.model_id = f"{model_id}+onnx{'-int8' if quantized else ''}"
+        self.dimension = self.session.get_outputs()[0].shape[-1]
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start : start + batch_size])
+            feeds = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": np.array(
+                    [e.attention_mask for e in encodings], dtype=np.int64
+                ),
+                "token_type_ids": np.array(
+                    [e.type_ids for e in encodings], dtype=np.int64
+                ),
+            }
+            feeds = {name: feeds[name] for name in self._input_names}
+            hidden = self.session.run(None, feeds)[0]
+
+            mask = feeds["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            batches.append(pooled / np.clip(norms, 1e-12, None))
+
+        if not batches:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return np.vstack(batches).astype(np.float32)
+
+
+def load_embedding_backend(settings):
+    """Build the backend selected by EMBEDDING_BACKEND."""
+    if settings.EMBEDDING_BACKEND == "onnx":
+        backend = OnnxBackend(
+            settings.EMBEDDING_ONNX_PATH,
+            settings.EMBEDDING_MODEL,
+            threads=settings.EMBEDDING_THREADS,
+        )
+    elif settings.EMBEDDING_BACKEND == "torch":
+        # Use the cached model from the Docker layer, else download it
+        path = settings.EMBEDDING_MODEL_PATH
+        backend = TorchBackend(
+            path if path and os.path.exists(path) else settings.EMBEDDING_MODEL,
+            settings.EMBEDDING_MODEL,
+            threads=settings.EMBEDDING_THREADS,
+        )
+    else:
+        raise ValueError(f"Unknown embedding backend: {settings.EMBEDDING_BACKEND}")
+
+    if backend.dimension != settings.EMBEDDING_DIM:
+        raise ValueError(
+            f"{backend.name} backend produces {backend.dimension}-dim vectors, "
+            f"embedding columns hold {settings.EMBEDDING_DIM}"
+        )
+    logger.info(f"Embedding backend: {backend.name} ({backend.model_id})")
+    return backend
+
+
+def export_onnx(model_name_or_path: str, output_dir: str, quantize: bool = True) -> str:
+    """Export the transformer to ONNX (and an int8 copy) with its tokenizer."""
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name_or_path)
+    model = AutoModel.from_pretrained(model_name_or_path).eval()
+
+    sample = tokenizer(["Umuriro wabuze i Kicukiro"], return_tensors="pt")
+    input_names = list(sample.keys())
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    model_file = os.path.join(output_dir, ONNX_MODEL_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            model_file,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+        )
+    tokenizer.save_pretrained(output_dir)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(
+            model_file,
+            os.path.join(output_dir, ONNX_QUANTIZED_MODEL_FILE),
+            weight_type=QuantType.QInt8,
+        )
+    return output_dir
+
+
+def compare_backends(
+    reference, candidate, texts: List[str], batch_size: int = 32, rounds: int = 3
+) -> Dict:
+    """Cosine parity of `candidate` against `reference` and encode throughput."""
+    expected = reference.encode(texts, batch_size=batch_size)
+    actual = candidate.encode(texts, batch_size=batch_size)
+    cosine = np.sum(expected * actual, axis=1) / (
+        np.linalg.norm(expected, axis=1) * np.linalg.norm(actual, axis=1)
+    )
+
+    def throughput(backend) -> float:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            backend.encode(texts, batch_size=batch_size)
+        return rounds * len(texts) / (time.perf_counter() - started)
+
+    reference_rate = throughput(reference)
+    candidate_rate = throughput(candidate)
+    return {
+        "texts": len(texts),
+        "cosine_min": float(cosine.min()),
+        "cosine_mean": float(cosine.mean()),
+        f"{reference.name}_texts_per_second": reference_rate,
+        f"{candidate.name}_texts_per_second": candidate_rate,
+        "speedup": candidate_rate / reference_rate,
+    }
+
+
+def _sample_texts(path: str) -> List[str]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    tweets = data.get("tweets", []) if isinstance(data, dict) else data
+    return [tweet["text"] for tweet in tweets if tweet.get("text")]
+
+
+# Full hub id: transformers' Auto* classes do not expand the short
+# sentence-transformers names
+DEFAULT_EXPORT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding backend tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Export the model to (int8) ONNX")
+    export.add_argument("--model", default=DEFAULT_EXPORT_MODEL)
+    export.add_argument("--output", required=True)
+    export.add_argument("--no-quantize", action="store_true")
+
+    compare = commands.add_parser(
+        "compare", help="Parity and throughput of ONNX against torch"
+    )
+    compare.add_argument("--model", default=DEFAULT_EXPORT_MODEL)
+    compare.add_argument("--onnx-path", required=True)
+    compare.add_argument("--texts", default="tweets_example.json")
+    compare.add_argument("--batch-size", type=int, default=32)
+    compare.add_argument("--threads", type=int, default=None)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "export":
+        print(export_onnx(args.model, args.output, quantize=not args.no_quantize))
+    elif args.command == "compare":
+        texts = _sample_texts(args.texts)
+        # Repeat the sample so timings are not dominated by a single batch
+        texts = (texts * (256 // max(len(texts), 1) + 1))[:256]
+        reference = TorchBackend(args.model, args.model, threads=args.threads)
+        candidate = OnnxBackend(args.onnx_path, args.model, threads=args.threads)
+        print(
+            json.dumps(
+                compare_backends(reference, candidate, texts, args.batch_size), indent=2
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+from sqlalchemy.dialects.postgresql import insert
+
+from app.db.embedding_cache import EmbeddingCacheEntry
+
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Unicode and whitespace normalization applied before hashing."""
+    return " ".join(unicodedata.normalize("NFKC", text or "").split())
+
+
+class EmbeddingCache:
+    """Content-addressed embedding cache: bounded in-process LRU in front of
+    the `embedding_cache` table.
+
+    Keys hash the model identity together with the normalized text, so
+    templated replies and re-synced tweets are only ever encoded once per
+    model.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        max_entries: int = 10000,
+        session_factory=None,
+    ):
+        self.model_id = model_id
+        self.max_entries = max_entries
+        self.session_factory = session_factory
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    def key(self, text: str) -> str:
+        payload = f"{self.model_id}\x00{normalize_text(text)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Memory tier only; cheap enough to call on the request thread."""
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+            return vector
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Look keys up in memory, then the missing ones in one query."""
+        found = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            vector = self.get(key)
+            if vector is None:
+                missing.append(key)
+            else:
+                found[key] = vector
+
+        if missing and self.session_factory:
+            try:
+                with self.session_factory() as db:
+                    rows = (
+                        db.query(EmbeddingCacheEntry.key, EmbeddingCacheEntry.embedding)
+                        .filter(EmbeddingCacheEntry.key.in_(missing))
+                        .all()
+                    )
+            except Exception:
+                logger.warning("Embedding cache lookup failed", exc_info=True)
+                rows = []
+            for key, embedding in rows:
+                found[key] = embedding
+            self._remember(
+                {key: embedding for key, embedding in found.items() if key in missing}
+            )
+            with self._lock:
+                self.persistent_hits += len(rows)
+
+        with self._lock:
+            self.misses += len(missing) - sum(1 for key in missing if key in found)
+        return found
+
+    def put_many(self, vectors: Dict[str, np.ndarray]):
+        """Store freshly computed vectors in both tiers."""
+        if not vectors:
+            return
+        self._remember(vectors)
+
+        if self.session_factory:
+            try:
+                with self.session_factory() as db:
+                    db.execute(
+                        insert(EmbeddingCacheEntry)
+                        .values(
+                            [
+                                {
+                                    "key": key,
+                                    "model": self.model_id,
+                                    "embedding": vector,
+                                }
+                                for key, vector in vectors.items()
+                            ]
+                        )
+                        .on_conflict_do_nothing(index_elements=["key"])
+                    )
+                    db.commit()
+            except Exception:
+                logger.warning("Embedding cache write failed", exc_info=True)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.memory_hits + self.persistent_hits + self.misses
+            return {
+                "model": self.model_id,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "memory_hits": self.memory_hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "hit_rate": (
+                    (self.memory_hits + self.persistent_hits) / lookups
+                    if lookups
+                    else 0.0
+                ),
+            }
+
+    def _remember(self, vectors: Dict[str, np.ndarray]):
+        with self._lock:
+            for key, vector in vectors.items():
+                self._entries[key] = vector
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
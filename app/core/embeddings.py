@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional
+
+import numpy as np
+
+from app.core.embedding_cache import EmbeddingCache
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingService:
+    """Coalesces concurrent embedding requests into batched `encode` calls.
+
+    Callers get a future per text. Worker threads take the first queued
+    request, keep collecting for up to `max_wait_ms` or until
+    `max_batch_size` texts are waiting, then run one forward pass for the
+    whole batch. With a cache, texts already seen (in memory or in the
+    persistent tier) never reach the model. Vectors come back as 1-d NumPy
+    arrays of `dtype`, the dtype the embedding columns are stored in.
+    """
+
+    def __init__(
+        self,
+        model,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        workers: int = 1,
+        cache: Optional[EmbeddingCache] = None,
+        dtype=np.float32,
+    ):
+        self.model = model
+        self.cache = cache
+        self.dtype = dtype
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue" = queue.Queue()
+        self._workers = [
+            threading.Thread(target=self._run, name=f"embedder-{i}", daemon=True)
+            for i in range(max(workers, 1))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, text: str) -> Future:
+        """Queue a text for the next batch."""
+        future = Future()
+        key = self.cache.key(text) if self.cache else text
+        vector = self.cache.get(key) if self.cache else None
+        if vector is not None:
+            future.set_result(vector)
+        else:
+            self._queue.put((text, key, future))
+        return future
+
+    async def embed(self, text: str) -> np.ndarray:
+        return await asyncio.wrap_future(self.submit(text))
+
+    def embed_sync(self, text: str) -> np.ndarray:
+        return self.submit(text).result()
+
+    def embed_many(self, texts: List[str]) -> List[np.ndarray]:
+        """Embed a list of texts; they are batched like concurrent requests."""
+        futures = [self.submit(text) for text in texts]
+        return [future.result() for future in futures]
+
+    def close(self):
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = (
+                        self._queue.get(timeout=timeout)
+                        if timeout > 0
+                        else self._queue.get_nowait()
+                    )
+                except queue.Empty:
+                    break
+                if item is None:
+                    # Shutting down: finish this batch, then let the loop exit
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+
+            self._encode(batch)
+
+    def _encode(self, batch):
+        batch = [
+            (text, key, future)
+            for text, key, future in batch
+            if future.set_running_or_notify_cancel()
+        ]
+        if not batch:
+            return
+        try:
+            cached = (
+                self.cache.get_many(key for _, key, _ in batch) if self.cache else {}
+            )
+            # Identical texts in a batch are encoded once
+            pending = {key: text for text, key, _ in batch if key not in cached}
+            computed = {}
+            if pending:
+                vectors = self.model.encode(
+                    list(pending.values()), batch_size=len(pending)
+                )
+                # Copies, so cached rows do not pin the whole batch array
+                vectors = np.asarray(vectors, dtype=self.dtype)
+                computed = {key: vector.copy() for key, vector in zip(pending, vectors)}
+                if self.cache:
+                    self.cache.put_many(computed)
+        except Exception as e:
+            logger.error("Embedding batch failed", exc_info=True)
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        for _, key, future in batch:
+            future.set_result(cached[key] if key in cached else computed[key])
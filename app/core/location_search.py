@@ -0,0 +1,291 @@
+import argparse
+import logging
+import random
+import re
+import string
+import threading
+import time
+import unicodedata
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID, uuid4
+
+from rapidfuzz import fuzz, process
+from sqlalchemy import func, literal, text
+from sqlalchemy.orm import Session
+
+from app.core.config import Settings
+from app.reg.models.location import Location
+from app.reg.twitter.gazetteer import Watermark
+
+
+settings = Settings()
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Lowercase, accents stripped, punctuation folded into single spaces."""
+    if not name:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _NON_WORD.sub(" ", stripped.lower()).strip()
+
+
+def trigram_search(
+    db: Session, query: str, limit: int = 10, threshold: float = None
+) -> List[Tuple[Location, float]]:
+    """(location, similarity 0..1) best first, served by the pg_trgm GIN indexes.
+
+    Names and Kinyarwanda names match on `similarity`, aliases on
+    `word_similarity` against all aliases of a row.
+    """
+    normalized = normalize_name(query)
+    if not normalized:
+        return []
+    threshold = settings.LOCATION_TRGM_THRESHOLD if threshold is None else threshold
+    db.execute(
+        text("SELECT set_config('pg_trgm.similarity_threshold', :value, true)"),
+        {"value": str(threshold)},
+    )
+    db.execute(
+        text("SELECT set_config('pg_trgm.word_similarity_threshold', :value, true)"),
+        {"value": str(threshold)},
+    )
+    term = literal(normalized)
+    name = func.lower(Location.name)
+    name_kinyarwanda = func.lower(Location.name_kinyarwanda)
+    # Immutable wrapper the alias index is built on, see migration 9a3c5e7f1b24
+    aliases = func.location_alias_text(Location.aliases)
+    score = func.greatest(
+        func.similarity(name, term),
+        func.coalesce(func.similarity(name_kinyarwanda, term), 0),
+        func.coalesce(func.word_similarity(term, aliases), 0),
+    ).label("score")
+    return (
+        db.query(Location, score)
+        .filter(
+            name.op("%")(term) | name_kinyarwanda.op("%")(term) | term.op("<%")(aliases)
+        )
+        .order_by(score.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+class FuzzyLocationIndex:
+    """Normalized names, Kinyarwanda names and aliases of every location,
+    matched in-process with rapidfuzz.
+
+    `process.extract` scores the whole name array in C, so a lookup costs
+    a few milliseconds at tens of thousands of names, without a database
+    round trip. Refreshed incrementally like the gazetteer.
+    """
+
+    def __init__(self):
+        self._names: Dict[UUID, Tuple[str, ...]] = {}
+        self._choices: List[str] = []
+        self._owners: List[UUID] = []
+        self._watermark = Watermark()
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def refresh(self, db: Session) -> int:
+        """Load rows changed since the last refresh and rebuild the arrays."""
+        query = db.query(
+            Location.id,
+            Location.name,
+            Location.name_kinyarwanda,
+            Location.aliases,
+            Location.updated_at,
+        )
+        rows = self._watermark.advance(self._watermark.filter(query).all())
+
+        names = dict(self._names)
+        for row in rows:
+            names[row.id] = tuple(
+                {
+                    normalize_name(name)
+                    for name in (row.name, row.name_kinyarwanda, *(row.aliases or []))
+                }
+                - {""}
+            )
+
+        removed = 0
+        total = db.query(func.count(Location.id)).scalar()
+        if total != len(names):
+            existing = {location_id for (location_id,) in db.query(Location.id)}
+            for location_id in set(names) - existing:
+                del names[location_id]
+                removed += 1
+
+        if rows or removed or not self._loaded:
+            self.load(names)
+            logger.info(
+                f"Fuzzy location index refreshed {len(rows)} locations "
+                f"({len(self)} total)"
+            )
+        return len(rows)
+
+    def load(self, names: Dict[UUID, Sequence[str]]):
+        """Replace the index with already-normalized names per location."""
+        choices, owners = [], []
+        for location_id, location_names in names.items():
+            for name in location_names:
+                choices.append(name)
+                owners.append(location_id)
+        with self._lock:
+            self._names = {key: tuple(value) for key, value in names.items()}
+            self._choices = choices
+            self._owners = owners
+            self._loaded = True
+
+    def search(
+        self, query: str, limit: int = 10, score_cutoff: float = None
+    ) -> List[Tuple[UUID, float]]:
+        """(location id, score 0..100) best first, one entry per location."""
+        normalized = normalize_name(query)
+        if not normalized:
+            return []
+        score_cutoff = (
+            settings.LOCATION_FUZZY_CUTOFF if score_cutoff is None else score_cutoff
+        )
+        with self._lock:
+            choices, owners = self._choices, self._owners
+        # Locations have several names: over-fetch, then keep each one's best
+        found = process.extract(
+            normalized,
+            choices,
+            scorer=fuzz.ratio,
+            processor=None,
+            limit=limit * 4,
+            score_cutoff=score_cutoff,
+        )
+        best: Dict[UUID, float] = {}
+        for _, score, index in found:
+            owner = owners[index]
+            if score > best.get(owner, -1):
+                best[owner] = score
+        return sorted(best.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+def _scan_all(
+    rows: Sequence[Tuple[str, Optional[str], Sequence[str]]], query: str, limit: int
+) -> List[int]:
+    """The former LocationService fallback: one Python ratio per name."""
+    matches = []
+    for position, (name, name_kinyarwanda, aliases) in enumerate(rows):
+        score = fuzz.ratio(query.lower(), name.lower())
+        if name_kinyarwanda:
+            score = max(score, fuzz.ratio(query.lower(), name_kinyarwanda.lower()))
+        for alias in aliases or ():
+            score = max(score, fuzz.ratio(query.lower(), alias.lower()))
+        if score > 60:
+            matches.append((position, score))
+    matches.sort(key=lambda match: match[1], reverse=True)
+    return [position for position, _ in matches[:limit]]
+
+
+def _timed(search: Callable[[str], object], queries: List[str]) -> float:
+    started = time.perf_counter()
+    for query in queries:
+        search(query)
+    return (time.perf_counter() - started) / len(queries) * 1000
+
+
+def _synthetic_names(count: int, seed: int = 7) -> List[Tuple[str, str, List[str]]]:
+    rng = random.Random(seed)
+    syllables = ["ki", "ga", "ru", "nya", "mu", "bu", "re", "ko", "ndi", "gi", "sa"]
+
+    def word():
+        return "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4)))
+
+    return [
+        (word().title(), word(), [word() for _ in range(rng.randint(0, 2))])
+        for _ in range(count)
+    ]
+
+
+def _misspell(name: str, rng: random.Random) -> str:
+    position = rng.randrange(len(name))
+    return name[:position] + rng.choice(string.ascii_lowercase) + name[position + 1 :]
+
+
+def benchmark(locations: int, queries: int, use_db: bool) -> Dict[str, float]:
+    """Mean milliseconds per misspelled lookup for each search strategy."""
+    rng = random.Random(11)
+    if use_db:
+        from app.db.session import SessionLocal
+
+        with SessionLocal() as db:
+            rows = [
+                (row.name, row.name_kinyarwanda, row.aliases or [])
+                for row in db.query(
+                    Location.name, Location.name_kinyarwanda, Location.aliases
+                )
+            ]
+    else:
+        rows = _synthetic_names(locations)
+    lookups = [_misspell(rng.choice(rows)[0], rng) for _ in range(queries)]
+
+    index = FuzzyLocationIndex()
+    index.load(
+        {
+            uuid4(): tuple(
+                {normalize_name(n) for n in (name, kinyarwanda, *aliases)} - {""}
+            )
+            for name, kinyarwanda, aliases in rows
+        }
+    )
+    results = {
+        "rows": len(rows),
+        "full_scan_ms": _timed(lambda query: _scan_all(rows, query, 10), lookups),
+        "rapidfuzz_index_ms": _timed(lambda query: index.search(query), lookups),
+    }
+    if use_db:
+        from app.db.session import SessionLocal
+
+        with SessionLocal() as db:
+            results["pg_trgm_ms"] = _timed(
+                lambda query: trigram_search(db, query), lookups
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzzy location search")
+    commands = parser.add_subparsers(dest="command", required=True)
+    bench = commands.add_parser(
+        "benchmark", help="Compare the search strategies on misspelled names"
+    )
+    bench.add_argument("--locations", type=int, default=15000)
+    bench.add_argument("--queries", type=int, default=200)
+    bench.add_argument(
+        "--db",
+        action="store_true",
+        help="use the locations table (and time pg_trgm) instead of synthetic names",
+    )
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "benchmark":
+        results = benchmark(args.locations, args.queries, args.db)
+        for name, value in results.items():
+            print(
+                f"{name}: {value:.3f}"
+                if isinstance(value, float)
+                else f"{name}: {value}"
+            )
+
+
+if __name__ == "__main__":
+    main()
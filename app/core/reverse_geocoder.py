@@ -0,0 +1,294 @@
+import argparse
+import logging
+import threading
+from types import SimpleNamespace
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+import shapely
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.reg.models.location import Location
+from app.reg.twitter.gazetteer import LEVELS, GazetteerEntry, Watermark
+
+
+logger = logging.getLogger(__name__)
+
+CODE_FIELDS = (
+    "province_code",
+    "district_code",
+    "sector_code",
+    "cell_code",
+    "village_code",
+)
+
+
+class AdminArea(NamedTuple):
+    """Finest location containing a point, with its full code chain."""
+
+    location_id: UUID
+    name: str
+    level: Optional[str]
+    codes: Tuple[Optional[str], ...]  # province .. village code
+
+    def fields(self) -> Dict:
+        """Column values for a row using the AdminCodes mixin."""
+        return {"location_id": self.location_id, **dict(zip(CODE_FIELDS, self.codes))}
+
+
+def _finest(entries: Sequence[GazetteerEntry]) -> Optional[AdminArea]:
+    if not entries:
+        return None
+    entry = max(entries, key=lambda e: e.rank if e.rank < len(LEVELS) else -1)
+    return AdminArea(entry.id, entry.name, entry.level, entry.codes)
+
+
+class ReverseGeocoder:
+    """Point -> administrative area over the `Location.boundary` polygons.
+
+    Boundaries are kept in memory as prepared Shapely geometries behind an
+    STRtree, so a lookup is a tree query plus a few prepared
+    point-in-polygon tests, with no database round trip. Until the first
+    refresh, lookups given a session fall back to a PostGIS query served by
+    the GiST index on `boundary`.
+    """
+
+    def __init__(self):
+        self._entries: Dict[UUID, GazetteerEntry] = {}
+        self._geometries: Dict[UUID, shapely.Geometry] = {}
+        self._tree: Optional[shapely.STRtree] = None
+        self._tree_ids: List[UUID] = []
+        self._watermark = Watermark()
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def refresh(self, db: Session) -> int:
+        """Load boundaries changed since the last refresh and rebuild the tree."""
+        query = db.query(
+            Location.id,
+            Location.name,
+            Location.level,
+            Location.province_code,
+            Location.district_code,
+            Location.sector_code,
+            Location.cell_code,
+            Location.village_code,
+            Location.updated_at,
+            func.ST_AsBinary(Location.boundary).label("boundary"),
+        ).filter(Location.boundary.isnot(None))
+        rows = self._watermark.advance(self._watermark.filter(query).all())
+
+        entries = dict(self._entries)
+        geometries = dict(self._geometries)
+        for row in rows:
+            geometry = shapely.from_wkb(bytes(row.boundary))
+            shapely.prepare(geometry)
+            entries[row.id] = GazetteerEntry(
+                id=row.id,
+                name=row.name,
+                level=row.level,
+                codes=tuple(getattr(row, field) for field in CODE_FIELDS),
+            )
+            geometries[row.id] = geometry
+
+        removed = 0
+        total = (
+            db.query(func.count(Location.id))
+            .filter(Location.boundary.isnot(None))
+            .scalar()
+        )
+        if total != len(entries):
+            existing = {
+                location_id
+                for (location_id,) in db.query(Location.id).filter(
+                    Location.boundary.isnot(None)
+                )
+            }
+            for location_id in set(entries) - existing:
+                del entries[location_id]
+                del geometries[location_id]
+                removed += 1
+
+        if rows or removed or not self._loaded:
+            # STRtree is immutable: rebuild it, then swap everything at once
+            tree_ids = list(geometries)
+            tree = shapely.STRtree([geometries[id_] for id_ in tree_ids])
+            with self._lock:
+                self._entries = entries
+                self._geometries = geometries
+                self._tree = tree
+                self._tree_ids = tree_ids
+                self._loaded = True
+            logger.info(
+                f"Reverse geocoder refreshed {len(rows)} boundaries ({len(self)} total)"
+            )
+        return len(rows)
+
+    def resolve(
+        self, lat: float, lng: float, db: Optional[Session] = None
+    ) -> Optional[AdminArea]:
+        """Finest area containing the point; None outside every boundary."""
+        if not self._loaded:
+            return self.resolve_db(db, lat, lng) if db is not None else None
+        return self.resolve_many([(lat, lng)])[0]
+
+    def resolve_many(
+        self, points: Sequence[Tuple[float, float]]
+    ) -> List[Optional[AdminArea]]:
+        """Resolve (lat, lng) points with one bulk tree query."""
+        with self._lock:
+            tree, tree_ids, entries = self._tree, self._tree_ids, self._entries
+        if tree is None or not points:
+            return [None] * len(points)
+
+        coords = np.asarray(points, dtype=float)
+        geoms = shapely.points(coords[:, 1], coords[:, 0])
+        # Envelope candidates from the tree, then exact tests against the
+        # prepared polygons; `covers` keeps points on a shared border
+        point_idx, tree_idx = tree.query(geoms)
+        polygons = tree.geometries.take(tree_idx)
+        inside = shapely.covers(polygons, geoms.take(point_idx))
+        point_idx, tree_idx = point_idx[inside], tree_idx[inside]
+
+        hits: List[List[GazetteerEntry]] = [[] for _ in points]
+        for i, j in zip(point_idx, tree_idx):
+            hits[i].append(entries[tree_ids[j]])
+        return [_finest(found) for found in hits]
+
+    def resolve_db(self, db: Session, lat: float, lng: float) -> Optional[AdminArea]:
+        """Cold-start fallback through the GiST index on `boundary`."""
+        # Uncorrelated, so evaluated once and the point stays index-friendly
+        srid = (
+            select(func.ST_SRID(Location.boundary))
+            .where(Location.boundary.isnot(None))
+            .limit(1)
+            .scalar_subquery()
+        )
+        point = func.ST_SetSRID(func.ST_MakePoint(lng, lat), srid)
+        rows = (
+            db.query(
+                Location.id,
+                Location.name,
+                Location.level,
+                *(getattr(Location, field) for field in CODE_FIELDS),
+            )
+            .filter(
+                Location.boundary.isnot(None),
+                func.ST_Covers(Location.boundary, point),
+            )
+            .all()
+        )
+        return _finest(
+            [
+                GazetteerEntry(
+                    id=row.id,
+                    name=row.name,
+                    level=row.level,
+                    codes=tuple(getattr(row, field) for field in CODE_FIELDS),
+                )
+                for row in rows
+            ]
+        )
+
+    def admin_fields(
+        self, lat: Optional[float], lng: Optional[float], db: Optional[Session] = None
+    ) -> Dict:
+        """location_id and admin codes for a report, {} when unresolved."""
+        if lat is None or lng is None:
+            return {}
+        area = self.resolve(lat, lng, db=db)
+        return area.fields() if area else {}
+
+
+def backfill_admin_codes(
+    db: Session, geocoder: ReverseGeocoder, model, batch_size: int = 1000
+) -> int:
+    """Resolve rows of `model` that have a position but no location yet.
+
+    Power issues also move their rollup facts to the new codes, in the
+    same transaction.
+    """
+    from app.reg.models.power_issue import PowerIssue
+    from app.reg.services.rollup_service import power_issue_facts, record_facts
+
+    rolled_up = model is PowerIssue
+    columns = [model.id, model.approx_lat, model.approx_long]
+    if rolled_up:
+        columns += [
+            model.issue_type,
+            model.created_at,
+            model.district_code,
+            model.sector_code,
+        ]
+    total = 0
+    last_id = None
+    while True:
+        query = db.query(*columns).filter(
+            model.location_id.is_(None),
+            model.approx_lat.isnot(None),
+            model.approx_long.isnot(None),
+        )
+        if last_id is not None:
+            query = query.filter(model.id > last_id)
+        rows = query.order_by(model.id).limit(batch_size).all()
+        if not rows:
+            return total
+        last_id = rows[-1].id
+
+        areas = geocoder.resolve_many(
+            [(row.approx_lat, row.approx_long) for row in rows]
+        )
+        updates = [
+            {"id": row.id, **area.fields()} for row, area in zip(rows, areas) if area
+        ]
+        if updates and rolled_up:
+            placed = {item["id"]: item for item in updates}
+            before = [row for row in rows if row.id in placed]
+            after = [
+                SimpleNamespace(**{**row._asdict(), **placed[row.id]}) for row in before
+            ]
+            record_facts(db, power_issue_facts(before), sign=-1)
+            record_facts(db, power_issue_facts(after))
+        if updates:
+            # Bulk UPDATE by primary key, one executemany per batch
+            db.execute(update(model), updates)
+        db.commit()
+        total += len(updates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reverse geocoding commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+    backfill = commands.add_parser(
+        "backfill", help="Set admin codes on issues reported before geocoding"
+    )
+    backfill.add_argument("--batch-size", type=int, default=1000)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    from app.db.session import SessionLocal
+    from app.reg.models.outage import Outage  # noqa: F401, maps Location.outages
+    from app.reg.models.power_issue import PowerIssue
+    from app.wasac.models.water_issue import WaterIssue
+
+    if args.command == "backfill":
+        geocoder = ReverseGeocoder()
+        with SessionLocal() as db:
+            geocoder.refresh(db)
+            for model in (PowerIssue, WaterIssue):
+                count = backfill_admin_codes(db, geocoder, model, args.batch_size)
+                logger.info(f"Geocoded {count} {model.__tablename__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,3 +13,13 @@ class BaseModel(Base):
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
+
+
+class AdminCodes:
+    """Codes of the administrative areas a row falls in, province to village."""
+
+    province_code = Column(String, nullable=True)
+    district_code = Column(String, nullable=True, index=True)
+    sector_code = Column(String, nullable=True, index=True)
+    cell_code = Column(String, nullable=True)
+    village_code = Column(String, nullable=True)
@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
-from db.session import get_db
+from app.db.session import get_db
+from app.db.unit_of_work import unit_of_work
 from app.reg.services.outage_service import OutageService
 from app.reg.services.location_service import LocationService
 from app.reg.services.post_service import PostService
@@ -11,9 +12,18 @@ class DatabaseManager:
     def __init__(self, db: Session = None):
         self.db = db or next(get_db())
         self.outage_service = OutageService(self.db)
-        self.location_service = LocationService(self.db)
+        # Share the process-wide indexes main.lifespan loads and refreshes
+        from app.dependencies import admin_hierarchy, location_index
+
+        self.location_service = LocationService(
+            self.db, fuzzy_index=location_index, hierarchy=admin_hierarchy
+        )
         self.post_service = PostService(self.db)
 
+    def batch(self):
+        """One flush and commit for the writes of every service inside it."""
+        return unit_of_work(self.db)
+
     def close(self):
         """Close database connection"""
         self.db.close()
@@ -27,7 +37,6 @@ class DatabaseManager:
 
 # Example usage
 if __name__ == "__main__":
-
     # Test the services
     with DatabaseManager() as db_manager:
         # Test location service
@@ -38,6 +47,6 @@ if __name__ == "__main__":
         stats = db_manager.outage_service.get_outage_stats()
         print(f"Outage stats: {stats}")
 
-        # Test tweet service
-        unprocessed = db_manager.tweet_service.get_unprocessed_tweets(limit=5)
-        print(f"Found {len(unprocessed)} unprocessed tweets")
+        # Test post service
+        unprocessed = db_manager.post_service.get_unprocessed_posts(limit=5)
+        print(f"Found {len(unprocessed)} unprocessed posts")
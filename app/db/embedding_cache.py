@@ -0,0 +1,17 @@
+from sqlalchemy import Column, DateTime, String
+from sqlalchemy.sql import func
+from app.db.vector_types import EmbeddingVector
+from app.db.session import Base
+
+
+class EmbeddingCacheEntry(Base):
+    __tablename__ = "embedding_cache"
+
+    # sha256 of model identity + normalized text
+    key = Column(String(64), primary_key=True)
+    model = Column(String, nullable=False)
+    embedding = Column(EmbeddingVector(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<EmbeddingCacheEntry(key={self.key}, model={self.model})>"
@@ -0,0 +1,531 @@
+import argparse
+import gzip
+import logging
+import os
+import re
+from datetime import date, datetime, timezone
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import text
+
+from app.core.config import Settings
+
+
+settings = Settings()
+logger = logging.getLogger(__name__)
+
+# Table -> the timestamp it is range-partitioned on, by month
+PARTITION_KEYS = {"outages": "reported_at", "posts": "tweet_created_at"}
+# Stand-ins for rows whose key is NULL when a table is converted; new rows
+# must carry the real key, see fill_partition_key
+KEY_FALLBACKS = {"posts": ("fetched_at", "created_at")}
+
+
+def partitioned_tables() -> List[str]:
+    """Tables PARTITIONED_TABLES asks to be partitioned."""
+    names = [name.strip() for name in settings.PARTITIONED_TABLES.split(",")]
+    unknown = set(filter(None, names)) - set(PARTITION_KEYS)
+    if unknown:
+        raise ValueError(f"Cannot partition: {', '.join(sorted(unknown))}")
+    return [name for name in names if name]
+
+
+def conflict_columns(table: str, *columns: str) -> Tuple[str, ...]:
+    """ON CONFLICT target for a unique key of `table`.
+
+    Unique constraints of a partitioned table must include the partition
+    key, so it is appended when the table is partitioned.
+    """
+    if table in partitioned_tables():
+        return (*columns, PARTITION_KEYS[table])
+    return columns
+
+
+def fill_partition_key(table: str, row: Dict) -> Dict:
+    """`row`, checked to carry its partition key when the table is partitioned.
+
+    The key is part of the table's unique keys there, so ON CONFLICT only
+    deduplicates when it is the row's own timestamp: a stand-in such as
+    now() would differ on every ingestion of the same tweet. Rows without
+    it are rejected with ValueError.
+    """
+    key = PARTITION_KEYS.get(table)
+    if key is None or row.get(key) is not None or table not in partitioned_tables():
+        return row
+    raise ValueError(f"{table} rows need {key} once the table is partitioned")
+
+
+def _month(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def is_partitioned(connection, table: str) -> bool:
+    return bool(
+        connection.execute(
+            text(
+                "SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = to_regclass(:table)"
+            ),
+            {"table": table},
+        ).scalar()
+    )
+
+
+def list_partitions(connection, table: str) -> List[Tuple[str, date]]:
+    """(name, month) of the monthly partitions of `table`, oldest first."""
+    names = connection.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits AS i "
+            "JOIN pg_class AS c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table)"
+        ),
+        {"table": table},
+    ).scalars()
+    pattern = re.compile(rf"^{re.escape(table)}_p(\d{{4}})_(\d{{2}})$")
+    months = []
+    for name in names:
+        match = pattern.match(name)
+        if match:
+            months.append((name, date(int(match[1]), int(match[2]), 1)))
+    return sorted(months, key=lambda item: item[1])
+
+
+def default_partition(table: str) -> str:
+    return f"{table}_default"
+
+
+def _bounds(month: date) -> str:
+    return (
+        f"FROM ('{month.isoformat()} 00:00+00') "
+        f"TO ('{_add_months(month, 1).isoformat()} 00:00+00')"
+    )
+
+
+def create_partition(connection, table: str, month: date, parent: str = None):
+    """Partition of `table` holding one calendar month (UTC)."""
+    connection.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} "
+            f"PARTITION OF {parent or table} FOR VALUES {_bounds(month)}"
+        )
+    )
+
+
+def _default_months(connection, table: str) -> Set[date]:
+    """Months (UTC) of the rows sitting in the default partition."""
+    default = default_partition(table)
+    exists = connection.execute(
+        text("SELECT to_regclass(:table)"), {"table": default}
+    ).scalar()
+    if not exists:
+        return set()
+    months = connection.execute(
+        text(
+            f"SELECT DISTINCT date_trunc('month', {PARTITION_KEYS[table]} "
+            f"AT TIME ZONE 'UTC') FROM {default}"
+        )
+    ).scalars()
+    return {month.date() for month in months}
+
+
+def split_default(connection, table: str, month: date):
+    """Move the rows of `month` out of the default partition into their own.
+
+    A month cannot be created while the default partition holds rows of
+    it, so the new partition is filled as a standalone table and attached
+    afterwards. Rows move between tables below the parent, so statement
+    triggers on the parent (outage_stats) do not count them again.
+    """
+    key = PARTITION_KEYS[table]
+    name = partition_name(table, month)
+    default = default_partition(table)
+    columns = ", ".join(_columns(connection, table))
+    # Writers routed to the default partition wait until the move commits
+    connection.execute(text(f"LOCK TABLE {default} IN EXCLUSIVE MODE"))
+    connection.execute(
+        text(
+            f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS "
+            "INCLUDING CONSTRAINTS INCLUDING STORAGE INCLUDING COMMENTS)"
+        )
+    )
+    connection.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {default} "
+            f"WHERE {key} >= '{month.isoformat()} 00:00+00' "
+            f"AND {key} < '{_add_months(month, 1).isoformat()} 00:00+00' "
+            f"RETURNING {columns}) "
+            f"INSERT INTO {name} ({columns}) SELECT {columns} FROM moved"
+        )
+    )
+    connection.execute(
+        text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES {_bounds(month)}")
+    )
+    logger.info(f"Moved the {month:%Y-%m} rows of {default} into {name}")
+
+
+def ensure_partitions(connection, table: str, months_ahead: int = None) -> int:
+    """Create the partitions up to `months_ahead` months from now.
+
+    Rows that landed in the default partition (archive backfills older
+    than the first partition, ...) are moved into partitions of their
+    month too, so retention reaches them and a month never has to be
+    created over rows the default partition already holds.
+    Usable from migrations (op.get_bind()) as well as the scheduler.
+    """
+    months_ahead = (
+        settings.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    )
+    existing = {month for _, month in list_partitions(connection, table)}
+    current = _month(datetime.now(timezone.utc).date())
+    upcoming = {_add_months(current, offset) for offset in range(months_ahead + 1)}
+    stranded = _default_months(connection, table)
+    created = 0
+    for month in sorted((upcoming | stranded) - existing):
+        if month in stranded:
+            split_default(connection, table, month)
+        else:
+            create_partition(connection, table, month)
+        created += 1
+    return created
+
+
+def _columns(connection, table: str) -> List[str]:
+    return list(
+        connection.execute(
+            text(
+                "SELECT attname FROM pg_attribute "
+                "WHERE attrelid = to_regclass(:table) AND attnum > 0 "
+                "AND NOT attisdropped AND attgenerated = '' ORDER BY attnum"
+            ),
+            {"table": table},
+        ).scalars()
+    )
+
+
+def _with_key(index_definition: str, key: str) -> str:
+    """Append the partition key to a unique index's column list."""
+    match = re.match(r"^(.* USING \w+ \()(.*)(\).*?)$", index_definition)
+    head, columns, tail = match.groups()
+    if key in [column.strip() for column in columns.split(",")]:
+        return index_definition
+    return f"{head}{columns}, {key}{tail}"
+
+
+def _without_key(index_definition: str, key: str) -> str:
+    """Undo _with_key: drop a trailing partition key from the column list."""
+    match = re.match(r"^(.* USING \w+ \()(.*)(\).*?)$", index_definition)
+    head, columns, tail = match.groups()
+    names = [column.strip() for column in columns.split(",")]
+    if len(names) < 2 or names[-1] != key:
+        return index_definition
+    return f"{head}{', '.join(names[:-1])}{tail}"
+
+
+def _on_table(index_definition: str) -> str:
+    """Indexes of a partitioned table are defined ON ONLY the parent."""
+    return index_definition.replace(" ON ONLY ", " ON ", 1)
+
+
+class _Dependents(NamedTuple):
+    """Everything DROP TABLE ... CASCADE takes with a table."""
+
+    indexes: List[Tuple[str, bool]]  # (definition, unique)
+    foreign_keys: List[Tuple[str, str]]  # (name, definition)
+    functions: List[str]
+    triggers: List[str]
+
+
+def _dependents(connection, table: str) -> _Dependents:
+    indexes = connection.execute(
+        text(
+            "SELECT pg_get_indexdef(indexrelid) AS definition, indisunique "
+            "FROM pg_index WHERE indrelid = to_regclass(:table) AND NOT indisprimary"
+        ),
+        {"table": table},
+    ).all()
+    foreign_keys = connection.execute(
+        text(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(:table) AND contype = 'f'"
+        ),
+        {"table": table},
+    ).all()
+    triggers = (
+        connection.execute(
+            text(
+                "SELECT pg_get_triggerdef(oid) FROM pg_trigger "
+                "WHERE tgrelid = to_regclass(:table) AND NOT tgisinternal"
+            ),
+            {"table": table},
+        )
+        .scalars()
+        .all()
+    )
+    functions = (
+        connection.execute(
+            text(
+                "SELECT DISTINCT pg_get_functiondef(p.oid) FROM pg_proc AS p "
+                "JOIN pg_type AS t ON t.oid = ANY(p.proargtypes::oid[]) "
+                "JOIN pg_class AS c ON c.oid = to_regclass(:table) "
+                "WHERE t.oid = c.reltype OR t.typelem = c.reltype"
+            ),
+            {"table": table},
+        )
+        .scalars()
+        .all()
+    )
+    return _Dependents(
+        [tuple(index) for index in indexes],
+        [tuple(foreign_key) for foreign_key in foreign_keys],
+        functions,
+        triggers,
+    )
+
+
+def _restore(connection, table: str, dependents: _Dependents, unique_index):
+    """Recreate `dependents` on the rebuilt `table`.
+
+    Unique index definitions go through `unique_index` first.
+    """
+    for definition, unique in dependents.indexes:
+        connection.execute(text(unique_index(definition) if unique else definition))
+    for name, definition in dependents.foreign_keys:
+        connection.execute(
+            text(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+        )
+    for definition in dependents.functions:
+        connection.execute(text(definition))
+    for definition in dependents.triggers:
+        connection.execute(text(definition))
+
+
+def _check_unreferenced(connection, table: str):
+    referenced = connection.execute(
+        text(
+            "SELECT count(*) FROM pg_constraint "
+            "WHERE confrelid = to_regclass(:table) AND contype = 'f'"
+        ),
+        {"table": table},
+    ).scalar()
+    if referenced:
+        # Would need the partition key in every referencing table
+        raise ValueError(f"{table} is referenced by foreign keys")
+
+
+def convert_to_partitioned(connection, table: str, months_ahead: int = None) -> bool:
+    """Rebuild a plain table as a monthly range-partitioned one.
+
+    Rows are copied into fresh partitions. Indexes, foreign keys, triggers
+    and functions taking the table's row type are recreated on the new
+    table, with the partition key added to the primary key and unique
+    indexes. Runs in the caller's transaction and holds an exclusive lock
+    on the table throughout. Returns False when already partitioned.
+    """
+    if is_partitioned(connection, table):
+        return False
+    key = PARTITION_KEYS[table]
+    months_ahead = (
+        settings.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    )
+    staging = f"{table}_partitioned"
+    connection.execute(text(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE"))
+    _check_unreferenced(connection, table)
+    dependents = _dependents(connection, table)
+
+    connection.execute(
+        text(
+            f"CREATE TABLE {staging} (LIKE {table} INCLUDING DEFAULTS "
+            "INCLUDING CONSTRAINTS INCLUDING STORAGE INCLUDING COMMENTS) "
+            f"PARTITION BY RANGE ({key})"
+        )
+    )
+    connection.execute(text(f"ALTER TABLE {staging} ALTER COLUMN {key} SET NOT NULL"))
+    oldest = connection.execute(text(f"SELECT min({key}) FROM {table}")).scalar()
+    current = _month(datetime.now(timezone.utc).date())
+    month = _month(oldest.date()) if oldest else current
+    while month <= _add_months(current, months_ahead):
+        create_partition(connection, table, month, parent=staging)
+        month = _add_months(month, 1)
+    # Rows outside every monthly range, until ensure_partitions moves them
+    # into their month (NULL-keyed rows get a fallback)
+    connection.execute(
+        text(f"CREATE TABLE {default_partition(table)} PARTITION OF {staging} DEFAULT")
+    )
+
+    columns = _columns(connection, table)
+    fallback = ", ".join((key, *KEY_FALLBACKS.get(table, ()), "now()"))
+    select = ", ".join(
+        f"coalesce({fallback})" if column == key else column for column in columns
+    )
+    connection.execute(
+        text(
+            f"INSERT INTO {staging} ({', '.join(columns)}) "
+            f"SELECT {select} FROM {table}"
+        )
+    )
+
+    connection.execute(text(f"DROP TABLE {table} CASCADE"))
+    connection.execute(text(f"ALTER TABLE {staging} RENAME TO {table}"))
+    connection.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY (id, {key})"))
+    _restore(connection, table, dependents, lambda index: _with_key(index, key))
+    logger.info(f"Partitioned {table} by month on {key}")
+    return True
+
+
+def convert_to_plain(connection, table: str) -> bool:
+    """Fold a partitioned table back into a single plain table.
+
+    The reverse of convert_to_partitioned: rows of every attached
+    partition are copied back, the primary key is `id` again and the
+    partition key is dropped from unique indexes. Keys filled in from
+    fallbacks at conversion stay filled; detached partitions are left
+    alone. Returns False when the table is not partitioned.
+    """
+    if not is_partitioned(connection, table):
+        return False
+    key = PARTITION_KEYS[table]
+    staging = f"{table}_plain"
+    connection.execute(text(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE"))
+    _check_unreferenced(connection, table)
+    dependents = _dependents(connection, table)
+
+    connection.execute(
+        text(
+            f"CREATE TABLE {staging} (LIKE {table} INCLUDING DEFAULTS "
+            "INCLUDING CONSTRAINTS INCLUDING STORAGE INCLUDING COMMENTS)"
+        )
+    )
+    columns = ", ".join(_columns(connection, table))
+    connection.execute(
+        text(f"INSERT INTO {staging} ({columns}) SELECT {columns} FROM {table}")
+    )
+
+    # Takes the partitions with it
+    connection.execute(text(f"DROP TABLE {table} CASCADE"))
+    connection.execute(text(f"ALTER TABLE {staging} RENAME TO {table}"))
+    connection.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY (id)"))
+    plain = _Dependents(
+        [(_on_table(index), unique) for index, unique in dependents.indexes],
+        dependents.foreign_keys,
+        dependents.functions,
+        dependents.triggers,
+    )
+    _restore(connection, table, plain, lambda index: _without_key(index, key))
+    logger.info(f"Merged the partitions of {table} back into one table")
+    return True
+
+
+def archive_partition(connection, partition: str, directory: str) -> str:
+    """COPY a (detached) partition to `directory`/<partition>.csv.gz."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{partition}.csv.gz")
+    cursor = connection.connection.cursor()
+    with gzip.open(path, "wt", encoding="utf-8") as archive:
+        cursor.copy_expert(
+            f"COPY {partition} TO STDOUT WITH (FORMAT csv, HEADER)", archive
+        )
+    return path
+
+
+def apply_retention(
+    connection,
+    table: str,
+    keep_months: int = None,
+    archive_dir: Optional[str] = None,
+) -> List[str]:
+    """Detach the partitions entirely older than `keep_months` months.
+
+    With an `archive_dir` they are also written to compressed CSV and
+    dropped; otherwise they stay behind as standalone tables. Trigger
+    maintained summaries (outage_stats, issue_rollups) keep counting them.
+    """
+    keep_months = (
+        settings.PARTITION_RETENTION_MONTHS if keep_months is None else keep_months
+    )
+    archive_dir = archive_dir or settings.PARTITION_ARCHIVE_DIR
+    if keep_months <= 0:
+        return []
+    cutoff = _add_months(_month(datetime.now(timezone.utc).date()), -keep_months)
+    retired = []
+    for name, month in list_partitions(connection, table):
+        if _add_months(month, 1) > cutoff:
+            break
+        connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        if archive_dir:
+            path = archive_partition(connection, name, archive_dir)
+            connection.execute(text(f"DROP TABLE {name}"))
+            logger.info(f"Archived {name} to {path}")
+        else:
+            logger.info(f"Detached {name}")
+        retired.append(name)
+    return retired
+
+
+def maintain(connection) -> None:
+    """Create upcoming partitions and retire expired ones, per settings."""
+    for table in partitioned_tables():
+        if not is_partitioned(connection, table):
+            logger.warning(f"{table} is not partitioned yet, run the migrations")
+            continue
+        ensure_partitions(connection, table)
+        apply_retention(connection, table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monthly table partitions")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("status", help="List the partitions of each table")
+    convert = commands.add_parser("convert", help="Partition a plain table")
+    convert.add_argument("table", choices=sorted(PARTITION_KEYS))
+    merge = commands.add_parser("merge", help="Turn a partitioned table plain")
+    merge.add_argument("table", choices=sorted(PARTITION_KEYS))
+    ensure = commands.add_parser(
+        "ensure", help="Create upcoming partitions, empty the default one"
+    )
+    ensure.add_argument("--months-ahead", type=int)
+    retain = commands.add_parser("retain", help="Detach or archive old partitions")
+    retain.add_argument("--keep-months", type=int)
+    retain.add_argument("--archive-dir")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    from app.db.session import engine
+
+    with engine.begin() as connection:
+        if args.command == "status":
+            for table in PARTITION_KEYS:
+                if not is_partitioned(connection, table):
+                    print(f"{table}: not partitioned")
+                    continue
+                partitions = list_partitions(connection, table)
+                print(f"{table}: {len(partitions)} monthly partitions")
+                for name, _ in partitions:
+                    print(f"  {name}")
+        elif args.command == "convert":
+            convert_to_partitioned(connection, args.table)
+        elif args.command == "merge":
+            convert_to_plain(connection, args.table)
+        else:
+            for table in partitioned_tables():
+                if args.command == "ensure":
+                    created = ensure_partitions(connection, table, args.months_ahead)
+                    logger.info(f"Created {created} partitions of {table}")
+                else:
+                    apply_retention(
+                        connection, table, args.keep_months, args.archive_dir
+                    )
+
+
+if __name__ == "__main__":
+    main()
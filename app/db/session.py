@@ -1,10 +1,23 @@
+import itertools
+import logging
+import time
+from typing import List, Optional
+
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.declarative import declarative_base
 from app.core.config import Settings
 from sqlalchemy.pool import QueuePool
 
 settings = Settings()
+logger = logging.getLogger(__name__)
+
+# Set on responses to writes, see READ_YOUR_WRITES_SECONDS
+RECENT_WRITE_COOKIE = "gw_recent_write"
 
 
 engine = create_engine(
@@ -18,6 +31,86 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _async_url(url: str):
+    """Point a psycopg2 DATABASE_URL at asyncpg (which spells sslmode 'ssl')."""
+    url = make_url(url).set(drivername="postgresql+asyncpg")
+    if "sslmode" in url.query:
+        sslmode = url.query["sslmode"]
+        url = url.difference_update_query(["sslmode"]).update_query_dict(
+            {"ssl": sslmode}
+        )
+    return url
+
+
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or _async_url(settings.DATABASE_URL),
+    pool_size=10,
+    max_overflow=20,
+    pool_timeout=30,
+    pool_recycle=1800,
+)
+
+# Objects stay usable after commit; server defaults are loaded by refresh
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
+
+class ReplicaRouter:
+    """Round-robin over the read replicas.
+
+    A replica that refuses a connection is skipped for
+    READ_REPLICA_RETRY_SECONDS; with none reachable, callers fall back to
+    the primary.
+    """
+
+    def __init__(self, engines: List[Engine], retry_seconds: float):
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        self._turn = itertools.count()
+        self._down_until = [0.0] * len(engines)
+
+    def connect(self) -> Optional[Connection]:
+        if not self.engines:
+            return None
+        start = next(self._turn)
+        for offset in range(len(self.engines)):
+            index = (start + offset) % len(self.engines)
+            if self._down_until[index] > time.monotonic():
+                continue
+            try:
+                return self.engines[index].connect()
+            except DBAPIError:
+                logger.warning(
+                    f"Read replica {index} unreachable, skipping it for "
+                    f"{self.retry_seconds}s",
+                    exc_info=True,
+                )
+                self._down_until[index] = time.monotonic() + self.retry_seconds
+        return None
+
+
+replica_router = ReplicaRouter(
+    [
+        create_engine(
+            url=url.strip(),
+            poolclass=QueuePool,
+            pool_size=10,
+            max_overflow=20,
+            pool_timeout=30,
+            pool_recycle=1800,
+            # A replica that went away is noticed at checkout, not mid-request
+            pool_pre_ping=True,
+        )
+        for url in settings.READ_REPLICA_URLS.split(",")
+        if url.strip()
+    ],
+    retry_seconds=settings.READ_REPLICA_RETRY_SECONDS,
+)
+
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
 Base = declarative_base()
 
 
@@ -28,3 +121,40 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def recent_writer(request: Request) -> bool:
+    """Whether the client wrote within READ_YOUR_WRITES_SECONDS."""
+    if settings.READ_YOUR_WRITES_SECONDS <= 0:
+        return False
+    try:
+        written_at = float(request.cookies.get(RECENT_WRITE_COOKIE, ""))
+    except ValueError:
+        return False
+    return time.time() - written_at < settings.READ_YOUR_WRITES_SECONDS
+
+
+def get_read_db(request: Request):
+    """Session for pure reads: a replica when configured, else the primary.
+
+    Clients that wrote recently stay on the primary so they see their own
+    report despite replication lag.
+    """
+    connection = None if recent_writer(request) else replica_router.connect()
+    db: Session = (
+        ReadSessionLocal(bind=connection) if connection is not None else SessionLocal()
+    )
+    try:
+        yield db
+    finally:
+        db.close()
+        if connection is not None:
+            connection.close()
+
+
+async def get_async_db():
+    db: AsyncSession = AsyncSessionLocal()
+    try:
+        yield db
+    finally:
+        await db.close()
@@ -0,0 +1,75 @@
+from typing import Optional, Tuple
+
+from geoalchemy2 import Geography
+from sqlalchemy import Column, Computed, Index, cast, func
+from sqlalchemy.orm import Query
+
+
+# Kept in sync by Postgres from approx_lat / approx_long
+POSITION_EXPRESSION = (
+    "CASE WHEN approx_lat IS NOT NULL AND approx_long IS NOT NULL "
+    "THEN ST_SetSRID(ST_MakePoint(approx_long, approx_lat), 4326)::geography END"
+)
+
+
+def position_column() -> Column:
+    """Generated geography point of a report with approx_lat / approx_long."""
+    return Column(
+        Geography("POINT", srid=4326, spatial_index=False),
+        Computed(POSITION_EXPRESSION, persisted=True),
+        nullable=True,
+    )
+
+
+def position_index(table: str) -> Index:
+    return Index(f"ix_{table}_position", "position", postgresql_using="gist")
+
+
+def make_point(lat: float, lng: float):
+    return cast(
+        func.ST_SetSRID(func.ST_MakePoint(lng, lat), 4326),
+        Geography("POINT", srid=4326, spatial_index=False),
+    )
+
+
+def parse_bbox(bbox: str) -> Optional[Tuple[float, float, float, float]]:
+    """'min_lng,min_lat,max_lng,max_lat' to floats, None when malformed."""
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(part) for part in bbox.split(","))
+    except ValueError:
+        return None
+    if not (-180 <= min_lng < max_lng <= 180 and -90 <= min_lat < max_lat <= 90):
+        return None
+    return min_lng, min_lat, max_lng, max_lat
+
+
+def near(query: Query, model, lat: float, lng: float, radius_m: float, limit: int):
+    """Rows within `radius_m` metres of a point, closest first, with distances.
+
+    ST_DWithin and the `<->` ordering are both answered by the GiST index
+    on `position`.
+    """
+    point = make_point(lat, lng)
+    distance = func.ST_Distance(model.position, point)
+    return (
+        query.add_columns(distance.label("distance_m"))
+        .filter(func.ST_DWithin(model.position, point, radius_m))
+        .order_by(model.position.op("<->")(point))
+        .limit(limit)
+        .all()
+    )
+
+
+def within(query: Query, model, bbox: Tuple[float, float, float, float], limit: int):
+    """Most recent rows whose position falls inside a lng/lat bounding box."""
+    envelope = cast(
+        func.ST_MakeEnvelope(*bbox, 4326),
+        Geography("POLYGON", srid=4326, spatial_index=False),
+    )
+    # Geography ST_Intersects includes the index-backed && test
+    return (
+        query.filter(func.ST_Intersects(model.position, envelope))
+        .order_by(model.created_at.desc())
+        .limit(limit)
+        .all()
+    )
@@ -0,0 +1,103 @@
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+# Session.info key of the open unit of work
+UNIT_OF_WORK_KEY = "unit_of_work"
+
+
+class UnitOfWork:
+    """Writes of a batch scope, sent together when the scope closes.
+
+    New rows are only added to the session, then flushed at once: the ORM
+    batches them into multi-row INSERT ... RETURNING statements that also
+    bring back the server defaults. Per-call side writes (rollups, area
+    placement, ...) registered with defer() run once for the whole batch,
+    in the order they were first registered, before that flush.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._deferred: Dict[Hashable, Tuple[Callable, List]] = OrderedDict()
+
+    def add(self, *instances):
+        for instance in instances:
+            # Callers get the id right away instead of after the flush
+            if getattr(instance, "id", False) is None:
+                instance.id = uuid.uuid4()
+        self.db.add_all(instances)
+
+    def defer(self, key: Hashable, fn: Callable, items: List):
+        """Call fn(db, items of every call using `key`) once, at flush."""
+        self._deferred.setdefault(key, (fn, []))[1].extend(items)
+
+    def flush(self):
+        while self._deferred:
+            _, (fn, items) = self._deferred.popitem(last=False)
+            fn(self.db, items)
+        self.db.flush()
+
+
+def current_unit_of_work(db: Session) -> Optional[UnitOfWork]:
+    return db.info.get(UNIT_OF_WORK_KEY)
+
+
+@contextmanager
+def unit_of_work(db: Session) -> Iterator[UnitOfWork]:
+    """Batch scope: one flush and one commit for every write inside it.
+
+    Nested scopes join the outermost one. Objects stay loaded after the
+    commit, so reading them does not cost a refresh SELECT each.
+    """
+    current = current_unit_of_work(db)
+    if current is not None:
+        yield current
+        return
+
+    work = UnitOfWork(db)
+    db.info[UNIT_OF_WORK_KEY] = work
+    try:
+        yield work
+        work.flush()
+        expire_on_commit = db.expire_on_commit
+        db.expire_on_commit = False
+        try:
+            db.commit()
+        finally:
+            db.expire_on_commit = expire_on_commit
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.info.pop(UNIT_OF_WORK_KEY, None)
+
+
+def save(db: Session, *instances):
+    """Add new rows: staged in a batch scope, else committed and refreshed."""
+    work = current_unit_of_work(db)
+    if work is not None:
+        work.add(*instances)
+        return
+    db.add_all(instances)
+    commit(db, *instances)
+
+
+def commit(db: Session, *instances):
+    """Commit and refresh `instances`, or leave it to the open batch scope."""
+    if current_unit_of_work(db) is not None:
+        return
+    db.commit()
+    for instance in instances:
+        db.refresh(instance)
+
+
+def defer(db: Session, key: Hashable, fn: Callable, items: List):
+    """fn(db, items) now, or once per batch scope with every call's items."""
+    work = current_unit_of_work(db)
+    if work is None:
+        fn(db, items)
+    else:
+        work.defer(key, fn, items)
@@ -0,0 +1,59 @@
+from typing import Iterable, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import Settings
+
+
+settings = Settings()
+
+
+def set_ef_search(db: Session, ef_search: Optional[int] = None):
+    """HNSW candidate list size for the rest of the current transaction."""
+    db.execute(
+        text("SELECT set_config('hnsw.ef_search', :ef_search, true)"),
+        {"ef_search": str(int(ef_search or settings.VECTOR_SEARCH_EF))},
+    )
+    if settings.VECTOR_SEARCH_ITERATIVE_SCAN:
+        db.execute(
+            text("SELECT set_config('hnsw.iterative_scan', :mode, true)"),
+            {"mode": settings.VECTOR_SEARCH_ITERATIVE_SCAN},
+        )
+
+
+def row_embedding(
+    db: Session, model, row_id: UUID
+) -> Tuple[bool, Optional[np.ndarray]]:
+    """(row exists, its embedding); the embedding is None while pending."""
+    row = db.query(model.embedding).filter(model.id == row_id).first()
+    if row is None:
+        return False, None
+    return True, row.embedding
+
+
+def nearest(
+    db: Session,
+    model,
+    vector,
+    k: int = 10,
+    ef_search: Optional[int] = None,
+    exclude_id: Optional[UUID] = None,
+    filters: Iterable = (),
+) -> List[Tuple[object, float]]:
+    """The `k` rows of `model` closest to `vector` by cosine distance.
+
+    Ordered by the `<=>` expression itself so the HNSW index serves the
+    query; `filters` are applied to the index candidates, so a very
+    selective filter may need a larger `ef_search`.
+    """
+    set_ef_search(db, ef_search)
+    distance = model.embedding.cosine_distance(vector)
+    query = db.query(model, distance.label("distance")).filter(
+        model.embedding.isnot(None), *filters
+    )
+    if exclude_id is not None:
+        query = query.filter(model.id != exclude_id)
+    return [(row, float(d)) for row, d in query.order_by(distance).limit(k).all()]
@@ -0,0 +1,230 @@
+import argparse
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+from pgvector import HalfVector, Vector
+from pgvector.sqlalchemy import HALFVEC, VECTOR
+from sqlalchemy import Index, text
+from sqlalchemy.types import TypeDecorator
+
+from app.core.config import Settings
+
+
+settings = Settings()
+logger = logging.getLogger(__name__)
+
+STORAGE_TYPES = {"vector": (VECTOR, np.float32), "halfvec": (HALFVEC, np.float16)}
+HNSW_OPCLASSES = {"vector": "vector_cosine_ops", "halfvec": "halfvec_cosine_ops"}
+
+
+def embedding_dtype(storage: Optional[str] = None):
+    """NumPy dtype the embeddings are exchanged in for a storage type."""
+    return STORAGE_TYPES[storage or settings.EMBEDDING_STORAGE][1]
+
+
+def parse_vector(value, dtype=np.float32) -> Optional[np.ndarray]:
+    """'[0.1,0.2,...]' text (or a driver-decoded pgvector value) to an array."""
+    if value is None:
+        return None
+    if isinstance(value, (Vector, HalfVector)):
+        return value.to_numpy().astype(dtype, copy=False)
+    if isinstance(value, str):
+        # One C-level parse instead of a Python float per component
+        return np.fromstring(value[1:-1], sep=",", dtype=np.float32).astype(
+            dtype, copy=False
+        )
+    return np.asarray(value, dtype=dtype)
+
+
+class EmbeddingVector(TypeDecorator):
+    """pgvector column holding `EMBEDDING_DIM` components, stored as `vector`
+    (float32) or `halfvec` (float16) per EMBEDDING_STORAGE.
+
+    Values are written and read as NumPy arrays of the matching dtype.
+    """
+
+    impl = VECTOR
+    cache_ok = True
+
+    def __init__(self, dim: Optional[int] = None, storage: Optional[str] = None):
+        self.dim = dim or settings.EMBEDDING_DIM
+        self.storage = storage or settings.EMBEDDING_STORAGE
+        if self.storage not in STORAGE_TYPES:
+            raise ValueError(f"Unknown embedding storage: {self.storage}")
+        super().__init__(self.dim)
+
+    @property
+    def dtype(self):
+        return embedding_dtype(self.storage)
+
+    def load_dialect_impl(self, dialect):
+        column_type, _ = STORAGE_TYPES[self.storage]
+        return dialect.type_descriptor(column_type(self.dim))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return np.asarray(value, dtype=self.dtype)
+
+    def result_processor(self, dialect, coltype):
+        dtype = self.dtype
+
+        def process(value):
+            return parse_vector(value, dtype)
+
+        return process
+
+
+def hnsw_index(table: str) -> Index:
+    """Cosine HNSW index on `table.embedding`, for a model's __table_args__."""
+    return Index(
+        f"ix_{table}_embedding_hnsw",
+        "embedding",
+        postgresql_using="hnsw",
+        postgresql_with={
+            "m": settings.VECTOR_INDEX_M,
+            "ef_construction": settings.VECTOR_INDEX_EF_CONSTRUCTION,
+        },
+        postgresql_ops={"embedding": HNSW_OPCLASSES[settings.EMBEDDING_STORAGE]},
+    )
+
+
+def create_hnsw_index(
+    connection,
+    table: str,
+    storage: Optional[str] = None,
+    m: Optional[int] = None,
+    ef_construction: Optional[int] = None,
+    concurrently: bool = False,
+):
+    """CREATE INDEX for hnsw_index(table); CONCURRENTLY needs autocommit."""
+    opclass = HNSW_OPCLASSES[storage or settings.EMBEDDING_STORAGE]
+    connection.execute(
+        text(
+            f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS "
+            f"ix_{table}_embedding_hnsw ON {table} "
+            f"USING hnsw (embedding {opclass}) "
+            f"WITH (m = {int(m or settings.VECTOR_INDEX_M)}, ef_construction = "
+            f"{int(ef_construction or settings.VECTOR_INDEX_EF_CONSTRUCTION)})"
+        )
+    )
+
+
+def drop_hnsw_index(connection, table: str, concurrently: bool = False) -> bool:
+    """Drop the HNSW index of `table`; returns whether it existed."""
+    exists = connection.execute(
+        text("SELECT to_regclass(:index) IS NOT NULL"),
+        {"index": f"ix_{table}_embedding_hnsw"},
+    ).scalar()
+    if exists:
+        connection.execute(
+            text(
+                f"DROP INDEX {'CONCURRENTLY ' if concurrently else ''}"
+                f"ix_{table}_embedding_hnsw"
+            )
+        )
+    return bool(exists)
+
+
+EMBEDDING_TABLES = (
+    "outages",
+    "power_issues",
+    "water_issues",
+    "incidents",
+    "embedding_cache",
+)
+
+
+def embedding_column_type(connection, table: str) -> Optional[str]:
+    """Current type of `table.embedding`, e.g. 'vector(384)'."""
+    return connection.execute(
+        text(
+            "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+            "WHERE attrelid = to_regclass(:table) AND attname = 'embedding' "
+            "AND NOT attisdropped"
+        ),
+        {"table": table},
+    ).scalar()
+
+
+def convert_embedding_columns(
+    connection, storage: Optional[str] = None, dim: Optional[int] = None
+) -> Dict[str, str]:
+    """Retype every embedding column to `storage(dim)`.
+
+    Switching between vector and halfvec casts the stored values in place.
+    A new dimensionality cannot be cast: issue vectors are reset to NULL,
+    for the pending embedder to fill again, and the embedding cache is
+    emptied. HNSW indexes are rebuilt with the opclass of the new type.
+    Returns the tables changed, with their previous type.
+    """
+    storage = storage or settings.EMBEDDING_STORAGE
+    dim = dim or settings.EMBEDDING_DIM
+    if storage not in STORAGE_TYPES:
+        raise ValueError(f"Unknown embedding storage: {storage}")
+    target = f"{storage}({dim})"
+
+    changed = {}
+    for table in EMBEDDING_TABLES:
+        current = embedding_column_type(connection, table)
+        if current is None or current == target:
+            continue
+        if current.endswith(f"({dim})"):
+            using = f"embedding::{target}"
+        else:
+            if table == "embedding_cache":
+                # NOT NULL there, and every entry would be stale anyway
+                connection.execute(text("DELETE FROM embedding_cache"))
+            using = f"NULL::{target}"
+        # The cosine opclass is per type: the index cannot survive the change
+        indexed = drop_hnsw_index(connection, table)
+        connection.execute(
+            text(
+                f"ALTER TABLE {table} ALTER COLUMN embedding TYPE {target} USING {using}"
+            )
+        )
+        if indexed:
+            create_hnsw_index(connection, table, storage)
+        changed[table] = current
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding column storage")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("status", help="Show the type of every embedding column")
+    convert = commands.add_parser(
+        "convert", help="Retype embedding columns (default: the configured type)"
+    )
+    convert.add_argument("--storage", choices=sorted(STORAGE_TYPES))
+    convert.add_argument("--dim", type=int)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    from app.db.session import engine
+
+    with engine.begin() as connection:
+        if args.command == "status":
+            for table in EMBEDDING_TABLES:
+                print(f"{table}: {embedding_column_type(connection, table)}")
+        elif args.command == "convert":
+            dim = args.dim or settings.EMBEDDING_DIM
+            changed = convert_embedding_columns(connection, args.storage, dim)
+            for table, previous in changed.items():
+                logger.info(
+                    f"{table}.embedding: {previous} -> "
+                    f"{embedding_column_type(connection, table)}"
+                )
+            if any(not previous.endswith(f"({dim})") for previous in changed.values()):
+                logger.info(
+                    "Dimensionality changed: run `python -m "
+                    "app.reg.services.scheduler_service embed-pending --once` "
+                    "to re-embed the reset rows"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,15 @@
-import asyncio, os
-from concurrent.futures import ThreadPoolExecutor
-from sentence_transformers import SentenceTransformer
+import numpy as np
+
+from app.core.admin_hierarchy import AdminHierarchy
+from app.core.area_resolver import AreaResolver
+from app.core.embedding_backends import load_embedding_backend
+from app.core.embedding_cache import EmbeddingCache
+from app.core.embeddings import EmbeddingService
+from app.core.location_search import FuzzyLocationIndex
+from app.core.reverse_geocoder import ReverseGeocoder
+from app.db.session import SessionLocal
+from app.db.vector_types import embedding_dtype
+from app.reg.twitter.gazetteer import Gazetteer
 from app.reg.twitter.twitter_client import TwitterClient
 from app.reg.schema.outage_schema import (
     TwitterConfig,
@@ -9,8 +18,6 @@ from app.core.config import Settings
 
 settings = Settings()
 
-executor = ThreadPoolExecutor()
-
 
 twitter_config = TwitterConfig(
     bearer_token=settings.BEARER_TOKEN,
@@ -20,24 +27,49 @@ twitter_config = TwitterConfig(
     access_token_secret=settings.ACCESS_TOKEN_SECRET,
 )
 
-twitter_client = TwitterClient(config=twitter_config)
+# Loaded from the locations table on startup, see main.lifespan
+gazetteer = Gazetteer()
+
+twitter_client = TwitterClient(config=twitter_config, gazetteer=gazetteer)
+
+# Location boundaries for lat/lng -> admin codes, refreshed with the gazetteer
+reverse_geocoder = ReverseGeocoder()
+
+# Names / aliases for fuzzy location search, refreshed with the gazetteer
+location_index = FuzzyLocationIndex()
+
+# Province..village tree for drill-downs, reloaded when locations change
+admin_hierarchy = AdminHierarchy()
+
+# Outage area names -> location, cleared when locations change
+area_resolver = AreaResolver()
+
+
+# torch SentenceTransformer or int8 ONNX Runtime, per EMBEDDING_BACKEND
+embedding_backend = load_embedding_backend(settings)
+
+# Concurrent requests share batched forward passes
+embedding_service = EmbeddingService(
+    embedding_backend,
+    max_batch_size=settings.EMBEDDING_MAX_BATCH_SIZE,
+    max_wait_ms=settings.EMBEDDING_MAX_WAIT_MS,
+    workers=settings.EMBEDDING_WORKERS,
+    dtype=embedding_dtype(),
+    cache=EmbeddingCache(
+        embedding_backend.model_id,
+        max_entries=settings.EMBEDDING_CACHE_SIZE,
+        session_factory=SessionLocal if settings.EMBEDDING_CACHE_PERSISTENT else None,
+    ),
+)
 
 
-# Load the pre-cached model
-model_path = "/app/cached_model"
-if os.path.exists(model_path):
-    # Use the cached model from Docker layer
-    embedding_model = SentenceTransformer(model_path)
-else:
-    # Fallback for local development
-    embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+# Deferred mode: create paths leave the embedding NULL, see PendingEmbedder
+DEFERRED_EMBEDDING = settings.EMBEDDING_MODE == "deferred"
 
 
-async def get_embedding(text: str) -> list[float]:
-    loop = asyncio.get_event_loop()
-    embedding = await loop.run_in_executor(executor, embedding_model.encode, text)
-    return embedding.tolist()
+async def get_embedding(text: str) -> np.ndarray:
+    return await embedding_service.embed(text)
 
 
-def get_sync_embedding(text: str) -> list[float]:
-    return asyncio.run(get_embedding(text))
+def get_sync_embedding(text: str) -> np.ndarray:
+    return embedding_service.embed_sync(text)
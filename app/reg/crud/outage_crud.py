@@ -1,10 +1,22 @@
 from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import logging
+from typing import Optional
+from uuid import UUID
+import numpy as np
 from app.reg.models.outage import Outage
 from app.reg.schema.outage_schema import OutageCreate
 from sqlalchemy.exc import SQLAlchemyError
-from app.dependencies import get_sync_embedding
+from app.db.vector_search import nearest, row_embedding
+from app.dependencies import (
+    DEFERRED_EMBEDDING,
+    area_resolver,
+    get_embedding,
+    get_sync_embedding,
+)
+from app.reg.services.incident_service import assign_incident
+from app.reg.services.rollup_service import record_outages
 
 
 logger = logging.getLogger(__name__)
@@ -14,26 +26,84 @@ def create_outage(outage: OutageCreate, db: Session):
     try:
         outage_dict = outage.model_dump()
 
-        outage_dict["embedding"] = get_outage_embedding(outage)
+        if not DEFERRED_EMBEDDING:
+            outage_dict["embedding"] = get_outage_embedding(outage)
 
         db_outage = Outage(**outage_dict)
+        area_resolver.place(db, [db_outage])
         db.add(db_outage)
+        # Deferred rows are clustered by the pending embedder instead
+        assign_incident(db, db_outage)
+        record_outages(db, [db_outage])
         db.commit()
         db.refresh(db_outage)
         return db_outage
-    except SQLAlchemyError as e:
+    except SQLAlchemyError:
         db.rollback()
         logger.error("Error creating an outage", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
-def get_outage_embedding(
-    outage: OutageCreate,
-) -> list[float]:
+async def create_outage_async(outage: OutageCreate, db: AsyncSession):
+    try:
+        outage_dict = outage.model_dump()
+
+        if not DEFERRED_EMBEDDING:
+            outage_dict["embedding"] = await get_embedding(
+                outage_embedding_text(outage)
+            )
+
+        db_outage = Outage(**outage_dict)
+        await db.run_sync(area_resolver.place, [db_outage])
+        db.add(db_outage)
+        await db.run_sync(assign_incident, db_outage)
+        await db.run_sync(record_outages, [db_outage])
+        await db.commit()
+        await db.refresh(db_outage)
+        return db_outage
+    except SQLAlchemyError:
+        await db.rollback()
+        logger.error("Error creating an outage", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
+def outage_embedding_text(outage: OutageCreate) -> str:
     parts = [
         outage.cause,
-        outage.twitter_text,
+        outage.tweet_text,
     ]
 
-    combined_text = " ".join(part for part in parts if part).strip()
-    return get_sync_embedding(combined_text)
+    return " ".join(part for part in parts if part).strip()
+
+
+def get_outage_embedding(
+    outage: OutageCreate,
+) -> np.ndarray:
+    return get_sync_embedding(outage_embedding_text(outage))
+
+
+def get_similar_outages(
+    db: Session,
+    text: Optional[str] = None,
+    outage_id: Optional[UUID] = None,
+    k: int = 10,
+    ef_search: Optional[int] = None,
+):
+    """Nearest outages to a free text or to an existing outage."""
+    if outage_id is not None:
+        found, vector = row_embedding(db, Outage, outage_id)
+        if not found:
+            raise HTTPException(status_code=404, detail="Outage not found.")
+        if vector is None:
+            raise HTTPException(
+                status_code=409, detail="Outage embedding is still pending."
+            )
+    elif text:
+        vector = get_sync_embedding(text)
+    else:
+        raise HTTPException(status_code=422, detail="Provide text or outage_id.")
+
+    neighbours = nearest(
+        db, Outage, vector, k=k, ef_search=ef_search, exclude_id=outage_id
+    )
+    return [{"outage": outage, "distance": distance} for outage, distance in neighbours]
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from app.db.base_model import BaseModel
+from app.db.vector_types import EmbeddingVector, hnsw_index
+
+
+class Incident(BaseModel):
+    """One real-world outage, grouping the tweets and citizen reports about it."""
+
+    __tablename__ = "incidents"
+
+    title = Column(String, nullable=False)
+    areas = Column(ARRAY(String), nullable=False, default=list)
+    # Districts of the members, the place of reports without area names
+    district_codes = Column(
+        ARRAY(String), nullable=False, default=list, server_default="{}"
+    )
+    location_id = Column(UUID(as_uuid=True), ForeignKey("locations.id"))
+
+    member_count = Column(Integer, nullable=False, default=0)
+    outage_count = Column(Integer, nullable=False, default=0)
+    power_issue_count = Column(Integer, nullable=False, default=0)
+    first_seen = Column(DateTime(timezone=True), nullable=False)
+    last_seen = Column(DateTime(timezone=True), nullable=False)
+
+    # Mean of the member embeddings
+    embedding = Column(EmbeddingVector(), nullable=True)
+
+    __table_args__ = (
+        Index("ix_incidents_last_seen", "last_seen"),
+        hnsw_index("incidents"),
+    )
+
+    def __repr__(self):
+        return (
+            f"<Incident(id={self.id}, title={self.title}, members={self.member_count})>"
+        )
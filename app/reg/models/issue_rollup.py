@@ -0,0 +1,26 @@
+from sqlalchemy import BigInteger, Column, DateTime, Float, String
+from app.db.session import Base
+
+
+class IssueRollup(Base):
+    """Outage and power issue counters per hour / day, district and sector.
+
+    Maintained incrementally by the ingestion paths through RollupService;
+    `python -m app.reg.services.scheduler_service rebuild-rollups` recomputes
+    them from the raw rows.
+    """
+
+    __tablename__ = "issue_rollups"
+
+    granularity = Column(String, primary_key=True)  # hour | day
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    source = Column(String, primary_key=True)  # outage | power_issue
+    issue_type = Column(String, primary_key=True)
+    # "" when the report could not be placed
+    district_code = Column(String, primary_key=True)
+    sector_code = Column(String, primary_key=True)
+
+    report_count = Column(BigInteger, nullable=False, default=0)
+    resolved_count = Column(BigInteger, nullable=False, default=0)
+    # Minutes of resolved outages that fall inside the bucket
+    active_minutes = Column(Float, nullable=False, default=0)
@@ -1,7 +1,7 @@
 import uuid
-from sqlalchemy import Column, String, Float, Integer, Index, UUID
+from sqlalchemy import Column, String, Float, Integer, Index, UUID, text
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from geoalchemy2 import Geometry
 from app.db.base_model import BaseModel
 
@@ -10,6 +10,8 @@ class Location(BaseModel):
     __tablename__ = "locations"
 
     name = Column(String, nullable=False, index=True)
+    name_kinyarwanda = Column(String, nullable=True)
+    aliases = Column(ARRAY(String), nullable=True)
     level = Column(String)
 
     parent_province = Column(String, index=True)
@@ -18,8 +20,9 @@ class Location(BaseModel):
     parent_cell = Column(String)
 
     # Geographic data
-    coordinates = Column(Geometry("POINT"))
-    boundary = Column(Geometry("POLYGON"))
+    # GiST indexes declared in __table_args__
+    coordinates = Column(Geometry("POINT", spatial_index=False))
+    boundary = Column(Geometry("POLYGON", spatial_index=False))
 
     # Administrative codes
     province_code = Column(String)
@@ -42,12 +45,9 @@ class Location(BaseModel):
     outages = relationship("Outage", back_populates="location")
 
     __table_args__ = (
-        Index("ix_location_name", "name"),
-        Index("ix_location_coordinates", "coordinates"),
-    )
-
-    # Create composite index for hierarchical queries
-    __table_args__ = (
+        Index("idx_locations_coordinates", "coordinates", postgresql_using="gist"),
+        Index("idx_locations_boundary", "boundary", postgresql_using="gist"),
+        # Composite index for hierarchical queries
         Index(
             "idx_location_hierarchy",
             "parent_province",
@@ -55,6 +55,23 @@ class Location(BaseModel):
             "parent_sector",
         ),
         Index("idx_location_name_level", "name", "level"),
+        Index("ix_locations_updated_at", "updated_at"),
+        # Fuzzy search, see app/core/location_search.trigram_search
+        Index(
+            "ix_locations_name_trgm",
+            text("lower(name) gin_trgm_ops"),
+            postgresql_using="gin",
+        ),
+        Index(
+            "ix_locations_name_kinyarwanda_trgm",
+            text("lower(name_kinyarwanda) gin_trgm_ops"),
+            postgresql_using="gin",
+        ),
+        Index(
+            "ix_locations_aliases_trgm",
+            text("location_alias_text(aliases) gin_trgm_ops"),
+            postgresql_using="gin",
+        ),
     )
 
     def __repr__(self):
@@ -1,14 +1,15 @@
-from sqlalchemy import Column, String, ARRAY, ForeignKey, Float, Enum as SqlEnum
+from sqlalchemy import Column, String, ARRAY, ForeignKey, Float, Index, text
+from sqlalchemy import Enum as SqlEnum
 from sqlalchemy.dialects.postgresql import UUID
-from pgvector.sqlalchemy import Vector
+from app.db.vector_types import EmbeddingVector, hnsw_index
 from sqlalchemy import DateTime
 from app.reg.schema.outage_schema import OutageType, OutageStatus
 from geoalchemy2 import Geometry
 from sqlalchemy.orm import relationship
-from app.db.base_model import BaseModel
+from app.db.base_model import AdminCodes, BaseModel
 
 
-class Outage(BaseModel):
+class Outage(BaseModel, AdminCodes):
     __tablename__ = "outages"
     tweet_id = Column(String, nullable=False)
     tweet_text = Column(String, nullable=False)
@@ -31,15 +32,29 @@ class Outage(BaseModel):
     coordinates = Column(ARRAY(Geometry("POINT", srid=4326)), nullable=True)
     affected_areas = Column(ARRAY(Geometry("POLYGON")), nullable=True)
 
-    embedding = Column(Vector(384), nullable=False)
+    # NULL until the deferred embedder fills it (EMBEDDING_MODE=deferred)
+    embedding = Column(EmbeddingVector(), nullable=True)
 
     source_type = Column(String)
     source_credibility = Column(Float, default=0.5)
     author_id = Column(String)
 
-    # Relationships
-    location_id = Column(UUID(as_uuid=True), ForeignKey("locations.id"))
+    # Relationships; location and admin codes set from `areas` on ingestion,
+    # see AreaResolver
+    location_id = Column(UUID(as_uuid=True), ForeignKey("locations.id"), index=True)
     location = relationship("Location", back_populates="outages")
 
+    # Set on ingestion when the outage joins a cluster, see IncidentService
+    incident_id = Column(UUID(as_uuid=True), ForeignKey("incidents.id"), index=True)
+
+    __table_args__ = (
+        Index(
+            "ix_outages_embedding_pending",
+            "created_at",
+            postgresql_where=text("embedding IS NULL"),
+        ),
+        hnsw_index("outages"),
+    )
+
     def __repr__(self):
         return f"<Outage(id={self.id}, location={self.location_name}, status={self.status})>"
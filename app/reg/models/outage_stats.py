@@ -0,0 +1,46 @@
+from sqlalchemy import (
+    BigInteger,
+    CheckConstraint,
+    Column,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    String,
+)
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+
+class OutageStatsSummary(Base):
+    """All-time outage counters, kept current by triggers on `outages`.
+
+    A single row (id = 1); the triggers add the net change of every
+    INSERT / UPDATE / DELETE statement, see migration b8e4f2a61c09.
+    """
+
+    __tablename__ = "outage_stats"
+
+    id = Column(Integer, primary_key=True, default=1)
+    total_outages = Column(BigInteger, nullable=False, default=0)  # every row
+    outage_reports = Column(BigInteger, nullable=False, default=0)  # type OUTAGE
+    total_restorations = Column(BigInteger, nullable=False, default=0)
+    active_outages = Column(BigInteger, nullable=False, default=0)
+    resolved_outages = Column(BigInteger, nullable=False, default=0)
+    # Sum and count of resolved_at - reported_at, for the mean duration
+    resolved_duration_seconds = Column(Float, nullable=False, default=0)
+    resolved_duration_count = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (CheckConstraint("id = 1", name="outage_stats_single_row"),)
+
+
+class OutageAreaCount(Base):
+    """Outages mentioning each area, kept current by the same triggers."""
+
+    __tablename__ = "outage_area_counts"
+
+    area = Column(String, primary_key=True)
+    outage_count = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (Index("ix_outage_area_counts_outage_count", outage_count.desc()),)
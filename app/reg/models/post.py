@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, DateTime, Boolean, Text, Integer
+from sqlalchemy import Column, String, DateTime, Boolean, Text, Integer, Index
+from sqlalchemy import text as sql_text
 from sqlalchemy.dialects.postgresql import JSONB
-from app.db.models.base_model import BaseModel
+from app.db.base_model import BaseModel
 
 
 class Post(BaseModel):
@@ -30,8 +31,22 @@ class Post(BaseModel):
     processed = Column(Boolean, default=False)
     processing_error = Column(Text)
 
+    # Work queue lease, see PostService.claim_posts
+    claimed_at = Column(DateTime(timezone=True))
+    claimed_by = Column(String)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+
     # Store raw tweet data
     raw_data = Column(JSONB)
 
+    __table_args__ = (
+        # Only the backlog is indexed, so claims stay cheap as posts grow
+        Index(
+            "ix_posts_unprocessed",
+            "created_at",
+            postgresql_where=sql_text("processed IS NOT TRUE"),
+        ),
+    )
+
     def __repr__(self):
         return f"<Tweet(id={self.tweet_id}, processed={self.processed})>"
@@ -1,7 +1,19 @@
-from sqlalchemy import Column, String, ARRAY, Enum, Boolean, Float
-from sqlalchemy.dialects.postgresql import JSON
-from app.db.base_model import BaseModel
-from pgvector.sqlalchemy import Vector
+from sqlalchemy import (
+    Column,
+    String,
+    ARRAY,
+    Enum,
+    Boolean,
+    Float,
+    ForeignKey,
+    Index,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSON, UUID
+from app.db.base_model import AdminCodes, BaseModel
+from app.db.pagination import keyset_index
+from app.db.spatial import position_column, position_index
+from app.db.vector_types import EmbeddingVector, hnsw_index
 from enum import Enum as PyEnum
 from geoalchemy2 import Geometry
 
@@ -12,17 +24,40 @@ class IssueType(str, PyEnum):
     POTENTIALLY_FATAL = "potentially_fatal"
 
 
-class PowerIssue(BaseModel):
+class PowerIssue(BaseModel, AdminCodes):
     __tablename__ = "power_issues"
     description = Column(String, nullable=True)
     audio_description = Column(String, nullable=True)
     phone_number = Column(String(20), nullable=True)
-    embedding = Column(Vector(384), nullable=False)
+    # NULL until the deferred embedder fills it (EMBEDDING_MODE=deferred)
+    embedding = Column(EmbeddingVector(), nullable=True)
     image_url = Column(String, nullable=True)
     is_resolved = Column(Boolean, default=False)
     location = Column(JSON, nullable=True)
-    issue_type = Column(Enum(IssueType), default=IssueType.OUTAGE, nullable=False)
+    issue_type = Column(
+        Enum(IssueType, name="powerissuetype"), default=IssueType.OUTAGE, nullable=False
+    )
     approx_lat = Column(Float, nullable=True)
     approx_long = Column(Float, nullable=True)
+    position = position_column()
+    # Finest area containing the position, resolved on ingest
+    location_id = Column(UUID(as_uuid=True), ForeignKey("locations.id"), nullable=True)
     affected_areas = Column(ARRAY(Geometry("POLYGON")), nullable=True)
     affeccted_area_names = Column(ARRAY(String), nullable=True)
+
+    # Set on ingestion when the report joins a cluster, see IncidentService
+    incident_id = Column(UUID(as_uuid=True), ForeignKey("incidents.id"), index=True)
+
+    __table_args__ = (
+        Index(
+            "ix_power_issues_embedding_pending",
+            "created_at",
+            postgresql_where=text("embedding IS NULL"),
+        ),
+        hnsw_index("power_issues"),
+        position_index("power_issues"),
+        # List endpoint filters, each followed by the keyset order
+        keyset_index("power_issues"),
+        keyset_index("power_issues", "is_resolved"),
+        keyset_index("power_issues", "issue_type"),
+    )
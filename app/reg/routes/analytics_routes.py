@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.db.session import get_read_db
+from app.core.config import Settings
+from app.dependencies import admin_hierarchy
+from app.reg.schema.rollup_schema import (
+    AreaLevel,
+    AreaNode,
+    Granularity,
+    RollupPoint,
+    RollupSource,
+)
+from app.reg.services.rollup_service import RollupService
+
+
+settings = Settings()
+
+analytics_route = APIRouter(tags=["Analytics"])
+
+
+@analytics_route.get("/timeseries", response_model=list[RollupPoint])
+def read_timeseries(
+    granularity: Granularity = Granularity.DAY,
+    since: Optional[datetime] = Query(None, description="Defaults to 30 days ago"),
+    until: Optional[datetime] = Query(None, description="Defaults to now"),
+    source: Optional[RollupSource] = None,
+    issue_type: Optional[str] = None,
+    district_code: Optional[str] = None,
+    by_district: bool = False,
+    db: Session = Depends(get_read_db),
+):
+    """Report, resolution and active-minute counts per hour or day"""
+    until = until or datetime.now(timezone.utc)
+    since = since or until - timedelta(days=30)
+    # Naive bounds are taken as UTC
+    until = until if until.tzinfo else until.replace(tzinfo=timezone.utc)
+    since = since if since.tzinfo else since.replace(tzinfo=timezone.utc)
+    if since >= until:
+        raise HTTPException(status_code=422, detail="since must be before until.")
+    return RollupService(db).timeseries(
+        granularity.value,
+        since,
+        until,
+        source=source.value if source else None,
+        issue_type=issue_type,
+        district_code=district_code,
+        by_district=by_district,
+    )
+
+
+def _hierarchy():
+    if not admin_hierarchy.loaded:
+        raise HTTPException(status_code=503, detail="Area hierarchy not loaded yet.")
+    return admin_hierarchy
+
+
+@analytics_route.get("/areas", response_model=list[AreaNode])
+def read_areas(
+    parent: Optional[str] = Query(None, description="Admin code to drill into"),
+    level: Optional[AreaLevel] = Query(
+        None, description="Descendants at this level instead of direct children"
+    ),
+):
+    """Provinces, or the areas inside `parent`; served from memory"""
+    hierarchy = _hierarchy()
+    if parent is None:
+        return hierarchy.at_level((level or AreaLevel.PROVINCE).value)
+    if hierarchy.get(parent) is None:
+        raise HTTPException(status_code=404, detail="Area not found.")
+    if level is None:
+        return hierarchy.children(parent)
+    return hierarchy.descendants(parent, level.value)
+
+
+@analytics_route.get("/areas/{code}/ancestors", response_model=list[AreaNode])
+def read_area_ancestors(code: str):
+    """Enclosing areas of `code`, province first"""
+    hierarchy = _hierarchy()
+    if hierarchy.get(code) is None:
+        raise HTTPException(status_code=404, detail="Area not found.")
+    return hierarchy.ancestors(code)
@@ -0,0 +1,40 @@
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.db.session import get_read_db
+from app.core.config import Settings
+from app.reg.schema.incident_schema import IncidentDetail, IncidentOut
+from app.reg.services.incident_service import IncidentService
+
+
+settings = Settings()
+
+incident_route = APIRouter(tags=["Incident"])
+
+
+@incident_route.get("/recent", response_model=list[IncidentOut])
+def read_recent_incidents(
+    hours: int = Query(24, ge=1, le=24 * 30),
+    limit: int = Query(100, ge=1, le=1000),
+    area: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+):
+    """Deduplicated outages seen in the last hours"""
+    return IncidentService(db).get_recent_incidents(hours=hours, limit=limit, area=area)
+
+
+@incident_route.get("/{incident_id}", response_model=IncidentDetail)
+def read_incident(incident_id: UUID, db: Session = Depends(get_read_db)):
+    """An incident with the tweets and reports grouped into it"""
+    service = IncidentService(db)
+    incident = service.get_incident(incident_id)
+    if not incident:
+        raise HTTPException(status_code=404, detail="Incident not found.")
+    outages, power_issues = service.get_members(incident_id)
+    return {
+        **IncidentOut.model_validate(incident).model_dump(),
+        "outages": outages,
+        "power_issues": power_issues,
+    }
@@ -1,12 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from app.db.session import get_async_db, get_read_db
 from app.core.config import Settings
 from app.reg.schema.outage_schema import (
     OutageCreate,
     OutageOut,
+    OutageStats,
+    SimilarOutage,
 )
 from app.reg.crud import outage_crud as crud_outage
+from app.reg.services.outage_service import OutageService
 from app.dependencies import twitter_client
 
 
@@ -16,9 +24,36 @@ outage_route = APIRouter(tags=["Outage"])
 
 
 @outage_route.post("/create", response_model=OutageOut, status_code=201)
-def create_outage(outage: OutageCreate, db: Session = Depends(get_db)):
+async def create_outage(outage: OutageCreate, db: AsyncSession = Depends(get_async_db)):
     """Create or update outage"""
-    return crud_outage.create_outage(outage, db)
+    return await crud_outage.create_outage_async(outage, db)
+
+
+@outage_route.get("/similar", response_model=list[SimilarOutage])
+def read_similar_outages(
+    text: Optional[str] = Query(None, description="Free text to search with"),
+    outage_id: Optional[UUID] = Query(None, description="Search around this outage"),
+    k: int = Query(10, ge=1, le=settings.VECTOR_SEARCH_MAX_K),
+    ef_search: Optional[int] = Query(None, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
+):
+    """Outages closest in meaning to a text or to an existing outage"""
+    return crud_outage.get_similar_outages(
+        db, text=text, outage_id=outage_id, k=k, ef_search=ef_search
+    )
+
+
+@outage_route.get("/stats", response_model=OutageStats)
+def read_outage_stats(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    top_areas: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+):
+    """All-time outage statistics, or for outages reported in a range"""
+    return OutageService(db).get_outage_stats(
+        since=since, until=until, top_areas=top_areas
+    )
 
 
 @outage_route.post("/outages/sync")
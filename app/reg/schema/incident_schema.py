@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from app.reg.schema.outage_schema import OutageOut
+from app.reg.schema.power_issue_schema import PowerIssueOut
+
+
+class IncidentOut(BaseModel):
+    id: UUID
+    title: str
+    areas: List[str]
+    location_id: Optional[UUID] = None
+    member_count: int
+    outage_count: int
+    power_issue_count: int
+    first_seen: datetime
+    last_seen: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class IncidentDetail(IncidentOut):
+    outages: List[OutageOut] = []
+    power_issues: List[PowerIssueOut] = []
@@ -2,8 +2,9 @@ from enum import Enum
 from typing import Optional
 
 from pydantic import BaseModel, Field
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List, Dict, Any
+from uuid import UUID
 
 
 # Pydantic Models
@@ -19,10 +20,18 @@ class OutageStatus(str, Enum):
     SCHEDULED = "scheduled"
 
 
+class LocationMatch(BaseModel):
+    location_id: UUID
+    name: str
+    level: Optional[str] = None
+    parent_ids: List[UUID] = []  # province first
+
+
 class Outage(BaseModel):
     id: Optional[int] = None
     tweet_id: str
     areas: List[str]
+    locations: List[LocationMatch] = []
     outage_type: OutageType
     status: OutageStatus
     timestamp: datetime
@@ -39,14 +48,18 @@ class OutageCreate(BaseModel):
     status: OutageStatus
     cause: Optional[str] = None
     tweet_text: str
+    reported_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
 class OutageStats(BaseModel):
     total_outages: int
+    outage_reports: int = 0  # outage_type OUTAGE only
     total_restorations: int
     active_outages: int
+    resolved_outages: int = 0
     most_affected_areas: List[Dict[str, Any]]
-    average_duration: Optional[float] = None
+    average_duration: Optional[float] = None  # seconds, reported to resolved
+    last_updated: Optional[datetime] = None
 
 
 class TwitterConfig(BaseModel):
@@ -58,4 +71,12 @@ class TwitterConfig(BaseModel):
 
 
 class OutageOut(OutageCreate):
-    pass
+    id: UUID
+
+    class Config:
+        from_attributes = True
+
+
+class SimilarOutage(BaseModel):
+    outage: OutageOut
+    distance: float  # cosine distance, 0 = same direction
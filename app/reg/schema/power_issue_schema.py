@@ -24,12 +24,22 @@ class PowerIssueUpdate(BaseModel):
 
 class PowerIssueOut(PowerIssueCreate):
     id: UUID
-    description: str
-    audio_description: str
+    description: Optional[str] = None
+    audio_description: Optional[str] = None
     is_resolved: bool
-    location: LocationSchema
+    location: Optional[LocationSchema] = None
     created_at: datetime
     updated_at: datetime
 
     class Config:
         from_attributes = True
+
+
+class SimilarPowerIssue(BaseModel):
+    issue: PowerIssueOut
+    distance: float  # cosine distance, 0 = same direction
+
+
+class NearbyPowerIssue(BaseModel):
+    issue: PowerIssueOut
+    distance_m: float
@@ -0,0 +1,40 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class Granularity(str, Enum):
+    HOUR = "hour"
+    DAY = "day"
+
+
+class RollupSource(str, Enum):
+    OUTAGE = "outage"
+    POWER_ISSUE = "power_issue"
+
+
+class RollupPoint(BaseModel):
+    bucket: datetime
+    district_code: Optional[str] = None  # set when grouped by district
+    report_count: int
+    resolved_count: int
+    active_minutes: float
+
+
+class AreaLevel(str, Enum):
+    PROVINCE = "province"
+    DISTRICT = "district"
+    SECTOR = "sector"
+    CELL = "cell"
+    VILLAGE = "village"
+
+
+class AreaNode(BaseModel):
+    location_id: UUID
+    name: str
+    level: AreaLevel
+    code: str
+    parent_code: Optional[str] = None
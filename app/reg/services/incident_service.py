@@ -0,0 +1,274 @@
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core.config import Settings
+from app.reg.models.incident import Incident
+from app.reg.models.outage import Outage
+from app.reg.models.power_issue import PowerIssue
+
+
+settings = Settings()
+logger = logging.getLogger(__name__)
+
+CLUSTERED_MODELS = (Outage, PowerIssue)
+
+
+class Member(NamedTuple):
+    seen_at: datetime
+    areas: List[str]  # extracted area names, outages only
+    district_code: Optional[str]
+    location_id: Optional[object]
+    title: str
+
+
+def _member_fields(item) -> Member:
+    """Time, place and title of an outage or power issue."""
+    if isinstance(item, Outage):
+        return Member(
+            item.reported_at,
+            item.areas or [],
+            item.district_code,
+            item.location_id,
+            item.tweet_text,
+        )
+    # created_at is a server default: unset until the row is flushed
+    seen_at = item.created_at or datetime.now(timezone.utc)
+    title = item.description or item.issue_type.value.replace("_", " ")
+    # Placed by the reverse geocoder from the reported position
+    return Member(seen_at, [], item.district_code, item.location_id, title)
+
+
+def _nearest_candidate(vector: np.ndarray, candidates) -> Optional[Tuple]:
+    """(id, cosine distance) of the (id, embedding) row closest to `vector`."""
+    if not candidates:
+        return None
+    matrix = np.asarray([row.embedding for row in candidates], dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(vector)
+    distances = 1 - (matrix @ vector) / np.where(norms > 0, norms, 1)
+    best = int(np.argmin(distances))
+    return candidates[best].id, float(distances[best])
+
+
+class IncidentService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def assign(self, item) -> Optional[Incident]:
+        """Attach an embedded outage / power issue to the incident it repeats.
+
+        Candidates are incidents seen within INCIDENT_WINDOW_MINUTES of the
+        item in the same place: sharing an area name or the district. The
+        closest one within INCIDENT_MAX_DISTANCE wins, otherwise the item
+        opens a new incident. A power issue that could not be placed always
+        opens its own. The caller commits.
+        """
+        if item.embedding is None:
+            return None
+        member = _member_fields(item)
+        vector = np.asarray(item.embedding, dtype=np.float32)
+        district_codes = [member.district_code] if member.district_code else []
+
+        incident = None
+        places = []
+        if member.areas:
+            places.append(Incident.areas.overlap(member.areas))
+        if district_codes:
+            places.append(Incident.district_codes.overlap(district_codes))
+        # Unplaced outages keep matching on text alone, as before codes existed
+        if places or isinstance(item, Outage):
+            incident = self._closest(member.seen_at, vector, places)
+
+        if incident is not None:
+            count = incident.member_count
+            centroid = np.asarray(incident.embedding, dtype=np.float32)
+            incident.embedding = (centroid * count + vector) / (count + 1)
+            incident.member_count = count + 1
+            incident.first_seen = min(incident.first_seen, member.seen_at)
+            incident.last_seen = max(incident.last_seen, member.seen_at)
+            incident.areas = sorted(set(incident.areas or []) | set(member.areas))
+            incident.district_codes = sorted(
+                set(incident.district_codes or []) | set(district_codes)
+            )
+            incident.location_id = incident.location_id or member.location_id
+        else:
+            incident = Incident(
+                title=member.title,
+                areas=sorted(set(member.areas)),
+                district_codes=district_codes,
+                location_id=member.location_id,
+                member_count=1,
+                outage_count=0,
+                power_issue_count=0,
+                first_seen=member.seen_at,
+                last_seen=member.seen_at,
+                embedding=vector,
+            )
+            self.db.add(incident)
+            self.db.flush()
+
+        if isinstance(item, Outage):
+            incident.outage_count += 1
+        else:
+            incident.power_issue_count += 1
+        item.incident_id = incident.id
+        return incident
+
+    def _closest(
+        self, seen_at: datetime, vector: np.ndarray, places: List
+    ) -> Optional[Incident]:
+        """Closest incident in the window and place, locked for the update.
+
+        The window and place filters select the candidates first, through
+        ix_incidents_last_seen, and only those are ranked by exact cosine
+        distance. An HNSW scan would rank every incident and return the
+        older lookalikes of a templated tweet, all outside the window.
+        """
+        window = timedelta(minutes=settings.INCIDENT_WINDOW_MINUTES)
+        filters = [
+            Incident.last_seen >= seen_at - window,
+            Incident.first_seen <= seen_at + window,
+        ]
+        if places:
+            filters.append(or_(*places))
+        candidates = (
+            self.db.query(Incident.id, Incident.embedding)
+            .filter(Incident.embedding.isnot(None), *filters)
+            .all()
+        )
+        found = _nearest_candidate(vector, candidates)
+        if found is None or found[1] > settings.INCIDENT_MAX_DISTANCE:
+            return None
+        # The counters and centroid are read-modify-write: re-read them
+        # under a row lock so concurrent joins queue instead of overwriting
+        return (
+            self.db.query(Incident)
+            .filter(Incident.id == found[0])
+            .with_for_update()
+            .populate_existing()
+            .one()
+        )
+
+    def assign_many(self, items: Iterable) -> int:
+        """Assign items in the order they were seen; returns how many joined."""
+        items = sorted(
+            (item for item in items if item.embedding is not None),
+            key=lambda item: _member_fields(item).seen_at,
+        )
+        for item in items:
+            self.assign(item)
+            # Later items of the batch must see the incidents opened here
+            self.db.flush()
+        return len(items)
+
+    def release(self, members: Iterable, model=Outage) -> int:
+        """Take deleted outages / power issues back out of their incidents.
+
+        `members` carry the incident_id and embedding of the deleted rows,
+        e.g. the RETURNING rows of the DELETE. Counters and centroids are
+        updated under row locks; an incident left empty is removed.
+        Returns the number of incidents touched. The caller commits.
+        """
+        vectors = defaultdict(list)
+        for member in members:
+            if member.incident_id is not None:
+                vectors[member.incident_id].append(member.embedding)
+        if not vectors:
+            return 0
+
+        counter = "outage_count" if model is Outage else "power_issue_count"
+        incidents = (
+            self.db.query(Incident)
+            .filter(Incident.id.in_(list(vectors)))
+            # Same lock order in every transaction
+            .order_by(Incident.id)
+            .with_for_update()
+            .populate_existing()
+            .all()
+        )
+        for incident in incidents:
+            removed = vectors[incident.id]
+            remaining = incident.member_count - len(removed)
+            if remaining <= 0:
+                self.db.delete(incident)
+                continue
+            known = [np.asarray(v, dtype=np.float32) for v in removed if v is not None]
+            if known and incident.embedding is not None:
+                centroid = np.asarray(incident.embedding, dtype=np.float32)
+                incident.embedding = (
+                    centroid * incident.member_count - np.sum(known, axis=0)
+                ) / remaining
+            incident.member_count = remaining
+            setattr(
+                incident, counter, max(getattr(incident, counter) - len(removed), 0)
+            )
+        return len(incidents)
+
+    def cluster_unassigned(self, batch_size: int = 500) -> int:
+        """Assign embedded rows that have no incident yet (backfills, imports)."""
+        total = 0
+        for model in CLUSTERED_MODELS:
+            seen = model.reported_at if model is Outage else model.created_at
+            while True:
+                rows = (
+                    self.db.query(model)
+                    .filter(model.incident_id.is_(None), model.embedding.isnot(None))
+                    .order_by(seen)
+                    .limit(batch_size)
+                    .with_for_update(skip_locked=True)
+                    .all()
+                )
+                if not rows:
+                    break
+                total += self.assign_many(rows)
+                self.db.commit()
+                logger.info(f"Clustered {total} rows into incidents")
+        return total
+
+    def get_recent_incidents(
+        self, hours: int = 24, limit: int = 100, area: Optional[str] = None
+    ) -> List[Incident]:
+        """Incidents seen in the last `hours`, most recent first."""
+        since = datetime.now(timezone.utc) - timedelta(hours=hours)
+        query = self.db.query(Incident).filter(Incident.last_seen >= since)
+        if area:
+            query = query.filter(Incident.areas.contains([area]))
+        return query.order_by(Incident.last_seen.desc()).limit(limit).all()
+
+    def get_incident(self, incident_id) -> Optional[Incident]:
+        return self.db.query(Incident).filter(Incident.id == incident_id).first()
+
+    def get_members(self, incident_id) -> Tuple[List[Outage], List[PowerIssue]]:
+        outages = (
+            self.db.query(Outage)
+            .filter(Outage.incident_id == incident_id)
+            .order_by(Outage.reported_at)
+            .all()
+        )
+        power_issues = (
+            self.db.query(PowerIssue)
+            .filter(PowerIssue.incident_id == incident_id)
+            .order_by(PowerIssue.created_at)
+            .all()
+        )
+        return outages, power_issues
+
+
+def assign_incident(db: Session, item) -> Optional[Incident]:
+    """Sync entry point, also usable through AsyncSession.run_sync."""
+    return IncidentService(db).assign(item)
+
+
+def assign_incidents(db: Session, items) -> int:
+    """PendingEmbedder hook: cluster rows once their vectors are filled."""
+    return IncidentService(db).assign_many(items)
+
+
+def release_incidents(db: Session, members, model=Outage) -> int:
+    """Hook for paths deleting clustered rows."""
+    return IncidentService(db).release(members, model)
@@ -1,20 +1,34 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func, or_
-from app.db.models.location import Location
+from app.core.admin_hierarchy import AdminHierarchy, HierarchyNode
+from app.core.location_search import FuzzyLocationIndex, trigram_search
+from app.db.unit_of_work import save, unit_of_work
+from app.reg.models.location import Location
+from app.reg.twitter.gazetteer import LEVELS
 from typing import List, Optional, Dict, Tuple
-from fuzzywuzzy import fuzz
 
 
 class LocationService:
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        fuzzy_index: Optional[FuzzyLocationIndex] = None,
+        hierarchy: Optional[AdminHierarchy] = None,
+    ):
         self.db = db
+        # In-process index for hot lookups; pg_trgm answers until it is loaded
+        self.fuzzy_index = fuzzy_index
+        # Shared tree from app.dependencies; a private one is loaded on first use
+        self._hierarchy = hierarchy or AdminHierarchy()
+
+    def batch(self):
+        """Scope flushing and committing every write once, see unit_of_work."""
+        return unit_of_work(self.db)
 
     def create_location(self, location_data: Dict) -> Location:
         """Create a new location record"""
         location = Location(**location_data)
-        self.db.add(location)
-        self.db.commit()
-        self.db.refresh(location)
+        save(self.db, location)
         return location
 
     def get_location_by_name(self, name: str) -> Optional[Location]:
@@ -29,13 +43,14 @@ class LocationService:
 
     def search_locations(self, query: str, limit: int = 10) -> List[Location]:
         """Search locations by name with fuzzy matching."""
-        # First try exact and partial matches
+        # First try exact and partial matches, served by the trigram indexes
+        pattern = f"%{query.lower()}%"
         exact_matches = (
             self.db.query(Location)
             .filter(
                 or_(
-                    Location.name.ilike(f"%{query}%"),
-                    Location.name_kinyarwanda.ilike(f"%{query}%"),
+                    func.lower(Location.name).like(pattern),
+                    func.lower(Location.name_kinyarwanda).like(pattern),
                 )
             )
             .limit(limit)
@@ -46,51 +61,54 @@ class LocationService:
             return exact_matches
 
         # if no exact matches, do fuzzy matching
-        all_locations = self.db.query(Location).all()
-        fuzzy_matches = []
-
-        for location in all_locations:
-            # Check main name
-            score = fuzz.ratio(query.lower(), location.name.lower())
-            if location.name_kinyarwanda:
-                score = max(
-                    score, fuzz.ratio(query.lower(), location.name_kinyarwanda.lower())
-                )
+        if self.fuzzy_index is not None and self.fuzzy_index.loaded:
+            ranked = self.fuzzy_index.search(query, limit=limit)
+            if not ranked:
+                return []
+            ids = [location_id for location_id, _ in ranked]
+            locations = {
+                location.id: location
+                for location in self.db.query(Location).filter(Location.id.in_(ids))
+            }
+            return [locations[id_] for id_ in ids if id_ in locations]
+        return [location for location, _ in trigram_search(self.db, query, limit)]
 
-            # Check aliases
-            if location.aliases:
-                for alias in location.aliases:
-                    score = max(score, fuzz.ratio(query.lower(), alias.lower()))
+    @property
+    def hierarchy(self) -> AdminHierarchy:
+        if not self._hierarchy.loaded:
+            self._hierarchy.refresh(self.db)
+        return self._hierarchy
 
-            if score > 60:  # Threshold for fuzzy matching
-                fuzzy_matches.append((location, score))
+    def get_locations_by_level(self, level: str) -> List[HierarchyNode]:
+        """Get all locations at a specific administrative level."""
+        return self.hierarchy.at_level(level)
 
-        # Sort by score and return top results
-        fuzzy_matches.sort(key=lambda x: x[1], reverse=True)
-        return [match[0] for match in fuzzy_matches[:limit]]
+    def get_child_locations(self, parent_name: str, level: str) -> List[HierarchyNode]:
+        """Get `level` locations under the parent(s) named `parent_name`.
 
-    def get_locations_by_level(self, level: str) -> List[Location]:
-        """Get all locations at a specific administrative level."""
-        return self.db.query(Location).filter(Location.level == level).all()
-
-    def get_child_locations(self, parent_name: str, level: str) -> List[Location]:
-        """Get child locations under a parent location."""
-        if level == "district":
-            return (
-                self.db.query(Location)
-                .filter(
-                    Location.parent_province == parent_name,
-                    Location.level == "district",
-                )
-                .all()
-            )
-        elif level == "sector":
-            return (
-                self.db.query(Location)
-                .filter(
-                    Location.parent_district == parent_name, Location.level == "sector"
-                )
-                .all()
-            )
-        # Add more levels as needed
-        return []
+        The parent is looked up one level above `level`, so any of the five
+        levels below a province works.
+        """
+        rank = LEVELS.index(level)
+        if rank == 0:
+            return []
+        parent_level = LEVELS[rank - 1]
+        return [
+            child
+            for parent in self.hierarchy.at_level(parent_level)
+            if parent.name == parent_name
+            for child in self.hierarchy.children(parent.code)
+            if child.level == level
+        ]
+
+    def get_children(self, code: str) -> List[HierarchyNode]:
+        return self.hierarchy.children(code)
+
+    def get_ancestors(self, code: str) -> List[HierarchyNode]:
+        return self.hierarchy.ancestors(code)
+
+    def get_descendants(self, code: str, level: str) -> List[HierarchyNode]:
+        return self.hierarchy.descendants(code, level)
+
+    def get_subtree(self, code: str) -> List[HierarchyNode]:
+        return self.hierarchy.subtree(code)
@@ -0,0 +1,393 @@
+import argparse
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.reg.models.outage import Outage
+from app.reg.schema.outage_schema import Outage as ExtractedOutage
+from app.reg.services.incident_service import assign_incidents, release_incidents
+from app.reg.services.rollup_service import record_outages
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATTERN = "data/*_tweets_*.json"
+DEFAULT_CHECKPOINT = "data/.backfill_checkpoint.json"
+
+# One extractor per worker process, built by _init_worker
+_extractor = None
+
+
+@dataclass
+class BackfillReport:
+    tweets: int = 0
+    outages: int = 0
+    files: int = 0
+    seconds: float = 0.0
+
+    @property
+    def tweets_per_second(self) -> float:
+        return self.tweets / self.seconds if self.seconds else 0.0
+
+
+def _init_worker(use_gazetteer: bool):
+    global _extractor
+    from app.reg.twitter.outage_extractor import OutageExtractor
+
+    gazetteer = None
+    if use_gazetteer:
+        from app.db.session import SessionLocal
+        from app.reg.twitter.gazetteer import Gazetteer
+
+        gazetteer = Gazetteer()
+        with SessionLocal() as db:
+            gazetteer.refresh(db)
+    _extractor = OutageExtractor(gazetteer=gazetteer)
+
+
+def _extract_chunk(tweets: List[Dict]) -> List[Optional[ExtractedOutage]]:
+    return _extractor.process_tweets(tweets)
+
+
+class _JsonStream:
+    """Incremental reader of one JSON document, a value at a time."""
+
+    def __init__(self, f, read_size: int = 1 << 16):
+        self.f = f
+        self.read_size = read_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        data = self.f.read(self.read_size)
+        if not data:
+            self.eof = True
+            return False
+        # Drop what was consumed so the buffer stays around one value
+        self.buffer = self.buffer[self.pos :] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, '' at the end of the document."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in archive, found {found!r}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number cut at the buffer end decodes too: read on to be sure
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def items(self) -> Iterator:
+        """Elements of the array starting here, one at a time."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == "]":
+                self.pos += 1
+                return
+            self.expect(",")
+
+
+def _archived_tweets(f, read_size: int = 1 << 16) -> Iterator[Dict]:
+    stream = _JsonStream(f, read_size)
+    # Older dumps are a bare list
+    if stream.peek() == "[":
+        yield from stream.items()
+        return
+    # _save_tweets_to_json wraps tweets in metadata: skip to "tweets"
+    stream.expect("{")
+    while stream.peek() not in ("}", ""):
+        key = stream.value()
+        stream.expect(":")
+        if key == "tweets":
+            yield from stream.items()
+            return
+        stream.value()
+        if stream.peek() == ",":
+            stream.pos += 1
+
+
+def iter_archived_tweets(paths: List[str]) -> Iterator[Tuple[str, int, Dict]]:
+    """Yield (path, position, tweet) for every tweet of the archive files.
+
+    Files are parsed incrementally, so memory stays bounded by one read
+    buffer and one tweet whatever the size of an archive.
+    """
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for position, tweet in enumerate(_archived_tweets(f)):
+                yield path, position, tweet
+
+
+class BackfillCheckpoint:
+    """Last tweet position written per archive file."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.positions: Dict[str, int] = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.positions = json.load(f).get("files", {})
+
+    def done(self, file: str, position: int) -> bool:
+        return position <= self.positions.get(file, -1)
+
+    def advance(self, file: str, position: int):
+        self.positions[file] = max(position, self.positions.get(file, -1))
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"updated_at": datetime.now().isoformat(), "files": self.positions}, f
+            )
+        os.replace(tmp_path, self.path)
+
+
+class OutageIngestorService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def backfill(
+        self,
+        paths: List[str],
+        workers: Optional[int] = None,
+        chunk_size: int = 500,
+        checkpoint_path: Optional[str] = DEFAULT_CHECKPOINT,
+        use_gazetteer: bool = True,
+    ) -> BackfillReport:
+        """Re-extract archived tweets and replace their outages.
+
+        Tweets are sharded in chunks across a process pool; chunks are
+        written back in archive order, one transaction each, and the
+        checkpoint only moves past a chunk once it is committed.
+        """
+        workers = workers or os.cpu_count() or 1
+        checkpoint = BackfillCheckpoint(checkpoint_path)
+        report = BackfillReport(files=len(paths))
+        started = time.perf_counter()
+
+        chunks = self._chunks(paths, checkpoint, chunk_size)
+        # spawn: workers must not inherit the embedding model or torch threads
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(use_gazetteer,),
+        ) as pool:
+            pending = deque()
+            for chunk in chunks:
+                tweets = [tweet for _, _, tweet in chunk]
+                pending.append((chunk, pool.submit(_extract_chunk, tweets)))
+                # Bounded in-flight work keeps the archive streaming
+                if len(pending) >= workers * 2:
+                    self._write_chunk(*pending.popleft(), checkpoint, report)
+                    self._log_progress(report, started)
+            while pending:
+                self._write_chunk(*pending.popleft(), checkpoint, report)
+                self._log_progress(report, started)
+
+        report.seconds = time.perf_counter() - started
+        logger.info(
+            f"Backfill done: {report.tweets} tweets, {report.outages} outages "
+            f"in {report.seconds:.1f}s ({report.tweets_per_second:.0f} tweets/s)"
+        )
+        return report
+
+    def _chunks(
+        self, paths: List[str], checkpoint: BackfillCheckpoint, chunk_size: int
+    ) -> Iterator[List[Tuple[str, int, Dict]]]:
+        chunk = []
+        for path, position, tweet in iter_archived_tweets(paths):
+            if checkpoint.done(path, position):
+                continue
+            chunk.append((path, position, tweet))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _write_chunk(self, chunk, future, checkpoint, report):
+        extracted = future.result()
+        tweets = [tweet for _, _, tweet in chunk]
+        rows = [
+            self._outage_row(tweet, outage)
+            for tweet, outage in zip(tweets, extracted)
+            if outage
+        ]
+
+        from app.dependencies import (
+            DEFERRED_EMBEDDING,
+            area_resolver,
+            embedding_service,
+        )
+
+        # Every area name of the chunk in one go
+        area_resolver.place(self.db, rows)
+
+        # Deferred mode leaves the vectors to the pending embedder
+        if rows and not DEFERRED_EMBEDDING:
+            embeddings = embedding_service.embed_many(
+                [row["tweet_text"] for row in rows]
+            )
+            for row, embedding in zip(rows, embeddings):
+                row["embedding"] = embedding
+
+        try:
+            # Replace whatever a previous run extracted from these tweets. The
+            # outage_stats triggers count the delete; rollups and incidents
+            # are settled here, and the new rows clustered again.
+            replaced = self.db.execute(
+                delete(Outage)
+                .where(Outage.tweet_id.in_([str(tweet["id"]) for tweet in tweets]))
+                .returning(
+                    Outage.outage_type,
+                    Outage.reported_at,
+                    Outage.resolved_at,
+                    Outage.location_id,
+                    Outage.district_code,
+                    Outage.sector_code,
+                    Outage.incident_id,
+                    Outage.embedding,
+                )
+            ).all()
+            record_outages(self.db, [row._asdict() for row in replaced], sign=-1)
+            release_incidents(self.db, replaced)
+            if rows:
+                self.db.execute(insert(Outage), rows)
+                record_outages(self.db, rows)
+                # Deferred rows are clustered by the pending embedder once
+                # their vectors are filled
+                if not DEFERRED_EMBEDDING:
+                    inserted = (
+                        self.db.query(Outage)
+                        .filter(Outage.id.in_([row["id"] for row in rows]))
+                        .all()
+                    )
+                    assign_incidents(self.db, inserted)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        for path, position, _ in chunk:
+            checkpoint.advance(path, position)
+        checkpoint.save()
+        report.tweets += len(chunk)
+        report.outages += len(rows)
+
+    def _outage_row(self, tweet: Dict, outage: ExtractedOutage) -> Dict:
+        created_at = tweet.get("created_at")
+        reported_at = (
+            datetime.fromisoformat(created_at)
+            if created_at
+            else datetime.now(timezone.utc)
+        )
+        return {
+            "id": uuid.uuid4(),
+            "tweet_id": outage.tweet_id,
+            "tweet_text": outage.tweet_text,
+            "areas": outage.areas,
+            "location_confidence": outage.confidence,
+            "status": outage.status,
+            "outage_type": outage.outage_type,
+            "reported_at": reported_at,
+            "cause": outage.cause,
+            "source_type": "twitter",
+            "author_id": (str(tweet["author_id"]) if tweet.get("author_id") else None),
+        }
+
+    def _log_progress(self, report: BackfillReport, started: float):
+        report.seconds = time.perf_counter() - started
+        logger.info(
+            f"Backfilled {report.tweets} tweets ({report.outages} outages), "
+            f"{report.tweets_per_second:.0f} tweets/s"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Outage ingestion commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backfill = commands.add_parser(
+        "backfill", help="Re-extract outages from archived tweet JSON files"
+    )
+    backfill.add_argument("paths", nargs="*", help=f"default: {DEFAULT_PATTERN}")
+    backfill.add_argument("--workers", type=int, default=None)
+    backfill.add_argument("--chunk-size", type=int, default=500)
+    backfill.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    backfill.add_argument(
+        "--restart", action="store_true", help="ignore the saved checkpoint"
+    )
+    backfill.add_argument(
+        "--no-gazetteer",
+        action="store_true",
+        help="do not load the locations table in workers",
+    )
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    from app.db.session import SessionLocal
+
+    if args.command == "backfill":
+        paths = sorted(args.paths or glob.glob(DEFAULT_PATTERN))
+        if args.restart and os.path.exists(args.checkpoint):
+            os.remove(args.checkpoint)
+        with SessionLocal() as db:
+            OutageIngestorService(db).backfill(
+                paths,
+                workers=args.workers,
+                chunk_size=args.chunk_size,
+                checkpoint_path=args.checkpoint,
+                use_gazetteer=not args.no_gazetteer,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,11 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, func
-from app.db.models.outage import Outage
-from app.db.models.location import Location
-from app.db.models.post import Post
+from app.reg.models.outage import Outage
+from app.reg.models.outage_stats import OutageAreaCount, OutageStatsSummary
+from app.reg.schema.outage_schema import OutageStatus, OutageType
+from app.reg.services.rollup_service import outage_facts, record_facts, record_outages
+from app.db.unit_of_work import commit, defer, save, unit_of_work
+from functools import partial
 from typing import List, Optional, Dict
 from datetime import datetime, timedelta, timezone
 
@@ -11,12 +14,17 @@ class OutageService:
     def __init__(self, db: Session):
         self.db = db
 
+    def batch(self):
+        """Scope flushing and committing every write once, see unit_of_work."""
+        return unit_of_work(self.db)
+
     def create_outage(self, outage_data: Dict) -> Outage:
         """Create a new outage record."""
         outage = Outage(**outage_data)
-        self.db.add(outage)
-        self.db.commit()
-        self.db.refresh(outage)
+        if outage.location_id is None:
+            defer(self.db, "place_outages", _place_outages, [outage])
+        defer(self.db, "record_outages", record_outages, [outage])
+        save(self.db, outage)
         return outage
 
     def get_outage_by_tweet_id(self, tweet_id: str) -> Optional[Outage]:
@@ -25,11 +33,7 @@ class OutageService:
 
     def get_active_outages(self) -> List[Outage]:
         """Get all active (unresolved) outages."""
-        return (
-            self.db.query(Outage)
-            .filter(Outage.status.in_(["reported", "confirmed"]))
-            .all()
-        )
+        return self.db.query(Outage).filter(Outage.status == OutageStatus.ACTIVE).all()
 
     def get_outages_by_location(self, location_name: str) -> List[Outage]:
         """Get outages associated with a specific location."""
@@ -41,7 +45,7 @@ class OutageService:
 
     def get_recent_outages(self, hours: int = 24) -> List[Outage]:
         """Get outages reported in the last specified hours."""
-        cutoff_time = datetime.now(timezone.now()) - timedelta(hours=hours)
+        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
         return (
             self.db.query(Outage)
             .filter(Outage.reported_at >= cutoff_time)
@@ -53,27 +57,121 @@ class OutageService:
         """Update the status of an outage"""
         outage = self.db.query(Outage).filter(Outage.id == outage_id).first()
         if outage:
+            # Swap the outage's rollup contribution for its resolved one;
+            # facts are taken now, since a batch only records them at flush
+            before = outage_facts(self.db, [outage])
             outage.status = status
-            if status == "resolved":
-                outage.resolved_at = datetime.now(timezone.now())
-            self.db.commit()
-            self.db.refresh(outage)
+            if status == OutageStatus.RESOLVED:
+                outage.resolved_at = datetime.now(timezone.utc)
+            after = outage_facts(self.db, [outage])
+            defer(self.db, ("record_facts", -1), partial(record_facts, sign=-1), before)
+            defer(self.db, ("record_facts", 1), record_facts, after)
+            commit(self.db, outage)
         return outage
 
-    def get_outage_stats(self) -> Dict:
-        """Get basic outage statistics."""
-        total_outages = self.db.query(Outage).count()
-        active_outages = (
-            self.db.query(Outage)
-            .filter(Outage.status.in_(["reported", "confirmed"]))
-            .count()
+    def get_outage_stats(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        top_areas: int = 10,
+    ) -> Dict:
+        """Outage statistics, all-time or for outages reported in a range.
+
+        All-time figures are read from the trigger-maintained summary tables;
+        a range is computed in one aggregate pass over `outages`.
+        """
+        if since is None and until is None:
+            return self._summary_stats(top_areas)
+        return self._range_stats(since, until, top_areas)
+
+    def _summary_stats(self, top_areas: int) -> Dict:
+        summary = self.db.get(OutageStatsSummary, 1)
+        if summary is None:
+            # Summary table not seeded yet
+            return self._range_stats(None, None, top_areas)
+        areas = (
+            self.db.query(OutageAreaCount.area, OutageAreaCount.outage_count)
+            .filter(OutageAreaCount.outage_count > 0)
+            .order_by(OutageAreaCount.outage_count.desc())
+            .limit(top_areas)
+            .all()
         )
-        resolved_outages = (
-            self.db.query(Outage).filter(Outage.status == "resolved").count()
+        return {
+            "total_outages": summary.total_outages,
+            "outage_reports": summary.outage_reports,
+            "total_restorations": summary.total_restorations,
+            "active_outages": summary.active_outages,
+            "resolved_outages": summary.resolved_outages,
+            "most_affected_areas": [
+                {"area": area, "outage_count": count} for area, count in areas
+            ],
+            "average_duration": (
+                summary.resolved_duration_seconds / summary.resolved_duration_count
+                if summary.resolved_duration_count
+                else None
+            ),
+            "last_updated": summary.updated_at,
+        }
+
+    def _range_stats(
+        self, since: Optional[datetime], until: Optional[datetime], top_areas: int
+    ) -> Dict:
+        filters = []
+        if since is not None:
+            filters.append(Outage.reported_at >= since)
+        if until is not None:
+            filters.append(Outage.reported_at < until)
+
+        is_outage = Outage.outage_type == OutageType.OUTAGE
+        counts = (
+            self.db.query(
+                func.count().label("total_outages"),
+                func.count().filter(is_outage).label("outage_reports"),
+                func.count()
+                .filter(Outage.outage_type == OutageType.RESTORATION)
+                .label("total_restorations"),
+                func.count()
+                .filter(Outage.status == OutageStatus.ACTIVE)
+                .label("active_outages"),
+                func.count()
+                .filter(Outage.status == OutageStatus.RESOLVED)
+                .label("resolved_outages"),
+                func.avg(
+                    func.extract("epoch", Outage.resolved_at - Outage.reported_at)
+                ).label("average_duration"),
+            )
+            .filter(*filters)
+            .one()
+        )
+
+        area = func.unnest(Outage.areas).label("area")
+        areas_query = self.db.query(area).filter(is_outage, *filters).subquery()
+        areas = (
+            self.db.query(areas_query.c.area, func.count().label("outage_count"))
+            .group_by(areas_query.c.area)
+            .order_by(func.count().desc())
+            .limit(top_areas)
+            .all()
         )
         return {
-            "total_outages": total_outages,
-            "active_outages": active_outages,
-            "resolved_outages": resolved_outages,
-            "last_updated": datetime.now(timezone.now()).isoformat(),
+            "total_outages": counts.total_outages,
+            "outage_reports": counts.outage_reports,
+            "total_restorations": counts.total_restorations,
+            "active_outages": counts.active_outages,
+            "resolved_outages": counts.resolved_outages,
+            "most_affected_areas": [
+                {"area": name, "outage_count": count} for name, count in areas
+            ],
+            "average_duration": (
+                float(counts.average_duration)
+                if counts.average_duration is not None
+                else None
+            ),
+            "last_updated": datetime.now(timezone.utc),
         }
+
+
+def _place_outages(db: Session, outages: List[Outage]) -> int:
+    from app.dependencies import area_resolver
+
+    return area_resolver.place(db, outages)
@@ -1,19 +1,56 @@
+import io
+import json
+import os
+import socket
+import uuid
+from dataclasses import dataclass, field
+from sqlalchemy import Column, Text, column, func, select, update, values
+from sqlalchemy.dialects.postgresql import UUID, insert
 from sqlalchemy.orm import Session
-from app.db.models.post import Post
-from typing import List, Optional, Dict
+from app.core.config import Settings
+from app.db.partitions import (
+    conflict_columns,
+    fill_partition_key,
+    partitioned_tables,
+)
+from app.db.unit_of_work import commit, save, unit_of_work
+from app.reg.models.post import Post
+from typing import Iterator, List, Optional, Dict, Tuple
 from datetime import datetime, timedelta, timezone
 
 
+settings = Settings()
+
+
+@dataclass
+class BulkInsertResult:
+    """Outcome of a bulk ingestion: (id, tweet_id) of new rows, duplicates skipped."""
+
+    inserted: List[Tuple[uuid.UUID, str]] = field(default_factory=list)
+    skipped: int = 0
+
+    @property
+    def inserted_count(self) -> int:
+        return len(self.inserted)
+
+
+def _chunks(rows: List[Dict], size: int) -> Iterator[List[Dict]]:
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
 class PostService:
     def __init__(self, db: Session):
         self.db = db
 
+    def batch(self):
+        """Scope flushing and committing every write once, see unit_of_work."""
+        return unit_of_work(self.db)
+
     def create_post(self, post_data: Dict) -> Post:
         """Create a new post record"""
-        post = Post(**post_data)
-        self.db.add(post)
-        self.db.commit()
-        self.db.refresh(post)
+        post = Post(**fill_partition_key("posts", post_data))
+        save(self.db, post)
         return post
 
     def get_post_by_id(self, post_id: str) -> Optional[Post]:
@@ -21,8 +58,135 @@ class PostService:
         return self.db.query(Post).filter(Post.tweet_id == post_id).first()
 
     def get_unprocessed_posts(self, limit: int = 100) -> List[Post]:
-        """Get posts that haven't been processed yet."""
-        return self.db.query(Post).filter(Post.processed == False).limit(limit).all()
+        """Get posts that haven't been processed yet, oldest first.
+
+        Read only; workers sharing the backlog use claim_posts instead.
+        """
+        return (
+            self.db.query(Post)
+            .filter(Post.processed.isnot(True))
+            .order_by(Post.created_at)
+            .limit(limit)
+            .all()
+        )
+
+    def claim_posts(
+        self, worker_id: Optional[str] = None, limit: int = 100
+    ) -> List[Post]:
+        """Lease up to `limit` unprocessed posts to `worker_id` and commit.
+
+        Candidates are locked with FOR UPDATE SKIP LOCKED, so concurrent
+        workers never claim the same post. A claim older than
+        POST_QUEUE_LEASE_SECONDS is taken to be from a crashed worker and
+        can be claimed again; every claim counts as an attempt.
+        """
+        worker_id = worker_id or default_worker_id()
+        lease = timedelta(seconds=settings.POST_QUEUE_LEASE_SECONDS)
+        candidates = (
+            select(Post.id)
+            .where(
+                Post.processed.isnot(True),
+                Post.attempts < settings.POST_QUEUE_MAX_ATTEMPTS,
+                (Post.claimed_at.is_(None)) | (Post.claimed_at < func.now() - lease),
+            )
+            .order_by(Post.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        statement = (
+            update(Post)
+            .where(Post.id.in_(candidates.scalar_subquery()))
+            .values(
+                claimed_at=func.now(),
+                claimed_by=worker_id,
+                attempts=Post.attempts + 1,
+            )
+            .returning(Post)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            posts = self.db.scalars(statement).all()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return posts
+
+    def complete_posts(self, post_ids: List[uuid.UUID], worker_id: str = None) -> int:
+        """Mark claimed posts processed in one UPDATE.
+
+        Posts whose lease was since taken over by another worker are left
+        alone; returns how many were marked.
+        """
+        if not post_ids:
+            return 0
+        statement = (
+            update(Post)
+            .where(
+                Post.id.in_(post_ids),
+                Post.claimed_by == (worker_id or default_worker_id()),
+            )
+            .values(
+                processed=True,
+                processing_error=None,
+                claimed_at=None,
+                claimed_by=None,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return self._commit_update(statement)
+
+    def fail_posts(self, errors: Dict[uuid.UUID, str], worker_id: str = None) -> int:
+        """Record errors of claimed posts in one UPDATE ... FROM (VALUES).
+
+        Posts are released for a retry until they reach
+        POST_QUEUE_MAX_ATTEMPTS, then kept as processed with their error.
+        """
+        if not errors:
+            return 0
+        failed = values(
+            column("id", UUID(as_uuid=True)), column("error", Text), name="failed"
+        ).data(list(errors.items()))
+        statement = (
+            update(Post)
+            .where(
+                Post.id == failed.c.id,
+                Post.claimed_by == (worker_id or default_worker_id()),
+            )
+            .values(
+                processing_error=failed.c.error,
+                processed=Post.attempts >= settings.POST_QUEUE_MAX_ATTEMPTS,
+                claimed_at=None,
+                claimed_by=None,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return self._commit_update(statement)
+
+    def queue_depth(self) -> Dict[str, int]:
+        """Unprocessed posts: waiting, leased and out of attempts."""
+        lease = timedelta(seconds=settings.POST_QUEUE_LEASE_SECONDS)
+        leased = Post.claimed_at >= func.now() - lease
+        exhausted = Post.attempts >= settings.POST_QUEUE_MAX_ATTEMPTS
+        row = (
+            self.db.query(
+                func.count().filter(~leased | Post.claimed_at.is_(None), ~exhausted),
+                func.count().filter(leased, ~exhausted),
+                func.count().filter(exhausted),
+            )
+            .filter(Post.processed.isnot(True))
+            .one()
+        )
+        return dict(zip(("waiting", "leased", "exhausted"), row))
+
+    def _commit_update(self, statement) -> int:
+        try:
+            count = self.db.execute(statement).rowcount
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return count
 
     def mark_post_as_processed(self, post_id: str, error: str = None) -> Optional[Post]:
         """Mark a post as processed."""
@@ -31,13 +195,12 @@ class PostService:
             post.processed = True
             if error:
                 post.processing_error = error
-            self.db.commit()
-            self.db.refresh(post)
+            commit(self.db, post)
         return post
 
     def get_recent_posts(self, hours: int = 24) -> List[Post]:
         """Get recent posts."""
-        cutoff_time = datetime.now(timezone.now()) - timedelta(hours=hours)
+        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
         return (
             self.db.query(Post)
             .filter(Post.tweet_created_at >= cutoff_time)
@@ -45,20 +208,130 @@ class PostService:
             .all()
         )
 
-    def bulk_create_posts(self, posts_data: List[Dict]) -> List[Post]:
-        """Create multiple posts at once."""
-        tweets = []
-        for tweet_data in posts_data:
-            # Skip if tweet already exists
-            existing = self.get_post_by_id(tweet_data["tweet_id"])
-            if not existing:
-                tweet = Post(**tweet_data)
-                tweets.append(tweet)
-
-        if tweets:
-            self.db.add_all(tweets)
+    def bulk_create_posts(
+        self, posts_data: List[Dict], chunk_size: int = 1000
+    ) -> BulkInsertResult:
+        """Insert posts, skipping tweet ids already stored.
+
+        One INSERT ... ON CONFLICT (tweet_id) DO NOTHING RETURNING per chunk
+        instead of a lookup, an insert and a refresh per post.
+        """
+        result = BulkInsertResult()
+        if not posts_data:
+            return result
+
+        statement = (
+            insert(Post)
+            .on_conflict_do_nothing(
+                index_elements=conflict_columns("posts", "tweet_id")
+            )
+            .returning(Post.id, Post.tweet_id)
+        )
+        rows = [fill_partition_key("posts", post) for post in posts_data]
+        try:
+            for chunk in _chunks(rows, chunk_size):
+                chunk = self._unseen(chunk)
+                if not chunk:
+                    continue
+                result.inserted.extend(
+                    (row.id, row.tweet_id) for row in self.db.execute(statement, chunk)
+                )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        result.skipped = len(posts_data) - result.inserted_count
+        return result
+
+    def _unseen(self, rows: List[Dict]) -> List[Dict]:
+        """Rows whose tweet is not stored yet.
+
+        Partitioned, the unique key is (tweet_id, tweet_created_at), so a
+        tweet stored under another timestamp (a conversion fallback) would
+        not conflict; look its id up instead.
+        """
+        if "posts" not in partitioned_tables():
+            return rows
+        stored = {
+            tweet_id
+            for (tweet_id,) in self.db.query(Post.tweet_id).filter(
+                Post.tweet_id.in_([row["tweet_id"] for row in rows])
+            )
+        }
+        return [row for row in rows if row["tweet_id"] not in stored]
+
+    def copy_posts(self, posts_data: List[Dict]) -> BulkInsertResult:
+        """COPY posts into a staging table, then insert the new ones.
+
+        For backfills of many thousands of posts: the rows travel in a single
+        COPY stream and the de-duplication is one INSERT ... SELECT.
+        """
+        result = BulkInsertResult()
+        if not posts_data:
+            return result
+
+        columns = [
+            column
+            for column in Post.__table__.columns
+            if column.name not in ("created_at", "updated_at")
+        ]
+        names = ", ".join(column.name for column in columns)
+        buffer = io.StringIO()
+        for post in posts_data:
+            row = fill_partition_key("posts", {"id": uuid.uuid4(), **post})
+            buffer.write(
+                "\t".join(_copy_value(column, row) for column in columns) + "\n"
+            )
+        buffer.seek(0)
+
+        try:
+            cursor = self.db.connection().connection.cursor()
+            cursor.execute(
+                "CREATE TEMP TABLE posts_staging "
+                "(LIKE posts INCLUDING DEFAULTS) ON COMMIT DROP"
+            )
+            cursor.copy_expert(f"COPY posts_staging ({names}) FROM STDIN", buffer)
+            cursor.execute(
+                f"INSERT INTO posts ({names}) SELECT {names} FROM posts_staging AS s "
+                # The unique key includes tweet_created_at once partitioned
+                "WHERE NOT EXISTS "
+                "(SELECT 1 FROM posts AS p WHERE p.tweet_id = s.tweet_id) "
+                f"ON CONFLICT ({', '.join(conflict_columns('posts', 'tweet_id'))}) "
+                "DO NOTHING RETURNING id, tweet_id"
+            )
+            result.inserted = [(row[0], row[1]) for row in cursor.fetchall()]
             self.db.commit()
-            for tweet in tweets:
-                self.db.refresh(tweet)
+        except Exception:
+            self.db.rollback()
+            raise
+
+        result.skipped = len(posts_data) - result.inserted_count
+        return result
+
+
+def default_worker_id() -> str:
+    """host:pid, unique per processor replica."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
 
-        return tweets
+def _copy_value(column: Column, row: Dict) -> str:
+    """A value in COPY text format, Python defaults applied."""
+    value = row.get(column.name)
+    if value is None and column.name not in row and column.default is not None:
+        value = column.default.arg if column.default.is_scalar else None
+    if value is None:
+        return "\\N"
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    elif isinstance(value, datetime):
+        value = value.isoformat()
+    elif isinstance(value, bool):
+        value = "t" if value else "f"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
@@ -0,0 +1,305 @@
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import Settings
+from app.reg.models.issue_rollup import IssueRollup
+from app.reg.models.location import Location
+from app.reg.models.power_issue import IssueType as PowerIssueType
+from app.reg.schema.outage_schema import OutageType
+
+
+settings = Settings()
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+KEY_COLUMNS = (
+    "granularity",
+    "bucket",
+    "source",
+    "issue_type",
+    "district_code",
+    "sector_code",
+)
+COUNTERS = ("report_count", "resolved_count", "active_minutes")
+
+
+class RollupFact(NamedTuple):
+    """What a single outage / power issue contributes to the rollups."""
+
+    source: str
+    issue_type: str
+    district_code: str
+    sector_code: str
+    reported_at: datetime
+    resolved_at: Optional[datetime]
+
+
+def _aware(moment: datetime) -> datetime:
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    """Start of the hour / day containing `moment`, in ROLLUP_TIMEZONE."""
+    local = _aware(moment).astimezone(ZoneInfo(settings.ROLLUP_TIMEZONE))
+    if granularity == "hour":
+        return local.replace(minute=0, second=0, microsecond=0)
+    return local.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _active_minutes(
+    start: datetime, end: datetime, granularity: str
+) -> Iterable[Tuple[datetime, float]]:
+    """(bucket, minutes) of the span start..end split on bucket boundaries."""
+    step = GRANULARITIES[granularity]
+    bucket = bucket_start(start, granularity)
+    while bucket < end:
+        overlap = min(bucket + step, end) - max(bucket, start)
+        yield bucket, overlap.total_seconds() / 60
+        bucket += step
+
+
+def _field(item, name: str):
+    return item.get(name) if isinstance(item, dict) else getattr(item, name)
+
+
+def _codes(outage) -> Tuple[str, str]:
+    if isinstance(outage, dict):
+        return outage.get("district_code") or "", outage.get("sector_code") or ""
+    return outage.district_code or "", outage.sector_code or ""
+
+
+def outage_facts(db: Session, outages: Iterable) -> List[RollupFact]:
+    """Facts of Outage rows or row dicts, placed by their admin codes or,
+    for rows without them, through their location."""
+    outages = list(outages)
+    location_ids = {
+        _field(outage, "location_id") for outage in outages if not all(_codes(outage))
+    } - {None}
+    codes = {}
+    if location_ids:
+        codes = {
+            row.id: (row.district_code or "", row.sector_code or "")
+            for row in db.query(
+                Location.id, Location.district_code, Location.sector_code
+            ).filter(Location.id.in_(location_ids))
+        }
+    facts = []
+    for outage in outages:
+        # Each code falls back on its own, like coalesce() in REBUILD_SQL
+        own = _codes(outage)
+        located = codes.get(_field(outage, "location_id"), ("", ""))
+        district, sector = (mine or theirs for mine, theirs in zip(own, located))
+        resolved_at = _field(outage, "resolved_at")
+        facts.append(
+            RollupFact(
+                source="outage",
+                issue_type=OutageType(_field(outage, "outage_type")).value,
+                district_code=district,
+                sector_code=sector,
+                reported_at=_aware(_field(outage, "reported_at")),
+                resolved_at=_aware(resolved_at) if resolved_at else None,
+            )
+        )
+    return facts
+
+
+def power_issue_facts(issues: Iterable) -> List[RollupFact]:
+    return [
+        RollupFact(
+            source="power_issue",
+            # Column defaults are only applied on flush
+            issue_type=(issue.issue_type or PowerIssueType.OUTAGE).value,
+            district_code=issue.district_code or "",
+            sector_code=issue.sector_code or "",
+            reported_at=_aware(issue.created_at or datetime.now(timezone.utc)),
+            resolved_at=None,
+        )
+        for issue in issues
+    ]
+
+
+def rollup_rows(facts: Iterable[RollupFact], sign: int = 1) -> List[Dict]:
+    """Counter increments per rollup key, the rows RollupService.record upserts."""
+    totals: Dict[Tuple, List[float]] = defaultdict(lambda: [0, 0, 0.0])
+    for fact in facts:
+        for granularity in GRANULARITIES:
+            place = (fact.source, fact.issue_type)
+            place += (fact.district_code, fact.sector_code)
+            reported = bucket_start(fact.reported_at, granularity)
+            totals[(granularity, reported, *place)][0] += sign
+            if fact.resolved_at is None:
+                continue
+            resolved = bucket_start(fact.resolved_at, granularity)
+            totals[(granularity, resolved, *place)][1] += sign
+            for bucket, minutes in _active_minutes(
+                fact.reported_at, fact.resolved_at, granularity
+            ):
+                totals[(granularity, bucket, *place)][2] += sign * minutes
+
+    return [
+        {**dict(zip(KEY_COLUMNS, key)), **dict(zip(COUNTERS, counters))}
+        for key, counters in totals.items()
+        if any(counters)
+    ]
+
+
+class RollupService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record(self, facts: Iterable[RollupFact], sign: int = 1) -> int:
+        """Add (sign=1) or withdraw (sign=-1) facts with one upsert.
+
+        The caller commits, so the rollups change in the same transaction
+        as the rows they count.
+        """
+        rows = rollup_rows(facts, sign)
+        if not rows:
+            return 0
+        statement = insert(IssueRollup).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=KEY_COLUMNS,
+            set_={
+                counter: getattr(IssueRollup, counter) + statement.excluded[counter]
+                for counter in COUNTERS
+            },
+        )
+        self.db.execute(statement)
+        return len(rows)
+
+    def rebuild(self) -> int:
+        """Recompute every rollup from the raw outages and power issues."""
+        # Writers wait, so nothing is counted both here and by record()
+        self.db.execute(text("LOCK TABLE outages, power_issues IN SHARE MODE"))
+        self.db.query(IssueRollup).delete(synchronize_session=False)
+        total = 0
+        for granularity, step in GRANULARITIES.items():
+            result = self.db.execute(
+                REBUILD_SQL,
+                {
+                    "granularity": granularity,
+                    "step": step,
+                    "tz": settings.ROLLUP_TIMEZONE,
+                },
+            )
+            total += result.rowcount
+        self.db.commit()
+        logger.info(f"Rebuilt {total} rollup rows")
+        return total
+
+    def timeseries(
+        self,
+        granularity: str,
+        since: datetime,
+        until: datetime,
+        source: Optional[str] = None,
+        issue_type: Optional[str] = None,
+        district_code: Optional[str] = None,
+        by_district: bool = False,
+    ) -> List[Dict]:
+        """Counters per bucket in [since, until), optionally per district."""
+        group = [IssueRollup.bucket]
+        if by_district:
+            group.append(IssueRollup.district_code)
+        query = self.db.query(
+            *group,
+            func.sum(IssueRollup.report_count).label("report_count"),
+            func.sum(IssueRollup.resolved_count).label("resolved_count"),
+            func.sum(IssueRollup.active_minutes).label("active_minutes"),
+        ).filter(
+            IssueRollup.granularity == granularity,
+            IssueRollup.bucket >= bucket_start(since, granularity),
+            IssueRollup.bucket < until,
+        )
+        if source:
+            query = query.filter(IssueRollup.source == source)
+        if issue_type:
+            query = query.filter(IssueRollup.issue_type == issue_type)
+        if district_code is not None:
+            query = query.filter(IssueRollup.district_code == district_code)
+        rows = query.group_by(*group).order_by(*group).all()
+        return [
+            {
+                "bucket": row.bucket,
+                "district_code": row.district_code if by_district else None,
+                "report_count": row.report_count,
+                "resolved_count": row.resolved_count,
+                "active_minutes": row.active_minutes,
+            }
+            for row in rows
+        ]
+
+
+# The same facts as outage_facts / power_issue_facts, computed in SQL: an
+# outage is placed by its own codes, through its location when it has none
+REBUILD_SQL = text(
+    """
+    INSERT INTO issue_rollups (
+        granularity, bucket, source, issue_type, district_code, sector_code,
+        report_count, resolved_count, active_minutes
+    )
+    SELECT :granularity, bucket, source, issue_type, district_code, sector_code,
+           sum(reports), sum(resolved), sum(minutes)
+    FROM (
+        SELECT date_trunc(:granularity, o.reported_at, :tz) AS bucket,
+               'outage' AS source, lower(o.outage_type::text) AS issue_type,
+               coalesce(nullif(o.district_code, ''), l.district_code, '') AS district_code,
+               coalesce(nullif(o.sector_code, ''), l.sector_code, '') AS sector_code,
+               1 AS reports, 0 AS resolved, 0.0 AS minutes
+        FROM outages AS o LEFT JOIN locations AS l ON l.id = o.location_id
+        UNION ALL
+        SELECT date_trunc(:granularity, o.resolved_at, :tz),
+               'outage', lower(o.outage_type::text),
+               coalesce(nullif(o.district_code, ''), l.district_code, ''),
+               coalesce(nullif(o.sector_code, ''), l.sector_code, ''),
+               0, 1, 0.0
+        FROM outages AS o LEFT JOIN locations AS l ON l.id = o.location_id
+        WHERE o.resolved_at IS NOT NULL
+        UNION ALL
+        SELECT b.bucket,
+               'outage', lower(o.outage_type::text),
+               coalesce(nullif(o.district_code, ''), l.district_code, ''),
+               coalesce(nullif(o.sector_code, ''), l.sector_code, ''),
+               0, 0,
+               extract(epoch FROM least(b.bucket + :step, o.resolved_at)
+                                  - greatest(b.bucket, o.reported_at)) / 60
+        FROM outages AS o
+        LEFT JOIN locations AS l ON l.id = o.location_id
+        CROSS JOIN LATERAL generate_series(
+            date_trunc(:granularity, o.reported_at, :tz),
+            o.resolved_at - interval '1 microsecond',
+            :step
+        ) AS b(bucket)
+        WHERE o.resolved_at > o.reported_at
+        UNION ALL
+        SELECT date_trunc(:granularity, p.created_at, :tz),
+               'power_issue', lower(p.issue_type::text),
+               coalesce(p.district_code, ''), coalesce(p.sector_code, ''),
+               1, 0, 0.0
+        FROM power_issues AS p
+        WHERE p.created_at IS NOT NULL
+    ) AS facts
+    GROUP BY bucket, source, issue_type, district_code, sector_code
+    """
+)
+
+
+def record_outages(db: Session, outages, sign: int = 1) -> int:
+    """Ingestion hook, also usable through AsyncSession.run_sync."""
+    return RollupService(db).record(outage_facts(db, outages), sign)
+
+
+def record_power_issues(db: Session, issues, sign: int = 1) -> int:
+    return RollupService(db).record(power_issue_facts(issues), sign)
+
+
+def record_facts(db: Session, facts: List[RollupFact], sign: int = 1) -> int:
+    """Facts computed up front, for changes of rows already counted."""
+    return RollupService(db).record(facts, sign)
@@ -0,0 +1,80 @@
+import argparse
+import logging
+
+from app.core.config import Settings
+from app.core.deferred_embedder import PendingEmbedder
+from app.db import partitions
+from app.db.session import SessionLocal, engine
+from app.dependencies import embedding_service
+from app.reg.crud.outage_crud import outage_embedding_text
+from app.reg.crud.power_issue_crud import power_issue_embedding_text
+from app.reg.models.outage import Outage
+from app.reg.models.power_issue import PowerIssue
+from app.reg.services.incident_service import IncidentService, assign_incidents
+from app.reg.services.rollup_service import RollupService
+from app.wasac.crud.water_issue_crud import water_issue_embedding_text
+from app.wasac.models.water_issue import WaterIssue
+
+
+settings = Settings()
+logger = logging.getLogger(__name__)
+
+
+def build_pending_embedder() -> PendingEmbedder:
+    """Embedder for every table whose create path can defer its vector."""
+    embedder = PendingEmbedder(
+        embedding_service,
+        SessionLocal,
+        batch_size=settings.EMBEDDING_DEFERRED_BATCH_SIZE,
+    )
+    embedder.register(Outage, outage_embedding_text, on_embedded=assign_incidents)
+    embedder.register(
+        PowerIssue, power_issue_embedding_text, on_embedded=assign_incidents
+    )
+    embedder.register(WaterIssue, water_issue_embedding_text)
+    return embedder
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Background jobs")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    embed = commands.add_parser("embed-pending", help="Fill NULL embeddings")
+    embed.add_argument("--once", action="store_true", help="drain the backlog and exit")
+
+    commands.add_parser(
+        "cluster-incidents", help="Assign embedded rows without an incident"
+    )
+    commands.add_parser(
+        "maintain-partitions",
+        help="Create upcoming monthly partitions and retire expired ones",
+    )
+    commands.add_parser(
+        "rebuild-rollups", help="Recompute hourly / daily rollups from raw rows"
+    )
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "embed-pending":
+        embedder = build_pending_embedder()
+        if args.once:
+            total = 0
+            while filled := embedder.run_once():
+                total += filled
+            logger.info(f"Embedded {total} pending rows")
+        else:
+            embedder.run_forever(settings.EMBEDDING_DEFERRED_POLL_SECONDS)
+    elif args.command == "cluster-incidents":
+        with SessionLocal() as db:
+            IncidentService(db).cluster_unassigned()
+    elif args.command == "maintain-partitions":
+        with engine.begin() as connection:
+            partitions.maintain(connection)
+    elif args.command == "rebuild-rollups":
+        with SessionLocal() as db:
+            RollupService(db).rebuild()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+import logging
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import Settings
+from app.reg.models.location import Location
+from app.reg.schema.outage_schema import LocationMatch
+
+
+settings = Settings()
+logger = logging.getLogger(__name__)
+
+LEVELS = ("province", "district", "sector", "cell", "village")
+
+_TOKEN = re.compile(r"\w+")
+_END = None  # trie key holding the location ids of a complete name
+
+
+class GazetteerEntry(NamedTuple):
+    id: UUID
+    name: str
+    level: Optional[str]
+    codes: Tuple[Optional[str], ...]  # province .. village code
+
+    @property
+    def rank(self) -> int:
+        return LEVELS.index(self.level) if self.level in LEVELS else len(LEVELS)
+
+
+class Watermark:
+    """Latest `updated_at` loaded, and the versions loaded close behind it.
+
+    `updated_at` is set by now(), the start time of the writing
+    transaction, so an edit committed after a refresh can carry a
+    timestamp below that refresh's watermark. Changed rows are therefore
+    re-selected from LOCATION_REFRESH_OVERLAP_SECONDS behind the
+    watermark, and the (id, updated_at) versions already loaded in that
+    margin are dropped again: an unchanged table yields nothing to reload.
+    """
+
+    def __init__(self, overlap: Optional[timedelta] = None):
+        self.overlap = (
+            timedelta(seconds=settings.LOCATION_REFRESH_OVERLAP_SECONDS)
+            if overlap is None
+            else overlap
+        )
+        self.at: Optional[datetime] = None
+        self._seen: Dict[UUID, datetime] = {}
+
+    def filter(self, query):
+        if self.at is None:
+            return query
+        return query.filter(Location.updated_at >= self.at - self.overlap)
+
+    def advance(self, rows) -> list:
+        """The rows not loaded yet; moves the watermark past them."""
+        fresh = [
+            row
+            for row in rows
+            if row.updated_at is None or self._seen.get(row.id) != row.updated_at
+        ]
+        for row in fresh:
+            if row.updated_at is not None:
+                self._seen[row.id] = row.updated_at
+                if self.at is None or row.updated_at > self.at:
+                    self.at = row.updated_at
+        if self.at is not None:
+            # Older versions can no longer be selected again
+            since = self.at - self.overlap
+            self._seen = {
+                id_: stamp for id_, stamp in self._seen.items() if stamp >= since
+            }
+        return fresh
+
+
+class Gazetteer:
+    """Token trie over every `Location` name, Kinyarwanda name and alias.
+
+    Lookups walk the trie from each token of the text and keep the longest
+    name found, so the cost depends on the tweet length, not on the number
+    of locations loaded.
+    """
+
+    def __init__(self):
+        self._root: dict = {}
+        self._entries: Dict[UUID, GazetteerEntry] = {}
+        self._keys: Dict[UUID, Set[Tuple[str, ...]]] = {}
+        self._by_code: Dict[Tuple[str, str], UUID] = {}
+        self._watermark = Watermark()
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def refresh(self, db: Session) -> int:
+        """Load rows changed since the last refresh; the first call loads everything."""
+        query = db.query(
+            Location.id,
+            Location.name,
+            Location.name_kinyarwanda,
+            Location.aliases,
+            Location.level,
+            Location.province_code,
+            Location.district_code,
+            Location.sector_code,
+            Location.cell_code,
+            Location.village_code,
+            Location.updated_at,
+        )
+        rows = self._watermark.advance(self._watermark.filter(query).all())
+
+        with self._lock:
+            for row in rows:
+                self._upsert(row)
+            self._loaded = True
+
+            total = db.query(func.count(Location.id)).scalar()
+            if total != len(self._entries):
+                existing = {location_id for (location_id,) in db.query(Location.id)}
+                for location_id in set(self._entries) - existing:
+                    self._remove(location_id)
+
+        if rows:
+            logger.info(
+                f"Gazetteer refreshed {len(rows)} locations ({len(self)} total)"
+            )
+        return len(rows)
+
+    def lookup(self, text: str) -> List[LocationMatch]:
+        """Return the locations named in `text`, in order of appearance."""
+        tokens = [token.lower() for token in _TOKEN.findall(text)]
+        matches = []
+        seen = set()
+
+        with self._lock:
+            for found in self._spans(tokens):
+                # Homonyms (a sector named after its district, ...) resolve
+                # to the coarsest level.
+                entry = min((self._entries[id_] for id_ in found), key=lambda e: e.rank)
+                if entry.id in seen:
+                    continue
+                seen.add(entry.id)
+                matches.append(
+                    LocationMatch(
+                        location_id=entry.id,
+                        name=entry.name,
+                        level=entry.level,
+                        parent_ids=self.parents(entry.id),
+                    )
+                )
+        return matches
+
+    def _spans(self, tokens: List[str]) -> List[Tuple[UUID, ...]]:
+        spans = []
+        i = 0
+        while i < len(tokens):
+            node = self._root
+            found, found_end = None, i
+            for j in range(i, len(tokens)):
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                if _END in node:
+                    found, found_end = node[_END], j + 1
+
+            if not found:
+                i += 1
+                continue
+            spans.append(tuple(found))
+            i = found_end
+        return spans
+
+    def parents(self, location_id: UUID) -> List[UUID]:
+        """Ids of the enclosing locations, province first."""
+        entry = self._entries.get(location_id)
+        if entry is None:
+            return []
+        chain = []
+        for level, code in zip(LEVELS[: entry.rank], entry.codes):
+            parent_id = self._by_code.get((level, code)) if code else None
+            if parent_id is not None:
+                chain.append(parent_id)
+        return chain
+
+    def _upsert(self, row):
+        self._remove(row.id)
+
+        entry = GazetteerEntry(
+            id=row.id,
+            name=row.name,
+            level=row.level,
+            codes=(
+                row.province_code,
+                row.district_code,
+                row.sector_code,
+                row.cell_code,
+                row.village_code,
+            ),
+        )
+        self._entries[row.id] = entry
+        if entry.rank < len(LEVELS) and entry.codes[entry.rank]:
+            self._by_code[(entry.level, entry.codes[entry.rank])] = row.id
+
+        keys = set()
+        for name in [row.name, row.name_kinyarwanda, *(row.aliases or [])]:
+            key = tuple(token.lower() for token in _TOKEN.findall(name or ""))
+            if not key:
+                continue
+            node = self._root
+            for token in key:
+                node = node.setdefault(token, {})
+            node.setdefault(_END, set()).add(row.id)
+            keys.add(key)
+        self._keys[row.id] = keys
+
+    def _remove(self, location_id: UUID):
+        entry = self._entries.pop(location_id, None)
+        if entry is None:
+            return
+        if entry.rank < len(LEVELS):
+            code_key = (entry.level, entry.codes[entry.rank])
+            if self._by_code.get(code_key) == location_id:
+                del self._by_code[code_key]
+
+        for key in self._keys.pop(location_id, ()):
+            path = [self._root]
+            for token in key:
+                path.append(path[-1][token])
+            ids = path[-1][_END]
+            ids.discard(location_id)
+            if not ids:
+                del path[-1][_END]
+            # Prune branches left empty
+            for depth in range(len(key), 0, -1):
+                if path[depth]:
+                    break
+                del path[depth - 1][key[depth - 1]]
@@ -0,0 +1,130 @@
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+
+class KeywordHit(NamedTuple):
+    phrase: str
+    category: str
+    label: str
+    start: int
+    end: int
+
+
+class KeywordMatches:
+    """Hits from a single scan, grouped by category and label."""
+
+    def __init__(self, hits: List[KeywordHit]):
+        self.hits = hits
+        self._by_category: Dict[str, Dict[str, Set[str]]] = defaultdict(
+            lambda: defaultdict(set)
+        )
+        for hit in hits:
+            self._by_category[hit.category][hit.label].add(hit.phrase)
+
+    def labels(self, category: str) -> List[str]:
+        """Labels of a category in order of first appearance."""
+        seen = []
+        for hit in self.hits:
+            if hit.category == category and hit.label not in seen:
+                seen.append(hit.label)
+        return seen
+
+    def phrases(self, category: str, label: str) -> Set[str]:
+        """Distinct phrases of a category/label that were found."""
+        return self._by_category.get(category, {}).get(label, set())
+
+
+class KeywordMatcher:
+    """Word-boundary matcher that finds every tagged phrase in one pass.
+
+    Phrases are compiled into a single regex whose alternation is factored
+    as a character trie, so scan time depends on the text length rather
+    than on the number of phrases. The regex is a lookahead tried at every
+    word start, so overlapping phrases ("power back" and "back online" in
+    "power back online") are all found.
+    """
+
+    def __init__(self):
+        self._tags: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
+        self._implied: Dict[str, List[str]] = {}
+        self._pattern: Optional[re.Pattern] = None
+
+    def add(self, phrase: str, category: str, label: Optional[str] = None):
+        """Register a phrase under a category (label defaults to the phrase)."""
+        phrase = " ".join(phrase.lower().split())
+        if not phrase:
+            return
+        tag = (category, label or phrase)
+        if tag not in self._tags[phrase]:
+            self._tags[phrase].append(tag)
+        self._pattern = None
+
+    def add_many(
+        self, phrases: Iterable[str], category: str, label: Optional[str] = None
+    ):
+        for phrase in phrases:
+            self.add(phrase, category, label)
+
+    def compile(self) -> "KeywordMatcher":
+        """Build the trie regex; called lazily on first scan if needed."""
+        trie: dict = {}
+        for phrase in self._tags:
+            node = trie
+            for char in phrase:
+                node = node.setdefault(char, {})
+            node[""] = True
+
+        body = _trie_to_regex(trie) if trie else "(?!)"
+        # Zero-width, so nothing is consumed and the next word start is tried
+        self._pattern = re.compile(rf"(?<!\w)(?=((?:{body}))(?!\w))")
+
+        # Only the longest phrase at a word start is matched; the shorter
+        # ones starting there too ("no power" in "no power supply") are
+        # credited here. Phrases starting at a later word get their own match.
+        self._implied = {}
+        for phrase in self._tags:
+            words = list(re.finditer(r"\w+", phrase))
+            prefixes = [
+                phrase[: last.end()]
+                for last in words[:-1]
+                if phrase[: last.end()] in self._tags
+            ]
+            if prefixes:
+                self._implied[phrase] = prefixes
+        return self
+
+    def scan(self, text: str) -> KeywordMatches:
+        """Return every tagged phrase occurring in `text` as a whole word."""
+        if self._pattern is None:
+            self.compile()
+
+        hits = []
+        for match in self._pattern.finditer(text.lower()):
+            phrase = " ".join(match.group(1).split())
+            start, end = match.span(1)
+            for found in [phrase, *self._implied.get(phrase, [])]:
+                for category, label in self._tags[found]:
+                    hits.append(KeywordHit(found, category, label, start, end))
+        return KeywordMatches(hits)
+
+
+def _trie_to_regex(node: dict) -> str:
+    terminal = "" in node
+    branches = []
+    for char in sorted(k for k in node if k):
+        child = node[char]
+        escaped = r"\s+" if char == " " else re.escape(char)
+        branches.append(escaped + _trie_to_regex(child))
+
+    if not branches:
+        return ""
+
+    if len(branches) == 1:
+        body = branches[0]
+        if terminal:
+            return f"(?:{body})?"
+        return body
+
+    body = "(?:" + "|".join(branches) + ")"
+    return body + "?" if terminal else body
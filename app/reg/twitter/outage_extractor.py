@@ -2,20 +2,26 @@ import logging
 import re
 import spacy
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from app.reg.schema.outage_schema import (
+    LocationMatch,
     Outage,
     OutageStatus,
     OutageType,
 )
+from app.reg.twitter.gazetteer import Gazetteer
+from app.reg.twitter.keyword_matcher import KeywordMatcher, KeywordMatches
 
 
 class OutageExtractor:
-    def __init__(self):
+    def __init__(self, gazetteer: Optional[Gazetteer] = None):
         self.logger = logging.getLogger(__name__)
+        self.gazetteer = gazetteer
         try:
             self.nlp = spacy.load("en_core_web_sm")
+            # Only entities are used, so skip the tagger, parser, lemmatizer...
+            self.nlp.select_pipes(enable=["ner"])
             self.logger.info("☑️ spaCy model loaded.")
         except OSError:
             self.logger.warning("spaCy model not found. Using basic text processing.")
@@ -95,32 +101,72 @@ class OutageExtractor:
             "load": ["overload", "high demand", "capacity"],
         }
 
-    def extract_locations(self, text: str) -> List[str]:
+        # Every keyword list is compiled into one matcher so a tweet is
+        # scanned once, whatever the size of the gazetteer.
+        self.matcher = KeywordMatcher()
+        self.matcher.add_many(self.rwanda_locations, "location")
+        for outage_type, keywords in self.outage_keywords.items():
+            self.matcher.add_many(keywords, "outage", outage_type)
+        for cause_type, keywords in self.cause_keywords.items():
+            self.matcher.add_many(keywords, "cause", cause_type)
+        self.matcher.compile()
+
+    def scan(self, text: str) -> KeywordMatches:
+        """Find all location, outage-type and cause keywords in one pass"""
+        return self.matcher.scan(text)
+
+    def extract_locations(
+        self,
+        text: str,
+        matches: Optional[KeywordMatches] = None,
+        doc=None,
+    ) -> List[str]:
         """Extract Rwanda locations from text"""
-        text_lower = text.lower()
-        found_locations = []
+        return self.locate(text, matches, doc)[0]
 
-        for location in self.rwanda_locations:
-            if location in text_lower:
+    def extract_location_matches(self, text: str) -> List[LocationMatch]:
+        """Resolve locations named in text against the gazetteer"""
+        if not self.gazetteer or not self.gazetteer.loaded:
+            return []
+        return self.gazetteer.lookup(text)
+
+    def locate(
+        self,
+        text: str,
+        matches: Optional[KeywordMatches] = None,
+        doc=None,
+    ) -> Tuple[List[str], List[LocationMatch]]:
+        """Return the location names found in text and their gazetteer matches"""
+        if matches is None:
+            matches = self.scan(text)
+
+        location_matches = self.extract_location_matches(text)
+        found_locations = [match.name for match in location_matches]
+        for location in matches.labels("location"):
+            if location not in [loc.lower() for loc in found_locations]:
                 found_locations.append(location.title())
 
         # Use spaCy for additional location extraction if available
         if self.nlp:
-            doc = self.nlp(text)
+            if doc is None:
+                doc = self.nlp(text)
             for ent in doc.ents:
                 if ent.label_ in ["GPE", "LOC"]:  # Geopolitical entity or Location
                     location_clean = ent.text.lower().strip()
                     if location_clean not in [loc.lower() for loc in found_locations]:
                         found_locations.append(ent.text.title())
-        return found_locations
+        return found_locations, location_matches
 
-    def classify_outage_type(self, text: str) -> tuple[OutageType, float]:
+    def classify_outage_type(
+        self, text: str, matches: Optional[KeywordMatches] = None
+    ) -> tuple[OutageType, float]:
         """Classify the type of outage and return confidence score"""
-        text_lower = text.lower()
+        if matches is None:
+            matches = self.scan(text)
         scores = {}
 
         for outage_type, keywords in self.outage_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
+            score = len(matches.phrases("outage", outage_type))
             if score > 0:
                 scores[outage_type] = score / len(keywords)
 
@@ -132,12 +178,15 @@ class OutageExtractor:
 
         return OutageType(best_type), min(confidence, 1.0)
 
-    def extract_cause(self, text: str) -> Optional[str]:
+    def extract_cause(
+        self, text: str, matches: Optional[KeywordMatches] = None
+    ) -> Optional[str]:
         """Extract the likely cause of the outage"""
-        text_lower = text.lower()
+        if matches is None:
+            matches = self.scan(text)
 
-        for cause_type, keywords in self.cause_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
+        for cause_type in self.cause_keywords:
+            if matches.phrases("cause", cause_type):
                 return cause_type
 
         return None
@@ -167,21 +216,96 @@ class OutageExtractor:
     ) -> Optional[Outage]:
         """Process a tweet and (optionally) the original user tweet to extract outage info."""
 
+        # 🧠 Use full context (REG + user) to classify and extract details
+        combined_text, matches, reg_matches = self._scan_tweet(tweet_text, user_text)
+
         # 🔍 Try to extract location from REG's tweet first
-        locations = self.extract_locations(tweet_text)
+        locations = self.locate(tweet_text, reg_matches)
 
         # 🪂 Fallback: Try user's tweet if REG's tweet has no location
-        if not locations and user_text:
-            locations = self.extract_locations(user_text)
+        if not locations[0] and user_text:
+            locations = self.locate(user_text)
 
-        if not locations:
-            return None  # Still nothing, skip this tweet
+        return self._build_outage(tweet_id, combined_text, matches, locations)
 
-        # 🧠 Use full context (REG + user) to classify and extract details
+    def process_tweets(
+        self,
+        tweets: List[Dict],
+        batch_size: int = 64,
+        n_process: int = 1,
+    ) -> List[Optional[Outage]]:
+        """Process fetched tweet dicts in bulk.
+
+        Texts are streamed through `nlp.pipe` instead of one `nlp()` call
+        per text. Returns one entry per tweet, in order, identical to what
+        `process_tweet` would give for it (None when nothing was found).
+        """
+        texts = [self.tweet_texts(tweet) for tweet in tweets]
+        scans = [
+            self._scan_tweet(tweet_text, user_text) for tweet_text, user_text in texts
+        ]
+
+        # 🔍 REG text first, for every tweet
+        reg_docs = self._pipe(
+            [tweet_text for tweet_text, _ in texts], batch_size, n_process
+        )
+        locations = [
+            self.locate(tweet_text, reg_matches, doc)
+            for (tweet_text, _), (_, _, reg_matches), doc in zip(texts, scans, reg_docs)
+        ]
+
+        # 🪂 User text only where the REG text had no location
+        fallback = [
+            i
+            for i, (_, user_text) in enumerate(texts)
+            if not locations[i][0] and user_text
+        ]
+        user_docs = self._pipe([texts[i][1] for i in fallback], batch_size, n_process)
+        for i, doc in zip(fallback, user_docs):
+            locations[i] = self.locate(texts[i][1], doc=doc)
+
+        return [
+            self._build_outage(str(tweet["id"]), combined_text, matches, found)
+            for tweet, (combined_text, matches, _), found in zip(
+                tweets, scans, locations
+            )
+        ]
+
+    @staticmethod
+    def tweet_texts(tweet: Dict) -> Tuple[str, Optional[str]]:
+        """Return the (REG or mention text, original user text) of a fetched tweet."""
+        if tweet.get("is_mention"):
+            return tweet.get("text", ""), None
+        return tweet.get("text", ""), tweet.get("original_user_text")
+
+    def _pipe(self, texts: List[str], batch_size: int, n_process: int) -> Iterable:
+        if not self.nlp:
+            return [None] * len(texts)
+        return self.nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+
+    def _scan_tweet(
+        self, tweet_text: str, user_text: Optional[str]
+    ) -> Tuple[str, KeywordMatches, KeywordMatches]:
         combined_text = f"{tweet_text}\n{user_text}" if user_text else tweet_text
+        matches = self.scan(combined_text)
+        reg_matches = KeywordMatches(
+            [hit for hit in matches.hits if hit.end <= len(tweet_text)]
+        )
+        return combined_text, matches, reg_matches
+
+    def _build_outage(
+        self,
+        tweet_id: str,
+        combined_text: str,
+        matches: KeywordMatches,
+        located: Tuple[List[str], List[LocationMatch]],
+    ) -> Optional[Outage]:
+        locations, location_matches = located
+        if not locations:
+            return None  # Still nothing, skip this tweet
 
-        outage_type, confidence = self.classify_outage_type(combined_text)
-        cause = self.extract_cause(combined_text)
+        outage_type, confidence = self.classify_outage_type(combined_text, matches)
+        cause = self.extract_cause(combined_text, matches)
         duration = self.extract_duration(combined_text)
 
         if outage_type == OutageType.RESTORATION:
@@ -191,11 +315,10 @@ class OutageExtractor:
         else:
             status = OutageStatus.ACTIVE
 
-        area = locations[0]  # TODO: Support multiple later
-
         return Outage(
             tweet_id=tweet_id,
-            area=area,
+            areas=locations,
+            locations=location_matches,
             outage_type=outage_type,
             status=status,
             timestamp=datetime.now(),
@@ -3,6 +3,7 @@ from typing import List, Dict
 from fastapi import HTTPException
 import tweepy
 import logging
+from app.reg.twitter.gazetteer import Gazetteer
 from app.reg.twitter.outage_extractor import OutageExtractor
 from app.reg.schema.outage_schema import Outage
 from app.core.config import Settings
@@ -16,7 +17,7 @@ settings = Settings()
 
 
 class TwitterClient:
-    def __init__(self, config: TwitterConfig):
+    def __init__(self, config: TwitterConfig, gazetteer: Optional[Gazetteer] = None):
         self.client = tweepy.Client(
             bearer_token=config.bearer_token,
             consumer_key=config.consumer_key,
@@ -25,7 +26,7 @@ class TwitterClient:
             access_token_secret=config.access_token_secret,
             wait_on_rate_limit=True,
         )
-        self.extractor = OutageExtractor()
+        self.extractor = OutageExtractor(gazetteer=gazetteer)
 
     def fetch_reg_tweets(self, max_results: int = 10) -> List[Dict]:
         """Fetch recent tweets from REG, including replies and expanded user tweets."""
@@ -185,22 +186,13 @@ class TwitterClient:
 
     def process_tweets(self, tweets: List[Dict]) -> List[Outage]:
         outages = []
+        extracted = self.extractor.process_tweets(
+            tweets,
+            batch_size=settings.EXTRACTION_BATCH_SIZE,
+            n_process=settings.EXTRACTION_N_PROCESS,
+        )
 
-        for tweet in tweets:
-            if tweet.get("is_mention"):
-                tweet_text = tweet.get("text", "")
-                outage = self.extractor.process_tweet(
-                    tweet_text, tweet_id=str(tweet["id"])
-                )
-            else:
-                reg_text = tweet.get("text", "")
-                user_text = tweet.get("original_user_text")
-                outage = self.extractor.process_tweet(
-                    reg_text,
-                    tweet_id=str(tweet["id"]),
-                    user_text=user_text,
-                )
-
+        for tweet, outage in zip(tweets, extracted):
             if outage:
                 outage.timestamp = tweet.get("created_at")
                 outages.append(outage)
@@ -1,16 +1,158 @@
+import logging
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.wasac.models.water_issue import WaterIssue
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only
+from app.db import spatial
+from app.db.pagination import Cursor, keyset_page
+from app.db.vector_search import nearest, row_embedding
+from app.dependencies import (
+    DEFERRED_EMBEDDING,
+    get_embedding,
+    get_sync_embedding,
+    reverse_geocoder,
+)
+from app.wasac.models.water_issue import IssueType, WaterIssue
 from app.wasac.schema.water_issue_schema import WaterIssueCreate, WaterIssueUpdate
 
 
+logger = logging.getLogger(__name__)
+
+
 def create_water_issue(issue: WaterIssueCreate, db: Session):
-    water_issue = WaterIssue(**issue.model_dump())
+    water_issue = WaterIssue(**issue.model_dump(), **issue_location_fields(db, issue))
+    if not DEFERRED_EMBEDDING:
+        water_issue.embedding = get_sync_embedding(water_issue_embedding_text(issue))
     db.add(water_issue)
     db.commit()
     db.refresh(water_issue)
     return water_issue
 
 
-def get_all_issues(db: Session):
-    return db.query(WaterIssue).order_by(WaterIssue.created_at.desc()).all()
+async def create_water_issue_async(issue: WaterIssueCreate, db: AsyncSession):
+    try:
+        location_fields = await db.run_sync(issue_location_fields, issue)
+        water_issue = WaterIssue(**issue.model_dump(), **location_fields)
+        if not DEFERRED_EMBEDDING:
+            water_issue.embedding = await get_embedding(
+                water_issue_embedding_text(issue)
+            )
+        db.add(water_issue)
+        await db.commit()
+        await db.refresh(water_issue)
+        return water_issue
+    except SQLAlchemyError:
+        await db.rollback()
+        logger.error("Error creating a water issue", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
+def issue_location_fields(db: Session, issue: WaterIssueCreate) -> dict:
+    """approx_lat / approx_long from the reported location, plus its admin codes.
+
+    The in-memory reverse geocoder answers without a query; `db` is only
+    used before its first refresh.
+    """
+    if not issue.location or issue.location.lat is None or issue.location.lng is None:
+        return {}
+    lat, lng = issue.location.lat, issue.location.lng
+    return {
+        "approx_lat": lat,
+        "approx_long": lng,
+        **reverse_geocoder.admin_fields(lat, lng, db=db),
+    }
+
+
+def water_issue_embedding_text(issue: WaterIssueCreate) -> str:
+    parts = [
+        issue.issue_type.value.replace("_", " ") if issue.issue_type else None,
+        issue.description,
+    ]
+
+    return " ".join(part for part in parts if part).strip()
+
+
+# What list responses serialize; embedding, geometries and admin codes stay
+# unloaded
+LIST_COLUMNS = (
+    WaterIssue.id,
+    WaterIssue.issue_type,
+    WaterIssue.description,
+    WaterIssue.audio_description,
+    WaterIssue.phone_number,
+    WaterIssue.image_url,
+    WaterIssue.is_resolved,
+    WaterIssue.location,
+    WaterIssue.created_at,
+    WaterIssue.updated_at,
+)
+
+
+def get_issues_page(
+    db: Session,
+    limit: int,
+    cursor: Optional[Cursor] = None,
+    resolved: Optional[bool] = None,
+    issue_type: Optional[IssueType] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    """Newest-first page of issues and the cursor of the next page."""
+    query = db.query(WaterIssue).options(load_only(*LIST_COLUMNS))
+    if resolved is not None:
+        query = query.filter(WaterIssue.is_resolved == resolved)
+    if issue_type is not None:
+        query = query.filter(WaterIssue.issue_type == issue_type)
+    if since is not None:
+        query = query.filter(WaterIssue.created_at >= since)
+    if until is not None:
+        query = query.filter(WaterIssue.created_at < until)
+    return keyset_page(query, WaterIssue, limit, cursor)
+
+
+def get_similar_issues(
+    db: Session,
+    text: Optional[str] = None,
+    issue_id: Optional[UUID] = None,
+    k: int = 10,
+    ef_search: Optional[int] = None,
+):
+    """Nearest water issues to a free text or to an existing issue."""
+    if issue_id is not None:
+        found, vector = row_embedding(db, WaterIssue, issue_id)
+        if not found:
+            raise HTTPException(status_code=404, detail="Water issue not found.")
+        if vector is None:
+            raise HTTPException(
+                status_code=409, detail="Water issue embedding is still pending."
+            )
+    elif text:
+        vector = get_sync_embedding(text)
+    else:
+        raise HTTPException(status_code=422, detail="Provide text or issue_id.")
+
+    neighbours = nearest(
+        db, WaterIssue, vector, k=k, ef_search=ef_search, exclude_id=issue_id
+    )
+    return [{"issue": issue, "distance": distance} for issue, distance in neighbours]
+
+
+def get_issues_near(db: Session, lat: float, lng: float, radius: float, limit: int):
+    rows = spatial.near(
+        db.query(WaterIssue).options(load_only(*LIST_COLUMNS)),
+        WaterIssue,
+        lat,
+        lng,
+        radius,
+        limit,
+    )
+    return [{"issue": issue, "distance_m": distance} for issue, distance in rows]
+
+
+def get_issues_within(db: Session, bbox, limit: int):
+    return spatial.within(
+        db.query(WaterIssue).options(load_only(*LIST_COLUMNS)), WaterIssue, bbox, limit
+    )
@@ -1,12 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    BackgroundTasks,
+    Query,
+    Response,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from app.db.session import get_async_db, get_read_db
+from app.db.pagination import decode_cursor
+from app.db.spatial import parse_bbox
+from app.wasac.models.water_issue import IssueType
 from app.wasac.crud import water_issue_crud as crud_water
 from app.core.config import Settings
 from app.wasac.schema.water_issue_schema import (
     WaterIssueCreate,
     WaterIssueOut,
     WaterIssueUpdate,
+    SimilarWaterIssue,
+    NearbyWaterIssue,
 )
 
 
@@ -16,14 +33,82 @@ water_issue_route = APIRouter(tags=["WaterIssue"])
 
 
 @water_issue_route.post("/create", response_model=WaterIssueOut, status_code=201)
-def create_water_issue(issue: WaterIssueCreate, db: Session = Depends(get_db)):
+async def create_water_issue(
+    issue: WaterIssueCreate, db: AsyncSession = Depends(get_async_db)
+):
     """Create or update outage"""
-    return crud_water.create_water_issue(issue, db)
+    return await crud_water.create_water_issue_async(issue, db)
 
 
 @water_issue_route.get("/all", response_model=list[WaterIssueOut])
-def read_all_water_issues(db: Session = Depends(get_db)):
-    issues = crud_water.get_all_issues(db)
-    if not issues:
+def read_all_water_issues(
+    response: Response,
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the last page"),
+    resolved: Optional[bool] = None,
+    issue_type: Optional[IssueType] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_read_db),
+):
+    """Issues newest first, one page at a time"""
+    position = None
+    if cursor:
+        position = decode_cursor(cursor)
+        if position is None:
+            raise HTTPException(status_code=422, detail="Invalid cursor.")
+    issues, next_cursor = crud_water.get_issues_page(
+        db,
+        limit,
+        cursor=position,
+        resolved=resolved,
+        issue_type=issue_type,
+        since=since,
+        until=until,
+    )
+    if not issues and position is None:
         raise HTTPException(status_code=404, detail="No issues found.")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return issues
+
+
+@water_issue_route.get("/similar", response_model=list[SimilarWaterIssue])
+def read_similar_water_issues(
+    text: Optional[str] = Query(None, description="Free text to search with"),
+    issue_id: Optional[UUID] = Query(None, description="Search around this issue"),
+    k: int = Query(10, ge=1, le=settings.VECTOR_SEARCH_MAX_K),
+    ef_search: Optional[int] = Query(None, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
+):
+    """Issues closest in meaning to a text or to an existing issue"""
+    return crud_water.get_similar_issues(
+        db, text=text, issue_id=issue_id, k=k, ef_search=ef_search
+    )
+
+
+@water_issue_route.get("/near", response_model=list[NearbyWaterIssue])
+def read_water_issues_near(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius: float = Query(1000, gt=0, le=settings.SPATIAL_MAX_RADIUS_M),
+    limit: int = Query(100, ge=1, le=settings.SPATIAL_MAX_LIMIT),
+    db: Session = Depends(get_read_db),
+):
+    """Issues within `radius` metres of a point, closest first"""
+    return crud_water.get_issues_near(db, lat, lng, radius, limit)
+
+
+@water_issue_route.get("/within", response_model=list[WaterIssueOut])
+def read_water_issues_within(
+    bbox: str = Query(..., description="min_lng,min_lat,max_lng,max_lat"),
+    limit: int = Query(100, ge=1, le=settings.SPATIAL_MAX_LIMIT),
+    db: Session = Depends(get_read_db),
+):
+    """Most recent issues inside a bounding box"""
+    box = parse_bbox(bbox)
+    if box is None:
+        raise HTTPException(
+            status_code=422, detail="bbox must be min_lng,min_lat,max_lng,max_lat"
+        )
+    return crud_water.get_issues_within(db, box, limit)
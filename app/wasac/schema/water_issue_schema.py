@@ -24,12 +24,22 @@ class WaterIssueUpdate(BaseModel):
 
 class WaterIssueOut(WaterIssueCreate):
     id: UUID
-    description: str
-    audio_description: str
+    description: Optional[str] = None
+    audio_description: Optional[str] = None
     is_resolved: bool
-    location: LocationSchema
+    location: Optional[LocationSchema] = None
     created_at: datetime
     updated_at: datetime
 
     class Config:
         from_attributes = True
+
+
+class SimilarWaterIssue(BaseModel):
+    issue: WaterIssueOut
+    distance: float  # cosine distance, 0 = same direction
+
+
+class NearbyWaterIssue(BaseModel):
+    issue: WaterIssueOut
+    distance_m: float
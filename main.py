@@ -1,18 +1,75 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import Settings
-from app.reg.routes import outage_routes, twitter_routes
+from app.db.session import RECENT_WRITE_COOKIE, SessionLocal
+from app.dependencies import (
+    DEFERRED_EMBEDDING,
+    admin_hierarchy,
+    area_resolver,
+    embedding_service,
+    gazetteer,
+    location_index,
+    reverse_geocoder,
+)
+from app.reg.routes import (
+    analytics_routes,
+    incident_routes,
+    outage_routes,
+    twitter_routes,
+)
 from app.reg.routes.power_issue_routes import power_issue_route
 from app.wasac.routes.water_issue_routes import water_issue_route
 
 settings = Settings()
+logger = logging.getLogger(__name__)
+
+
+def refresh_locations():
+    with SessionLocal() as db:
+        gazetteer.refresh(db)
+        reverse_geocoder.refresh(db)
+        location_index.refresh(db)
+        if admin_hierarchy.refresh(db):
+            area_resolver.clear()
+
+
+async def keep_locations_fresh():
+    """Pick up location rows added or edited since the last refresh."""
+    while True:
+        await asyncio.sleep(settings.GAZETTEER_REFRESH_SECONDS)
+        try:
+            await asyncio.to_thread(refresh_locations)
+        except Exception:
+            logger.error("Location refresh failed", exc_info=True)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(refresh_locations)
+    refresher = asyncio.create_task(keep_locations_fresh())
+    pending_embedder = None
+    if DEFERRED_EMBEDDING:
+        from app.reg.services.scheduler_service import build_pending_embedder
+
+        pending_embedder = build_pending_embedder()
+        pending_embedder.start(settings.EMBEDDING_DEFERRED_POLL_SECONDS)
+    yield
+    refresher.cancel()
+    if pending_embedder:
+        await asyncio.to_thread(pending_embedder.stop)
 
 
 app = FastAPI(
     title="Rwanda GridWatch API",
     description="Monitor power outages in Rwanda using REG Twitter data",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 
@@ -23,9 +80,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
+@app.middleware("http")
+async def remember_writes(request: Request, call_next):
+    """Mark clients that just wrote, so get_read_db keeps them on the primary."""
+    response = await call_next(request)
+    if (
+        settings.READ_YOUR_WRITES_SECONDS > 0
+        and request.method not in ("GET", "HEAD", "OPTIONS")
+        and response.status_code < 400
+    ):
+        response.set_cookie(
+            RECENT_WRITE_COOKIE,
+            str(time.time()),
+            max_age=settings.READ_YOUR_WRITES_SECONDS,
+            httponly=True,
+            samesite="lax",
+        )
+    return response
+
+
 app.include_router(
     outage_routes.outage_route,
     prefix=settings.API_VERSION_STR + "/outage",
@@ -37,6 +114,16 @@ app.include_router(
     prefix=settings.API_VERSION_STR + "/twitter",
 )
 
+app.include_router(
+    incident_routes.incident_route,
+    prefix=settings.API_VERSION_STR + "/incident",
+)
+
+app.include_router(
+    analytics_routes.analytics_route,
+    prefix=settings.API_VERSION_STR + "/analytics",
+)
+
 # Water Issue
 app.include_router(
     water_issue_route,
@@ -49,5 +136,12 @@ app.include_router(
     prefix=settings.API_VERSION_STR + "/power-issue",
 )
 
+
+@app.get(settings.API_VERSION_STR + "/embedding/cache-stats", tags=["Embedding"])
+def embedding_cache_stats():
+    """Hit and miss counters of the embedding cache"""
+    return embedding_service.cache.stats()
+
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8002, reload=True)
@@ -0,0 +1,98 @@
+import uuid
+from collections import namedtuple
+
+import pytest
+
+from app.core.admin_hierarchy import AdminHierarchy, _build
+
+Row = namedtuple(
+    "Row",
+    "id name level province_code district_code sector_code cell_code village_code",
+)
+
+
+def _row(name, level, *codes):
+    codes = list(codes) + [None] * (5 - len(codes))
+    return Row(uuid.uuid4(), name, level, *codes)
+
+
+ROWS = [
+    _row("Kigali", "province", "01"),
+    _row("Gasabo", "district", "01", "0101"),
+    _row("Kicukiro", "district", "01", "0102"),
+    _row("Remera", "sector", "01", "0101", "010101"),
+    _row("Kimironko", "sector", "01", "0101", "010102"),
+    _row("Niboye", "sector", "01", "0102", "010201"),
+    _row("Rukiri I", "cell", "01", "0101", "010101", "01010101"),
+    _row("Ubumwe", "village", "01", "0101", "010101", "01010101", "0101010101"),
+    # Its cell is missing: hangs from the nearest level present
+    _row("Nyarutarama", "village", "01", "0101", "010102", "01010299", "0101029901"),
+    _row("Eastern", "province", "02"),
+]
+
+
+@pytest.fixture
+def hierarchy():
+    hierarchy = AdminHierarchy()
+    # Villages listed before their parents: the build orders by level
+    hierarchy._tree = _build(ROWS[7:9] + ROWS[:7] + ROWS[9:])
+    return hierarchy
+
+
+def _codes(nodes):
+    return [node.code for node in nodes]
+
+
+def test_children_and_levels(hierarchy):
+    assert len(hierarchy) == len(ROWS)
+    assert _codes(hierarchy.children("01")) == ["0101", "0102"]
+    assert _codes(hierarchy.children("0101")) == ["010101", "010102"]
+    assert _codes(hierarchy.at_level("province")) == ["01", "02"]
+    assert hierarchy.children("unknown") == []
+
+
+def test_ancestors_province_first(hierarchy):
+    assert _codes(hierarchy.ancestors("0101010101")) == [
+        "01",
+        "0101",
+        "010101",
+        "01010101",
+    ]
+    assert hierarchy.ancestors("01") == []
+
+
+def test_missing_level_falls_back_to_nearest_parent(hierarchy):
+    village = hierarchy.get("0101029901")
+    assert village.parent_code == "010102"
+    assert _codes(hierarchy.ancestors("0101029901")) == ["01", "0101", "010102"]
+
+
+def test_descendants_at_a_level(hierarchy):
+    assert _codes(hierarchy.descendants("01", "sector")) == [
+        "010101",
+        "010102",
+        "010201",
+    ]
+    assert _codes(hierarchy.descendants("0101", "village")) == [
+        "0101010101",
+        "0101029901",
+    ]
+    assert hierarchy.descendants("02", "sector") == []
+    assert hierarchy.subtree_codes("0102", "sector") == ["010201"]
+
+
+def test_subtree_is_depth_first(hierarchy):
+    assert hierarchy.subtree_codes("0101") == [
+        "0101",
+        "010101",
+        "01010101",
+        "0101010101",
+        "010102",
+        "0101029901",
+    ]
+    assert hierarchy.subtree_codes("unknown") == []
+
+
+def test_lookups_need_a_refresh_first():
+    with pytest.raises(RuntimeError):
+        AdminHierarchy().children("01")
@@ -0,0 +1,104 @@
+import operator
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import numpy as np
+from sqlalchemy.sql import operators
+
+from app.reg.models.outage import Outage
+from app.reg.services.incident_service import IncidentService
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+_COMPARE = {
+    operators.eq: operator.eq,
+    operators.ge: operator.ge,
+    operators.le: operator.le,
+}
+
+
+def _holds(criterion, row) -> bool:
+    value = getattr(row, criterion.left.key)
+    if criterion.operator is operators.is_not:
+        return value is not None
+    return _COMPARE[criterion.operator](value, criterion.right.value)
+
+
+class FakeQuery:
+    """Applies the column comparisons the incident lookup uses to rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def filter(self, *criteria):
+        return FakeQuery(
+            [row for row in self.rows if all(_holds(c, row) for c in criteria)]
+        )
+
+    def with_for_update(self):
+        return self
+
+    def populate_existing(self):
+        return self
+
+    def all(self):
+        return list(self.rows)
+
+    def one(self):
+        (row,) = self.rows
+        return row
+
+
+class FakeSession:
+    def __init__(self, incidents):
+        self.incidents = incidents
+
+    def query(self, *entities):
+        return FakeQuery(self.incidents)
+
+
+def _incident(embedding, last_seen):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        embedding=np.asarray(embedding, dtype=np.float32),
+        first_seen=last_seen - timedelta(minutes=30),
+        last_seen=last_seen,
+        member_count=1,
+        outage_count=1,
+        power_issue_count=0,
+        areas=[],
+        district_codes=[],
+        location_id=None,
+    )
+
+
+def test_in_window_duplicate_joins_despite_closer_older_incidents():
+    tweet = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+    # Earlier reposts of the same template, identical but days old
+    older = [_incident(tweet, NOW - timedelta(days=day)) for day in range(1, 201)]
+    current = _incident([0.99, 0.1, 0.0], NOW - timedelta(minutes=20))
+    db = FakeSession(older + [current])
+
+    outage = Outage(
+        reported_at=NOW, areas=[], tweet_text="No power in Remera", embedding=tweet
+    )
+    incident = IncidentService(db).assign(outage)
+
+    assert incident is current
+    assert outage.incident_id == current.id
+    assert current.member_count == 2
+    assert current.outage_count == 2
+
+
+def test_candidates_beyond_max_distance_do_not_match():
+    tweet = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+    unrelated = _incident([0.0, 1.0, 0.0], NOW - timedelta(minutes=5))
+    found = IncidentService(FakeSession([unrelated]))._closest(NOW, tweet, [])
+    assert found is None
+
+
+def test_empty_window_matches_nothing():
+    tweet = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+    older = _incident(tweet, NOW - timedelta(days=2))
+    assert IncidentService(FakeSession([older]))._closest(NOW, tweet, []) is None
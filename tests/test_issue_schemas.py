@@ -0,0 +1,69 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from pydantic import TypeAdapter
+
+from app.reg.models.power_issue import PowerIssue
+from app.reg.schema.power_issue_schema import (
+    NearbyPowerIssue,
+    PowerIssueOut,
+    SimilarPowerIssue,
+)
+from app.wasac.models.water_issue import WaterIssue
+from app.wasac.schema.water_issue_schema import (
+    NearbyWaterIssue,
+    SimilarWaterIssue,
+    WaterIssueOut,
+)
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+CASES = [
+    (PowerIssue, PowerIssueOut, SimilarPowerIssue, NearbyPowerIssue),
+    (WaterIssue, WaterIssueOut, SimilarWaterIssue, NearbyWaterIssue),
+]
+
+
+def _row(model, **fields):
+    # By default what a citizen report stored without text, audio or address
+    # looks like
+    values = {
+        "id": uuid.uuid4(),
+        "description": None,
+        "audio_description": None,
+        "location": None,
+        "is_resolved": False,
+        "created_at": NOW,
+        "updated_at": NOW,
+    }
+    return model(**{**values, **fields})
+
+
+@pytest.mark.parametrize("model, out, similar, nearby", CASES)
+def test_rows_with_nullable_fields_serialize(model, out, similar, nearby):
+    row = _row(model)
+    page = TypeAdapter(list[out]).validate_python([row], from_attributes=True)
+    assert page[0].id == row.id
+    assert page[0].description is None
+    assert page[0].audio_description is None
+    assert page[0].location is None
+
+    found = similar.model_validate(
+        {"issue": row, "distance": 0.1}, from_attributes=True
+    )
+    assert found.issue.id == row.id
+    near = nearby.model_validate(
+        {"issue": row, "distance_m": 12.5}, from_attributes=True
+    )
+    assert near.distance_m == 12.5
+
+
+@pytest.mark.parametrize("model, out, similar, nearby", CASES)
+def test_stored_location_is_returned(model, out, similar, nearby):
+    row = _row(
+        model, description="Umuriro wabuze", location={"lat": -1.95, "lng": 30.06}
+    )
+    issue = out.model_validate(row)
+    assert issue.description == "Umuriro wabuze"
+    assert (issue.location.lat, issue.location.lng) == (-1.95, 30.06)
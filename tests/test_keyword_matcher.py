@@ -0,0 +1,46 @@
+from app.reg.twitter.keyword_matcher import KeywordMatcher
+
+
+def _matcher():
+    matcher = KeywordMatcher()
+    matcher.add_many(["power back", "back online", "restored"], "outage", "restoration")
+    matcher.add_many(["no power", "power cut", "power failure"], "outage", "outage")
+    matcher.add_many(["electricity restored"], "outage", "restoration")
+    return matcher.compile()
+
+
+def test_overlapping_phrases_are_all_credited():
+    matches = _matcher().scan("Power back online in Kicukiro")
+    assert matches.phrases("outage", "restoration") == {"power back", "back online"}
+
+
+def test_phrase_sharing_a_word_with_the_previous_one():
+    matches = _matcher().scan("No power cut announced")
+    assert matches.phrases("outage", "outage") == {"no power", "power cut"}
+
+
+def test_nested_phrase_inside_a_longer_one():
+    matches = _matcher().scan("Electricity restored at 5pm")
+    assert matches.phrases("outage", "restoration") == {
+        "electricity restored",
+        "restored",
+    }
+
+
+def test_prefix_phrase_of_a_longer_one():
+    matcher = KeywordMatcher()
+    matcher.add("no power", "outage")
+    matcher.add("no power supply", "outage")
+    matches = matcher.compile().scan("There is no power supply")
+    assert matches.phrases("outage", "no power") == {"no power"}
+    assert matches.phrases("outage", "no power supply") == {"no power supply"}
+
+
+def test_word_boundaries_and_spans():
+    matcher = KeywordMatcher()
+    matcher.add("power cut", "outage")
+    text = "Powercut, then a power   cut"
+    hits = matcher.compile().scan(text).hits
+    assert [(hit.phrase, text[hit.start : hit.end]) for hit in hits] == [
+        ("power cut", "power   cut")
+    ]
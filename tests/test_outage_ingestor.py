@@ -0,0 +1,41 @@
+import io
+import json
+
+import pytest
+
+from app.reg.services.outage_ingestor_service import _archived_tweets
+
+TWEETS = [
+    {"id": 1943033221425344521 + i, "text": "Umuriro wabuze " * (i % 7), "n": -1.5e3}
+    for i in range(50)
+]
+
+
+@pytest.mark.parametrize("read_size", [1, 7, 1 << 16])
+def test_bare_list_archive_streams_every_tweet(read_size):
+    archive = io.StringIO(json.dumps(TWEETS, indent=2))
+    assert list(_archived_tweets(archive, read_size)) == TWEETS
+
+
+@pytest.mark.parametrize("read_size", [1, 7, 1 << 16])
+def test_wrapped_archive_skips_metadata(read_size):
+    document = {
+        "username": "REG_Rwanda",
+        "fetched_at": "2025-07-09T19:43:14",
+        "tweet_count": len(TWEETS),
+        "filters": {"terms": ["]", "{"]},
+        "tweets": TWEETS,
+    }
+    archive = io.StringIO(json.dumps(document, ensure_ascii=False))
+    assert list(_archived_tweets(archive, read_size)) == TWEETS
+
+
+@pytest.mark.parametrize("document", ["[]", '{"username": "x"}', '{"tweets": []}'])
+def test_archive_without_tweets(document):
+    assert list(_archived_tweets(io.StringIO(document), 3)) == []
+
+
+def test_truncated_archive_raises():
+    archive = io.StringIO(json.dumps(TWEETS)[:-40])
+    with pytest.raises(ValueError):
+        list(_archived_tweets(archive, 16))
@@ -0,0 +1,71 @@
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+from app.db.pagination import decode_cursor, encode_cursor, keyset_page
+from app.reg.models.power_issue import PowerIssue
+
+Row = namedtuple("Row", "created_at id")
+
+T0 = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+
+class FakeQuery:
+    """Runs keyset_page's (created_at, id) < cursor, order and limit in memory."""
+
+    def __init__(self, rows, after=None, limit=None):
+        self.rows, self.after, self._limit = rows, after, limit
+
+    def filter(self, criterion):
+        bound = tuple(param.value for param in criterion.right.clauses)
+        return FakeQuery(self.rows, bound, self._limit)
+
+    def order_by(self, *columns):
+        return self
+
+    def limit(self, limit):
+        return FakeQuery(self.rows, self.after, limit)
+
+    def all(self):
+        rows = sorted(self.rows, reverse=True)
+        if self.after is not None:
+            rows = [row for row in rows if tuple(row) < self.after]
+        return rows[: self._limit]
+
+
+def test_cursor_round_trip():
+    id_ = uuid.uuid4()
+    assert decode_cursor(encode_cursor(T0, id_)) == (T0, id_)
+
+
+def test_tampered_cursors_are_rejected():
+    cursor = encode_cursor(T0, uuid.uuid4())
+    assert decode_cursor(cursor[:-3]) is None
+    assert decode_cursor("not a cursor!") is None
+    assert decode_cursor(encode_cursor(T0, uuid.uuid4()).upper()) is None
+
+
+def test_pages_cover_every_row_once_newest_first():
+    # Ties on created_at are broken by id
+    rows = [
+        Row(T0 - timedelta(minutes=minute // 3), uuid.uuid4()) for minute in range(23)
+    ]
+    query = FakeQuery(rows)
+    seen, cursor = [], None
+    while True:
+        page, next_cursor = keyset_page(
+            query, PowerIssue, 5, decode_cursor(cursor) if cursor else None
+        )
+        assert len(page) <= 5
+        seen.extend(page)
+        if next_cursor is None:
+            break
+        cursor = next_cursor
+    assert seen == sorted(rows, reverse=True)
+
+
+def test_last_full_page_has_no_next_cursor():
+    rows = [Row(T0 - timedelta(minutes=minute), uuid.uuid4()) for minute in range(5)]
+    page, cursor = keyset_page(FakeQuery(rows), PowerIssue, 5)
+    assert len(page) == 5
+    assert cursor is None
@@ -0,0 +1,87 @@
+from datetime import date, datetime, timezone
+
+from app.db import partitions
+
+
+class FakeResult:
+    def __init__(self, values):
+        self.values = values
+
+    def scalar(self):
+        return self.values[0] if self.values else None
+
+    def scalars(self):
+        return list(self.values)
+
+
+class FakeConnection:
+    """Answers the catalog queries of ensure_partitions, records the rest."""
+
+    def __init__(self, partitions=(), stranded=(), has_default=True):
+        self.partitions = list(partitions)
+        self.stranded = list(stranded)
+        self.has_default = has_default
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if "FROM pg_inherits" in sql:
+            return FakeResult(self.partitions)
+        if sql.startswith("SELECT to_regclass"):
+            return FakeResult([params["table"]] if self.has_default else [])
+        if "date_trunc" in sql:
+            return FakeResult(self.stranded)
+        if "FROM pg_attribute" in sql:
+            return FakeResult(["id", "tweet_id", "reported_at"])
+        self.statements.append(sql)
+        return FakeResult([])
+
+
+def _today(monkeypatch, day):
+    class FixedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+    monkeypatch.setattr(partitions, "datetime", FixedDatetime)
+
+
+def test_upcoming_months_are_created(monkeypatch):
+    _today(monkeypatch, date(2026, 10, 18))
+    connection = FakeConnection(partitions=["outages_p2026_10"])
+    assert partitions.ensure_partitions(connection, "outages", months_ahead=2) == 2
+    created = [sql for sql in connection.statements if "PARTITION OF" in sql]
+    assert [sql.split()[5] for sql in created] == [
+        "outages_p2026_11",
+        "outages_p2026_12",
+    ]
+
+
+def test_default_rows_are_moved_into_their_month(monkeypatch):
+    _today(monkeypatch, date(2026, 10, 18))
+    connection = FakeConnection(
+        partitions=["outages_p2026_10", "outages_p2026_11"],
+        # An archive backfill older than the first partition, and a row of
+        # the month about to be created
+        stranded=[datetime(2024, 3, 1), datetime(2026, 12, 1)],
+    )
+    assert partitions.ensure_partitions(connection, "outages", months_ahead=2) == 2
+
+    attached = [sql for sql in connection.statements if "ATTACH PARTITION" in sql]
+    assert [sql.split()[5] for sql in attached] == [
+        "outages_p2024_03",
+        "outages_p2026_12",
+    ]
+    # Nothing is created over rows of the default partition
+    assert not [sql for sql in connection.statements if "PARTITION OF" in sql]
+    moves = [sql for sql in connection.statements if "DELETE FROM" in sql]
+    assert "reported_at >= '2024-03-01 00:00+00'" in moves[0]
+    assert "reported_at < '2024-04-01 00:00+00'" in moves[0]
+    assert "INSERT INTO outages_p2024_03" in moves[0]
+
+
+def test_tables_without_default_partition(monkeypatch):
+    _today(monkeypatch, date(2026, 10, 18))
+    connection = FakeConnection(partitions=["posts_p2026_10"], has_default=False)
+    assert partitions.ensure_partitions(connection, "posts", months_ahead=0) == 0
+    assert connection.statements == []
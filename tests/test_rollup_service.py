@@ -0,0 +1,164 @@
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+from app.reg.schema.outage_schema import OutageType
+from app.reg.services.rollup_service import (
+    RollupFact,
+    _active_minutes,
+    outage_facts,
+    rollup_rows,
+)
+
+# ROLLUP_TIMEZONE default, UTC+2 all year
+KIGALI = ZoneInfo("Africa/Kigali")
+
+
+def _local(*args):
+    return datetime(*args, tzinfo=KIGALI)
+
+
+def _fact(reported_at, resolved_at=None):
+    return RollupFact(
+        source="outage",
+        issue_type="outage",
+        district_code="0101",
+        sector_code="010101",
+        reported_at=reported_at,
+        resolved_at=resolved_at,
+    )
+
+
+def test_active_minutes_split_at_local_midnight():
+    start = _local(2026, 10, 18, 23, 30)
+    end = _local(2026, 10, 19, 1, 15)
+    assert list(_active_minutes(start, end, "day")) == [
+        (_local(2026, 10, 18), 30.0),
+        (_local(2026, 10, 19), 75.0),
+    ]
+    assert list(_active_minutes(start, end, "hour")) == [
+        (_local(2026, 10, 18, 23), 30.0),
+        (_local(2026, 10, 19, 0), 60.0),
+        (_local(2026, 10, 19, 1), 15.0),
+    ]
+
+
+def test_active_minutes_of_utc_times_use_local_days():
+    # 21:30-23:15 UTC is 23:30-01:15 in Kigali: two local days
+    start = datetime(2026, 10, 18, 21, 30, tzinfo=timezone.utc)
+    end = datetime(2026, 10, 18, 23, 15, tzinfo=timezone.utc)
+    buckets = list(_active_minutes(start, end, "day"))
+    assert [bucket for bucket, _ in buckets] == [
+        _local(2026, 10, 18),
+        _local(2026, 10, 19),
+    ]
+    assert sum(minutes for _, minutes in buckets) == 105.0
+
+
+def test_active_minutes_add_up_over_several_days():
+    start = _local(2026, 10, 18, 7, 20)
+    end = start + timedelta(days=2, hours=5, minutes=3)
+    for granularity in ("hour", "day"):
+        minutes = [minutes for _, minutes in _active_minutes(start, end, granularity)]
+        assert sum(minutes) == (end - start).total_seconds() / 60
+        assert all(0 < value <= 24 * 60 for value in minutes)
+
+
+def test_reports_and_resolutions_land_in_their_own_buckets():
+    fact = _fact(_local(2026, 10, 18, 22, 0), _local(2026, 10, 19, 2, 0))
+    rows = {(row["granularity"], row["bucket"]): row for row in rollup_rows([fact])}
+    reported = rows[("day", _local(2026, 10, 18))]
+    resolved = rows[("day", _local(2026, 10, 19))]
+    assert (reported["report_count"], reported["resolved_count"]) == (1, 0)
+    assert (resolved["report_count"], resolved["resolved_count"]) == (0, 1)
+    assert reported["active_minutes"] == 120.0
+    assert resolved["active_minutes"] == 120.0
+    assert (
+        sum(row["active_minutes"] for key, row in rows.items() if key[0] == "hour")
+        == 240.0
+    )
+
+
+def test_withdrawing_facts_cancels_recording_them():
+    facts = [
+        _fact(_local(2026, 10, 18, 22, 0), _local(2026, 10, 19, 2, 0)),
+        _fact(_local(2026, 10, 18, 23, 45)),
+        _fact(_local(2026, 10, 19, 9, 10), _local(2026, 10, 19, 9, 40)),
+    ]
+    totals = Counter()
+    for sign in (1, -1):
+        for row in rollup_rows(facts, sign):
+            key = tuple(row[column] for column in ("granularity", "bucket"))
+            for counter in ("report_count", "resolved_count", "active_minutes"):
+                totals[(*key, counter)] += row[counter]
+    assert totals and not any(totals.values())
+
+    recorded = rollup_rows(facts)
+    withdrawn = rollup_rows(facts, sign=-1)
+    assert len(recorded) == len(withdrawn)
+    for added, removed in zip(recorded, withdrawn):
+        assert removed["report_count"] == -added["report_count"]
+        assert removed["active_minutes"] == -added["active_minutes"]
+
+
+class LocationSession:
+    """Answers outage_facts' location lookup, counting the queries."""
+
+    def __init__(self, locations):
+        self.locations = locations
+        self.queries = 0
+
+    def query(self, *columns):
+        self.queries += 1
+        return self
+
+    def filter(self, *criteria):
+        return list(self.locations)
+
+
+def _outage(**fields):
+    return {
+        "outage_type": OutageType.OUTAGE,
+        "reported_at": datetime(2026, 10, 18, 8, 0, tzinfo=timezone.utc),
+        "resolved_at": None,
+        "location_id": None,
+        "district_code": None,
+        "sector_code": None,
+        **fields,
+    }
+
+
+def test_outage_codes_fall_back_to_the_location_one_by_one():
+    location_id = uuid.uuid4()
+    db = LocationSession(
+        [SimpleNamespace(id=location_id, district_code="0102", sector_code="010203")]
+    )
+    facts = outage_facts(
+        db,
+        [
+            _outage(location_id=location_id, district_code="0101"),
+            _outage(location_id=location_id),
+            _outage(location_id=location_id, district_code="", sector_code="010101"),
+            _outage(),
+        ],
+    )
+    assert [(fact.district_code, fact.sector_code) for fact in facts] == [
+        ("0101", "010203"),
+        ("0102", "010203"),
+        ("0102", "010101"),
+        ("", ""),
+    ]
+    assert db.queries == 1
+
+
+def test_placed_outages_need_no_location_lookup():
+    db = LocationSession([])
+    (fact,) = outage_facts(
+        db,
+        [_outage(location_id=uuid.uuid4(), district_code="0101", sector_code="010101")],
+    )
+    assert (fact.district_code, fact.sector_code) == ("0101", "010101")
+    assert fact.issue_type == "outage"
+    assert db.queries == 0
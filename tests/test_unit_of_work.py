@@ -0,0 +1,108 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.db.unit_of_work import UNIT_OF_WORK_KEY, commit, defer, save, unit_of_work
+
+
+class FakeSession:
+    """Records the session calls a unit of work makes, in order."""
+
+    def __init__(self):
+        self.info = {}
+        self.expire_on_commit = True
+        self.calls = []
+
+    def add_all(self, instances):
+        self.calls.append(("add_all", list(instances)))
+
+    def flush(self):
+        self.calls.append(("flush",))
+
+    def commit(self):
+        self.calls.append(("commit", self.expire_on_commit))
+
+    def rollback(self):
+        self.calls.append(("rollback",))
+
+    def refresh(self, instance):
+        self.calls.append(("refresh", instance))
+
+
+def _recorder(name):
+    def fn(db, items):
+        db.calls.append((name, list(items)))
+
+    return fn
+
+
+def test_deferred_calls_run_once_per_key_in_registration_order():
+    db = FakeSession()
+    rollups, areas = _recorder("rollups"), _recorder("areas")
+    with unit_of_work(db):
+        defer(db, "rollups", rollups, [1])
+        defer(db, "areas", areas, ["a"])
+        defer(db, "rollups", rollups, [2, 3])
+        assert db.calls == []
+    assert db.calls == [
+        ("rollups", [1, 2, 3]),
+        ("areas", ["a"]),
+        ("flush",),
+        ("commit", False),
+    ]
+    assert db.expire_on_commit is True
+    assert UNIT_OF_WORK_KEY not in db.info
+
+
+def test_defer_outside_a_scope_runs_immediately():
+    db = FakeSession()
+    defer(db, "rollups", _recorder("rollups"), [1])
+    assert db.calls == [("rollups", [1])]
+
+
+def test_nested_scopes_join_the_outer_one():
+    db = FakeSession()
+    with unit_of_work(db) as outer:
+        with unit_of_work(db) as inner:
+            assert inner is outer
+            defer(db, "rollups", _recorder("rollups"), [1])
+        # Leaving the inner scope neither flushes nor commits
+        assert db.calls == []
+        defer(db, "rollups", _recorder("rollups"), [2])
+    assert db.calls == [("rollups", [1, 2]), ("flush",), ("commit", False)]
+
+
+def test_error_rolls_back_and_drops_deferred_calls():
+    db = FakeSession()
+    with pytest.raises(RuntimeError):
+        with unit_of_work(db):
+            defer(db, "rollups", _recorder("rollups"), [1])
+            raise RuntimeError("boom")
+    assert db.calls == [("rollback",)]
+    assert UNIT_OF_WORK_KEY not in db.info
+
+
+def test_save_assigns_ids_and_commits_once_in_a_scope():
+    db = FakeSession()
+    first, second = SimpleNamespace(id=None), SimpleNamespace(id=uuid.uuid4())
+    known = second.id
+    with unit_of_work(db):
+        save(db, first)
+        save(db, second)
+        commit(db, first, second)
+        assert isinstance(first.id, uuid.UUID)
+        assert second.id == known
+    assert db.calls == [
+        ("add_all", [first]),
+        ("add_all", [second]),
+        ("flush",),
+        ("commit", False),
+    ]
+
+
+def test_save_outside_a_scope_commits_and_refreshes():
+    db = FakeSession()
+    row = SimpleNamespace(id=None)
+    save(db, row)
+    assert db.calls == [("add_all", [row]), ("commit", True), ("refresh", row)]
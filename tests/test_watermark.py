@@ -0,0 +1,52 @@
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+from app.reg.twitter.gazetteer import Watermark
+
+Row = namedtuple("Row", "id updated_at")
+
+T0 = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+
+def test_first_refresh_loads_everything():
+    rows = [Row(uuid.uuid4(), T0), Row(uuid.uuid4(), None)]
+    watermark = Watermark(timedelta(minutes=10))
+    assert watermark.advance(rows) == rows
+    assert watermark.at == T0
+
+
+def test_unchanged_rows_are_not_reloaded():
+    row = Row(uuid.uuid4(), T0)
+    watermark = Watermark(timedelta(minutes=10))
+    watermark.advance([row])
+    # The overlap re-selects the newest row on every refresh
+    assert watermark.advance([row]) == []
+    assert watermark.advance([row]) == []
+
+
+def test_late_commit_below_the_watermark_is_loaded():
+    first = Row(uuid.uuid4(), T0)
+    watermark = Watermark(timedelta(minutes=10))
+    watermark.advance([first])
+    # Edited in a transaction that began before the refresh, committed after
+    late = Row(uuid.uuid4(), T0 - timedelta(minutes=3))
+    assert watermark.advance([first, late]) == [late]
+    assert watermark.at == T0
+
+
+def test_new_version_of_a_loaded_row_is_loaded():
+    row_id = uuid.uuid4()
+    watermark = Watermark(timedelta(minutes=10))
+    watermark.advance([Row(row_id, T0)])
+    edited = Row(row_id, T0 + timedelta(seconds=1))
+    assert watermark.advance([edited]) == [edited]
+    assert watermark.advance([edited]) == []
+
+
+def test_versions_behind_the_overlap_are_forgotten():
+    old = Row(uuid.uuid4(), T0)
+    watermark = Watermark(timedelta(minutes=10))
+    watermark.advance([old])
+    watermark.advance([Row(uuid.uuid4(), T0 + timedelta(hours=1))])
+    assert old.id not in watermark._seen